@@ -1,22 +1,64 @@
 from __future__ import annotations
 
+import inspect
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any
 
 from src.dataModel.model_response import ModelResponse
+from src.dataModel.task import Task
 
 
 class AgentNode(ABC):
     """Abstract base class for all agent nodes."""
 
     SCHEMA: Any
+    # nodes that decompose tasks implement ``stream_task`` and set this
+    STREAMS_SUBTASKS = False
 
     def __call__(self, data: Any, config: dict[str, Any] | None = None) -> dict:
-        """Execute the node and return a serialisable dictionary."""
-        result = self.execute_task(data)
-        return result.model_dump()
+        """Execute the node and return a serialisable dictionary.
+
+        When ``config`` carries an ``on_subtask`` callback and the node
+        streams, each subtask is handed to it as soon as it is generated.
+        """
+        return self.respond(data, config).model_dump()
+
+    async def acall(self, data: Any, config: dict[str, Any] | None = None) -> dict:
+        """Async counterpart of ``__call__``."""
+        return (await self.arespond(data, config)).model_dump()
+
+    def respond(self, data: Any, config: dict[str, Any] | None = None) -> ModelResponse:
+        """Like ``__call__`` but return the ``ModelResponse`` itself.
+
+        The orchestrator uses this to skip serialising the response only to
+        validate it again.
+        """
+        return self._run(data, config)
+
+    async def arespond(self, data: Any, config: dict[str, Any] | None = None) -> ModelResponse:
+        """Async counterpart of :meth:`respond`.
+
+        Nodes built on an :class:`AsyncBaseModelAccessor` get a coroutine back
+        from the accessor and return it from ``execute_task`` unchanged; it is
+        awaited here so prompt construction is shared with the sync path.
+        """
+        result = self._run(data, config)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
     @abstractmethod
     def execute_task(self, data: Any) -> ModelResponse:
         """Perform the node's work and return a ``ModelResponse``."""
         raise NotImplementedError()
+
+    def stream_task(self, data: Any, on_subtask: Callable[[Task], Any]) -> ModelResponse:
+        """Like :meth:`execute_task`, calling ``on_subtask`` for each subtask once generated."""
+        raise NotImplementedError()
+
+    def _run(self, data: Any, config: dict[str, Any] | None) -> Any:
+        on_subtask = (config or {}).get("on_subtask")
+        if on_subtask is not None and self.STREAMS_SUBTASKS:
+            return self.stream_task(data, on_subtask)
+        return self.execute_task(data)
@@ -1,3 +1,6 @@
+from collections.abc import Callable
+from typing import Any
+
 from src.agentNodes.base_node import AgentNode
 from src.modelAccessors.base_accessor import BaseModelAccessor
 
@@ -16,9 +19,12 @@ class HLDDesigner(AgentNode):
         "Create a high level design based on the following requirements:\n"
         "{requirements}\n"
         "Complexity: {complexity}\n"
-        "Provide at most 5 subtasks using only the types: LLD, RESEARCH, TEST."
+        "Provide at most 5 subtasks using only the types: LLD, RESEARCH, TEST.\n"
+        "List in depends_on the ids of sibling subtasks that must finish first."
     )
 
+    STREAMS_SUBTASKS = True
+
     SCHEMA = DecomposedResponse | ImplementedResponse
 
     def __init__(self, llm_accessor: BaseModelAccessor):
@@ -27,10 +33,16 @@ class HLDDesigner(AgentNode):
 
     def execute_task(self, data: Task) -> ModelResponse:
         """Generate the high level design or subtasks for ``task``."""
-        prompt = HLDDesigner.PROMPT_TEMPLATE.format(
+        response: ModelResponse = self.llm_accessor.call_model(self._prompt(data), HLDDesigner.SCHEMA)
+        return response
+
+    def stream_task(self, data: Task, on_subtask: Callable[[Task], Any]) -> ModelResponse:
+        """Like :meth:`execute_task`, handing over each subtask as soon as it is generated."""
+        response: ModelResponse = self.llm_accessor.stream_call_model(self._prompt(data), HLDDesigner.SCHEMA, on_subtask)
+        return response
+
+    def _prompt(self, data: Task) -> str:
+        return HLDDesigner.PROMPT_TEMPLATE.format(
             requirements=data.description,
             complexity=data.complexity,
         )
-        response: ModelResponse = self.llm_accessor.call_model(prompt, HLDDesigner.SCHEMA)
-        return response
-
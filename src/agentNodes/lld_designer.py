@@ -1,3 +1,6 @@
+from collections.abc import Callable
+from typing import Any
+
 from src.agentNodes.base_node import AgentNode
 from src.modelAccessors.base_accessor import BaseModelAccessor
 from src.dataModel.task import Task
@@ -11,9 +14,12 @@ class LLDDesigner(AgentNode):
         "Create a low level design based on the following description:\n"
         "{description}\n"
         "Complexity: {complexity}\n"
-        "Return at most 5 subtasks using only the types: IMPLEMENT, RESEARCH, TEST."
+        "Return at most 5 subtasks using only the types: IMPLEMENT, RESEARCH, TEST.\n"
+        "List in depends_on the ids of sibling subtasks that must finish first."
     )
 
+    STREAMS_SUBTASKS = True
+
     SCHEMA = ImplementedResponse
 
     def __init__(self, llm_accessor: BaseModelAccessor):
@@ -22,10 +28,16 @@ class LLDDesigner(AgentNode):
 
     def execute_task(self, data: Task) -> ModelResponse:
         """Generate low level design details for ``task``."""
-        prompt = LLDDesigner.PROMPT_TEMPLATE.format(
+        response: ModelResponse = self.llm_accessor.call_model(self._prompt(data), LLDDesigner.SCHEMA)
+        return response
+
+    def stream_task(self, data: Task, on_subtask: Callable[[Task], Any]) -> ModelResponse:
+        """Like :meth:`execute_task`, handing over each subtask as soon as it is generated."""
+        response: ModelResponse = self.llm_accessor.stream_call_model(self._prompt(data), LLDDesigner.SCHEMA, on_subtask)
+        return response
+
+    def _prompt(self, data: Task) -> str:
+        return LLDDesigner.PROMPT_TEMPLATE.format(
             description=data.description,
             complexity=data.complexity,
         )
-        response: ModelResponse = self.llm_accessor.call_model(prompt, LLDDesigner.SCHEMA)
-        return response
-
@@ -3,9 +3,48 @@
 from __future__ import annotations
 
 import argparse
+import sys
+from pathlib import Path
 
-from ..orchestrator import AgentOrchestrator
+from ..dataManagement.answers import AnswerInbox
+from ..dataManagement.codec import CODECS
+from ..dataModel.task import TaskStatus, TaskType
+from ..orchestrator import (
+    AgentOrchestrator,
+    CallPolicy,
+    CheckpointPolicy,
+    RetryPolicy,
+    SchedulingPolicy,
+    StreamingPolicy,
+)
 from ..dataModel.model import AccessorType
+from ..modelAccessors.caching_accessor import ResponseCache
+from ..modelAccessors.cassette_accessor import Cassette
+from ..modelAccessors.rate_limiter import RATE_LIMITERS, RateLimits
+
+
+def _rate_limit(spec: str) -> tuple[str, str | None, RateLimits]:
+    """Parse ``PROVIDER[/MODEL]=RPM[:TPM]`` into a rate limit setting."""
+    try:
+        target, quota = spec.split("=", 1)
+        provider, _, model = target.partition("/")
+        rpm, _, tpm = quota.partition(":")
+        limits = RateLimits(
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+        )
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid rate limit {spec!r}: expected PROVIDER[/MODEL]=RPM[:TPM]") from exc
+    return provider, model or None, limits
+
+
+def _retry_budget(spec: str) -> tuple[TaskType, int]:
+    """Parse ``TYPE=N`` into the retry budget of a task type."""
+    try:
+        name, count = spec.split("=", 1)
+        return TaskType[name.upper()], int(count)
+    except (KeyError, ValueError) as exc:
+        raise argparse.ArgumentTypeError(f"invalid retry budget {spec!r}: expected TYPE=N") from exc
 
 
 def parse_args() -> argparse.Namespace:
@@ -20,41 +59,305 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--resume",
-        help="Path to a checkpoint directory to resume",
+        help="Path to a checkpoint directory, or a sqlite:///PATH store, to resume",
     )
     parser.add_argument(
         "--checkpoint-dir",
         default="checkpoints",
-        help="Directory to store project checkpoints",
+        help="Directory to store project checkpoints, or a sqlite:///PATH database to keep the project in",
     )
     parser.add_argument(
         "--model-type",
         choices=[t.value for t in AccessorType],
         help="Default model accessor to use for tasks",
     )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=1,
+        help="Maximum number of ready tasks to execute concurrently",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        metavar="N",
+        help="Cap the HTTP connection pool shared by all tasks of each provider",
+    )
+    parser.add_argument(
+        "--no-coalesce",
+        dest="coalesce",
+        action="store_false",
+        help="Send identical concurrent model requests separately instead of sharing one response",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream decompositions and start each subtask as soon as it is generated",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Collect concurrent model requests of one node type for MS milliseconds and send them as a batch",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=16,
+        metavar="N",
+        help="Send a batch once N requests joined it",
+    )
+    parser.add_argument(
+        "--no-wait-for-answers",
+        dest="wait_for_answers",
+        action="store_false",
+        help="Return once only tasks waiting for answers are left instead of waiting for them",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Give up on a single model request after SECONDS",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Give up on a model call, retries included, after SECONDS",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Retry timed-out, failed or retryable model calls up to N times with backoff",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a duplicate request when a call outlasts the p95 latency and use the first answer",
+    )
+    parser.add_argument(
+        "--task-retries",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Run a task that failed with a transient or retryable error again up to N times",
+    )
+    parser.add_argument(
+        "--task-retry-budget",
+        type=_retry_budget,
+        action="append",
+        default=[],
+        metavar="TYPE=N",
+        help="Retries allowed per task of one type, overriding --task-retries; repeatable",
+    )
+    parser.add_argument(
+        "--task-backoff",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="Base of the jittered exponential backoff before a task is retried",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=_rate_limit,
+        action="append",
+        default=[],
+        metavar="PROVIDER[/MODEL]=RPM[:TPM]",
+        help="Requests (and tokens) per minute allowed for a provider or one of its models; repeatable",
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=[p.value for p in SchedulingPolicy],
+        default=SchedulingPolicy.FIFO.value,
+        help="Order in which ready tasks are dispatched",
+    )
+    parser.add_argument(
+        "--journal-snapshot-every",
+        type=int,
+        metavar="N",
+        help="Journal task changes and write a full snapshot only every N tasks",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Write a checkpoint after every N finished tasks",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        metavar="SECONDS",
+        help="Also write a checkpoint once SECONDS have passed since the last one",
+    )
+    parser.add_argument(
+        "--checkpoint-background",
+        action="store_true",
+        help="Write checkpoints on a background thread, keeping only the newest pending one",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="Flush checkpoints to disk before continuing",
+    )
+    parser.add_argument(
+        "--keep-snapshots",
+        type=int,
+        metavar="N",
+        help="Delete all but the newest N snapshots (and every --keep-every-th) in the background",
+    )
+    parser.add_argument(
+        "--keep-every",
+        type=int,
+        metavar="K",
+        help="With --keep-snapshots, also keep every Kth snapshot",
+    )
+    parser.add_argument(
+        "--checkpoint-codec",
+        choices=sorted(CODECS),
+        default="json",
+        help="Snapshot format; json.zst and msgpack need the zstd and msgpack extras",
+    )
+    parser.add_argument(
+        "--spill-results",
+        type=int,
+        default=4,
+        metavar="KB",
+        help="Keep task results larger than KB kilobytes (default 4; 0 keeps all) in the run's blob store instead of in memory",
+    )
+    parser.add_argument(
+        "--response-cache",
+        metavar="PATH",
+        help="SQLite file caching model responses across runs",
+    )
+    parser.add_argument(
+        "--response-cache-mb",
+        type=int,
+        default=256,
+        help="Evict least recently used cached responses beyond this size",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        help="Record every model request and response of the run to this file",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="Replay a recorded run offline; unrecorded requests are an error",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        metavar="SCALE",
+        help="Scale recorded call durations on replay (0 = instant, 1 = as recorded)",
+    )
     return parser.parse_args()
 
 
+def answer(argv: list[str]) -> None:
+    """Answer the follow-up question of a waiting task, or list the open questions."""
+    parser = argparse.ArgumentParser(
+        prog="treeagent answer",
+        description="Answer a task waiting for input; the run picks the answer up without restarting",
+    )
+    parser.add_argument("task_id", nargs="?", help="Task to answer; omit to list the open questions")
+    parser.add_argument("text", nargs="?", help="The answer; read from stdin when omitted")
+    parser.add_argument("--checkpoint-dir", required=True, help="Checkpoint directory of the run")
+    args = parser.parse_args(argv)
+
+    inbox = AnswerInbox(Path(args.checkpoint_dir) / "answers")
+    if args.task_id is None:
+        for task_id, question in inbox.questions().items():
+            print(f"{task_id}: {question}")
+        return
+    if not inbox.asked(args.task_id):
+        raise SystemExit(f"{args.task_id} is not waiting for input in {args.checkpoint_dir}")
+    text = args.text if args.text is not None else sys.stdin.read()
+    inbox.answer(args.task_id, text)
+
+
 def main() -> None:
     """Entry point for the TreeAgent CLI."""
+    if sys.argv[1:2] == ["answer"]:
+        answer(sys.argv[2:])
+        return
     args = parse_args()
 
     default_accessor = (
         AccessorType(args.model_type) if args.model_type else None
     )
-    orchestrator = AgentOrchestrator(default_accessor_type=default_accessor)
-    if args.resume:
-        project = orchestrator.resume_project(args.resume)
-    elif args.prompt:
-        project = orchestrator.implement_project(args.prompt, checkpoint_dir=args.checkpoint_dir)
-    else:
-        raise SystemExit("Provide a prompt or --resume path")
+    for provider, model, limits in args.rate_limit:
+        RATE_LIMITERS.configure(provider, limits, model)
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, "record")
+    elif args.replay:
+        cassette = Cassette(args.replay, "replay", latency=args.replay_latency)
+    orchestrator = AgentOrchestrator(
+        default_accessor_type=default_accessor,
+        max_parallel=args.max_parallel,
+        wait_for_answers=args.wait_for_answers,
+        call_policy=CallPolicy(
+            timeout=args.timeout,
+            deadline=args.deadline,
+            max_attempts=args.retries + 1,
+            hedge=args.hedge,
+            max_connections=args.max_connections,
+            coalesce=args.coalesce,
+        ),
+        streaming_policy=StreamingPolicy(
+            stream_subtasks=args.stream,
+            batch_window=args.batch_window / 1000,
+            max_batch_size=args.max_batch_size,
+        ),
+        retry_policy=RetryPolicy(
+            max_retries=args.task_retries,
+            budgets=dict(args.task_retry_budget),
+            backoff_base=args.task_backoff,
+        ),
+        scheduling_policy=SchedulingPolicy(args.schedule),
+        checkpoint_policy=CheckpointPolicy(
+            every_n=args.checkpoint_every,
+            every_seconds=args.checkpoint_interval,
+            background=args.checkpoint_background,
+            fsync=args.fsync,
+            keep_last=args.keep_snapshots,
+            keep_every=args.keep_every,
+            codec=args.checkpoint_codec,
+            spill_bytes=args.spill_results * 1024 if args.spill_results else None,
+            journal_snapshot_every=args.journal_snapshot_every,
+        ),
+        response_cache=ResponseCache(args.response_cache, args.response_cache_mb * 1024 * 1024)
+        if args.response_cache
+        else None,
+        cassette=cassette,
+    )
+    try:
+        if args.resume:
+            project = orchestrator.resume_project(args.resume)
+        elif args.prompt:
+            project = orchestrator.implement_project(args.prompt, checkpoint_dir=args.checkpoint_dir)
+        else:
+            raise SystemExit("Provide a prompt or --resume path")
+    finally:
+        if cassette is not None:
+            cassette.close()
 
     print("Project Summary:")
     print(f"Completed Tasks: {len(project.completedTasks)}")
     print(f"In Progress Tasks: {len(project.inProgressTasks)}")
     print(f"Failed Tasks: {len(project.failedTasks)}")
     print(f"Queued Tasks: {len(project.queuedTasks)}")
+    waiting = [t for t in project.inProgressTasks if t.status is TaskStatus.PENDING_USER_INPUT]
+    if waiting and orchestrator.inbox is not None:
+        run_dir = orchestrator.inbox.directory.parent
+        print(f"Waiting for Input: {len(waiting)} (treeagent answer --checkpoint-dir {run_dir})")
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry
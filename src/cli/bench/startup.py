@@ -0,0 +1,45 @@
+"""Measure how long a cold start of the TreeAgent CLI takes."""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# modules a run only needs once one of its tasks uses that provider
+PROVIDER_MODULES = ("openai", "anthropic", "google.generativeai")
+
+_PROBE = "import sys; import src.cli; print(','.join(m for m in {mods!r} if m in sys.modules))"
+
+
+def _time(cmd: list[str]) -> tuple[float, str]:
+    start = time.perf_counter()
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - start, out.strip()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time cold starts of the TreeAgent CLI")
+    parser.add_argument("--runs", type=int, default=10, help="Number of fresh interpreters to time")
+    args = parser.parse_args(argv)
+
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "import src.cli": [sys.executable, "-c", _PROBE.format(mods=PROVIDER_MODULES)],
+        "treeagent --help": [sys.executable, "-c", "import sys; from src.cli import main; sys.argv[1:] = ['--help']; main()"],
+    }
+    loaded = ""
+    for label, cmd in commands.items():
+        times = []
+        for _ in range(args.runs):
+            elapsed, out = _time(cmd)
+            times.append(elapsed)
+            if label == "import src.cli":
+                loaded = out
+        print(f"{label:<18} min {min(times) * 1000:7.1f} ms  median {statistics.median(times) * 1000:7.1f} ms")
+    print(f"provider SDKs imported at startup: {loaded or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,28 @@ from .project_manager import (
     load_project_state,
     latest_snapshot_path,
 )
+from .task_store import TaskStore
+from .journal import ProjectJournal, replay_journal
+from .checkpointer import Checkpointer, CheckpointPolicy, CheckpointWriter
+from .answers import AnswerInbox
+from .codec import CODECS, decode_project, encode_project
+from .project_store import ProjectStore, SQLiteProjectStore, open_project_store
 
 __all__ = [
     "save_project_state",
     "load_project_state",
     "latest_snapshot_path",
+    "TaskStore",
+    "ProjectJournal",
+    "replay_journal",
+    "Checkpointer",
+    "CheckpointPolicy",
+    "CheckpointWriter",
+    "AnswerInbox",
+    "CODECS",
+    "encode_project",
+    "decode_project",
+    "ProjectStore",
+    "SQLiteProjectStore",
+    "open_project_store",
 ]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from urllib.parse import quote
+
+_QUESTION = ".question"
+_ANSWER = ".answer"
+# longest file stem kept readable; longer task ids are hashed
+_MAX_STEM = 200
+
+
+def _file_stem(task_id: str) -> str:
+    """Return the file name, without suffix, of ``task_id``'s inbox files.
+
+    Characters unsafe in a file name are percent-escaped, as is a leading
+    dot; ids too long for a file name are hashed.
+    """
+    stem = quote(task_id, safe="")
+    if stem.startswith("."):
+        stem = "%2E" + stem[1:]
+    if not stem or len(stem) > _MAX_STEM:
+        stem = hashlib.sha256(task_id.encode("utf-8")).hexdigest()
+    return stem
+
+
+class AnswerInbox:
+    """Follow-up questions and their answers, kept as files in ``directory``.
+
+    A task waiting for input leaves ``<task-id>.question``, a JSON object
+    holding its ``task_id`` and ``question``; whoever answers it drops
+    ``<task-id>.answer`` next to it, by hand or with ``treeagent answer``.
+    File names come from :func:`_file_stem`, so any task id the model makes up
+    is safe to ask with. Files are renamed into place, so a half-written
+    answer is never read. An answer stays until the task asks again, so one
+    applied just before a crash is applied again on resume.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def ask(self, task_id: str, question: str) -> None:
+        """Leave ``question`` for ``task_id``, dropping any answer to an earlier one."""
+        self._path(task_id, _ANSWER).unlink(missing_ok=True)
+        self._write(self._path(task_id, _QUESTION), json.dumps({"task_id": task_id, "question": question}))
+
+    def answer(self, task_id: str, text: str) -> Path:
+        """Drop ``text`` as the answer for ``task_id`` and return its file."""
+        path = self._path(task_id, _ANSWER)
+        self._write(path, text)
+        return path
+
+    def asked(self, task_id: str) -> bool:
+        """Whether ``task_id`` left a question."""
+        return self._path(task_id, _QUESTION).exists()
+
+    def questions(self) -> dict[str, str]:
+        """Return the questions without an answer yet, by task id."""
+        if not self.directory.is_dir():
+            return {}
+        questions: dict[str, str] = {}
+        for path in sorted(self.directory.glob(f"*{_QUESTION}")):
+            if not path.with_suffix(_ANSWER).exists():
+                asked = json.loads(path.read_text(encoding="utf-8"))
+                questions[asked["task_id"]] = asked["question"]
+        return questions
+
+    def collect(self, task_ids: list[str]) -> dict[str, str]:
+        """Return the answers dropped so far for any of ``task_ids``."""
+        answers: dict[str, str] = {}
+        for task_id in task_ids:
+            try:
+                answers[task_id] = self._path(task_id, _ANSWER).read_text(encoding="utf-8").strip()
+            except FileNotFoundError:
+                continue
+        return answers
+
+    def _path(self, task_id: str, suffix: str) -> Path:
+        return self.directory / f"{_file_stem(task_id)}{suffix}"
+
+    def _write(self, path: Path, text: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import ModelResponse
+from src.dataModel.results import LazyResults
+
+# directory of a run's blob store, next to its snapshots or database
+BLOB_DIR = "blobs"
+
+
+def content_digest(data: bytes) -> str:
+    """Return the address of ``data`` in a :class:`BlobStore`."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def fsync_dir(path: Path) -> None:
+    """Persist a rename in ``path`` (a no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class BlobStore:
+    """Content-addressed files under ``directory``.
+
+    Each blob is stored once, at ``<digest[:2]>/<digest>``, however often it
+    is put, so results repeated across tasks or runs share a file. Blobs are
+    renamed into place and never change afterwards; with ``fsync`` they are
+    flushed to disk before :meth:`put` returns, so a snapshot referring to one
+    never outlives it.
+    """
+
+    def __init__(self, directory: str | Path, *, fsync: bool = False) -> None:
+        self.directory = Path(directory)
+        self.fsync = fsync
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its digest."""
+        digest = content_digest(data)
+        path = self._path(digest)
+        if path.exists():
+            return digest
+        new_shard = not path.parent.is_dir()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            if self.fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        tmp.replace(path)
+        if self.fsync:
+            # the rename (and a new shard directory) must be durable before a snapshot refers to it
+            fsync_dir(path.parent)
+            if new_shard:
+                fsync_dir(self.directory)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return the blob stored under ``digest``."""
+        return self._path(digest).read_bytes()
+
+    def __contains__(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def _path(self, digest: str) -> Path:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"invalid blob digest {digest!r}")
+        return self.directory / digest[:2] / digest
+
+
+def find_result(results: Mapping[str, ModelResponse], response: ModelResponse | None) -> str | None:
+    """Return the id whose result is ``response``, without loading results not in memory.
+
+    :attr:`LazyResults.latest` is checked first, so this is a lookup rather
+    than a search in the usual case; otherwise the newest results are tried
+    first. A spilled result is read back as a new object each time, so it is
+    matched by the digest of ``response`` instead of by identity.
+    """
+    if response is None:
+        return None
+    lazy = results if isinstance(results, LazyResults) else None
+    digest: str | None = None
+
+    def holds(task_id: str) -> bool:
+        nonlocal digest
+        if lazy is None:
+            return results.get(task_id) is response
+        spilled = lazy.spilled(task_id)
+        if spilled is None:
+            # placeholders of results not loaded are None
+            return dict.get(lazy, task_id) is response
+        if digest is None:
+            digest = content_digest(RESPONSE_ADAPTER.dump_json(response))
+        return spilled == digest
+
+    if lazy is not None and (latest := lazy.latest) is not None and latest in lazy and holds(latest):
+        return latest
+    # latestResponse was set without going through the mapping
+    return next((task_id for task_id in reversed(list(results)) if holds(task_id)), None)
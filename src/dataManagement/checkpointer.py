@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.dataManagement.journal import ProjectJournal, apply_changes
+from src.dataManagement.project_manager import prune_snapshots
+from src.dataManagement.project_store import ProjectStore
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.project import Project
+
+
+class CheckpointPolicy(BaseModel):
+    """When and how the orchestrator persists a run.
+
+    A checkpoint is due after ``every_n`` finished tasks or once
+    ``every_seconds`` have passed since the last one, whichever comes first;
+    leaving ``every_seconds`` unset with ``every_n=1`` (the default) writes
+    after every task. The end of a run is always written and waited for.
+
+    Durability: a crash loses at most the tasks finished since the last due
+    checkpoint. With ``background`` the loop does not wait for the disk, so the
+    checkpoints still queued in the writer are lost as well; only the newest of
+    those would have been written anyway. The writer snapshots a copy of the
+    project that it brings up to date from the changes of each checkpoint, so
+    the loop never copies the whole project. Snapshots are renamed into place, so
+    a crash never leaves a torn snapshot. Without ``fsync`` written data sits
+    in the OS cache and survives a crash of the process but not a power loss.
+
+    Retention: with ``keep_last`` only the newest ``keep_last`` snapshots, plus
+    every ``keep_every``th one, are kept; older ones and their journals are
+    deleted on a background thread after each snapshot.
+
+    ``codec`` names the snapshot format, see :data:`src.dataManagement.codec.CODECS`.
+    With ``journal_snapshot_every`` checkpoints append the changes of their
+    tasks to a journal and only every Nth one writes a full snapshot.
+
+    Spilling: results whose content and artifacts exceed ``spill_bytes``
+    characters (4 KB unless set; None keeps every result in the project) are
+    written once to the run's content-addressed ``blobs`` directory; the
+    project, and so every snapshot, keeps only their digest.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    every_n: int | None = Field(default=1, ge=1)
+    every_seconds: float | None = Field(default=None, gt=0)
+    background: bool = False
+    fsync: bool = False
+    keep_last: int | None = Field(default=None, ge=1)
+    keep_every: int | None = Field(default=None, ge=1)
+    codec: str = "json"
+    spill_bytes: int | None = Field(default=4096, ge=1)
+    journal_snapshot_every: int | None = Field(default=None, ge=1)
+
+    def due(self, finished: int, elapsed: float) -> bool:
+        """Whether ``finished`` tasks over ``elapsed`` seconds warrant a checkpoint."""
+        if self.every_n is not None and finished >= self.every_n:
+            return True
+        return self.every_seconds is not None and elapsed >= self.every_seconds
+
+
+class CheckpointWriter:
+    """Run checkpoint writes in order on a background thread.
+
+    Submitting a job that ``supersedes`` its predecessors (a full snapshot)
+    drops the jobs still waiting, so a burst of snapshots collapses into the
+    newest one. An error raised by a job is re-raised by the next
+    :meth:`submit` or :meth:`close`.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: list[Callable[[], None]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: BaseException | None = None
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name="treeagent-checkpoint", daemon=True)
+        self._thread.start()
+
+    def submit(self, job: Callable[[], None], supersedes: bool = False) -> None:
+        with self._cond:
+            self._raise_error()
+            if supersedes:
+                self.coalesced += len(self._jobs)
+                self._jobs.clear()
+            self._jobs.append(job)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Write the remaining jobs and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        with self._cond:
+            self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs or self._closed)
+                if not self._jobs:
+                    return
+                jobs, self._jobs = self._jobs, []
+            try:
+                for job in jobs:
+                    job()
+            except BaseException as exc:  # noqa: BLE001 - handed to the orchestrator
+                with self._cond:
+                    self._error = exc
+
+
+class Checkpointer:
+    """Persist the state of a :class:`TaskStore` during one run.
+
+    Each call to :meth:`checkpoint` marks a finished task; ``policy`` decides
+    whether it is written. Writes are full snapshots made with ``save``, or,
+    with the policy's ``journal_snapshot_every``, journal appends with a full
+    snapshot only every Nth write. With a ``backend`` :class:`ProjectStore` the project is
+    saved to it once and every later write applies just the drained changes;
+    the store is closed with the checkpointer.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        directory: Path,
+        save: Callable[[Project, Path], Path],
+        policy: CheckpointPolicy | None = None,
+        backend: ProjectStore | None = None,
+    ) -> None:
+        self.store = store
+        self.directory = directory
+        self.policy = policy or CheckpointPolicy()
+        self._save = save
+        self._snapshot_every = self.policy.journal_snapshot_every
+        self.backend = backend
+        snapshots = backend is None
+        self.journal = ProjectJournal(fsync=self.policy.fsync) if self._snapshot_every and snapshots else None
+        self._writer = CheckpointWriter() if self.policy.background else None
+        # the writer's own copy of the project, which it snapshots; the loop
+        # hands it the drained changes rather than a copy per snapshot
+        self._mirror: TaskStore | None = None
+        self._pending: list[dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        if self._writer is not None and snapshots:
+            store.track_changes = True
+            store.drain_changes()  # already in the copy
+            copy = store.sync().model_copy(deep=True)
+            self._mirror = TaskStore(copy, blobs=store.blobs, spill_bytes=store.spill_bytes)
+        # deletes old snapshots off the checkpoint path; a newer prune supersedes queued ones
+        self._pruner = CheckpointWriter() if self.policy.keep_last and snapshots else None
+        self._finished = 0
+        self._last = time.monotonic()
+        self._appends: int | None = None  # since the last snapshot; None before the first
+
+    def checkpoint(self, final: bool = False, force: bool = False) -> None:
+        """Note a finished task and write a checkpoint if one is due.
+
+        ``force`` writes one now whatever the policy says, e.g. before the run
+        waits for a user. ``final`` always writes, a full snapshot unless
+        there is a backend, waits for it and releases the writer thread,
+        journal and backend.
+        """
+        self._finished += 1
+        now = time.monotonic()
+        if not (final or force) and not self.policy.due(self._finished, now - self._last):
+            return
+        self._finished = 0
+        self._last = now
+
+        if self.backend is not None:
+            self._store_changes()
+            if final:
+                # appends leave the project's lists stale; callers get the final state
+                self.store.sync()
+        elif (
+            self.journal is None
+            or final
+            or self._appends is None
+            or self._appends >= (self._snapshot_every or 1)
+        ):
+            changes = self.store.drain_changes()
+            self._appends = 0
+            if self._mirror is None:
+                self._write(partial(self._snapshot, self.store.sync(), final), supersedes=True)
+            else:
+                self._hand_over(changes)
+                self._write(partial(self._snapshot_mirror, final), supersedes=True)
+                if final:
+                    self.store.sync()
+        else:
+            self._appends += 1
+            changes = self.store.drain_changes()
+            self._hand_over(changes)
+            self._write(partial(self.journal.append, changes))
+        if final:
+            self.close()
+
+    def _store_changes(self) -> None:
+        assert self.backend is not None
+        changes = self.store.drain_changes()
+        if self._appends is not None:
+            self._write(partial(self.backend.append, changes))
+            return
+        # the first write of a run replaces whatever the store held, e.g. the
+        # state a resumed run was loaded from before its tasks were requeued
+        project = self.store.sync()
+        if self._writer is not None:
+            project = project.model_copy(deep=True)
+        self._appends = 0
+        self._write(partial(self.backend.save, project), supersedes=True)
+
+    def close(self) -> None:
+        """Finish pending writes and release the writer thread and journal."""
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            if self._pruner is not None:
+                self._pruner.close()
+            if self.backend is not None:
+                self.backend.close()
+
+    def _write(self, job: Callable[[], None], supersedes: bool = False) -> None:
+        if self._writer is None:
+            job()
+        else:
+            self._writer.submit(job, supersedes)
+
+    def _hand_over(self, changes: list[dict[str, Any]]) -> None:
+        """Queue ``changes`` for the writer's copy of the project."""
+        if self._mirror is not None:
+            with self._pending_lock:
+                self._pending.extend(changes)
+
+    def _snapshot_mirror(self, final: bool) -> None:
+        # a snapshot superseding queued ones still applies their changes
+        assert self._mirror is not None
+        with self._pending_lock:
+            changes, self._pending = self._pending, []
+        apply_changes(self._mirror, changes)
+        self._snapshot(self._mirror.sync(), final)
+
+    def _snapshot(self, project: Project, final: bool) -> None:
+        path = self._save(project, self.directory)
+        if self.journal is not None:
+            if final:
+                self.journal.close()
+            else:
+                self.journal.rotate(path)
+        if self._pruner is not None:
+            self._pruner.submit(self._prune, supersedes=True)
+
+    def _prune(self) -> None:
+        assert self.policy.keep_last is not None
+        prune_snapshots(self.directory, self.policy.keep_last, self.policy.keep_every)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import gzip
+import json
+from collections.abc import Callable
+from typing import Any
+
+from src.dataManagement.blobs import find_result
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import DecomposedResponse, ModelResponse
+from src.dataModel.project import Project
+from src.dataModel.results import LazyResults
+from src.dataModel.task import Task
+
+try:  # optional: only used when selected, see ``CODECS``
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+try:  # optional: only used when selected, see ``CODECS``
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# marks a snapshot written in the normalized layout, see ``normalize``
+LAYOUT = "treeagent/normalized-1"
+
+_LISTS = ("failedTasks", "completedTasks", "inProgressTasks", "queuedTasks")
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class Codec:
+    """Turns a snapshot's plain data into bytes and back.
+
+    ``suffix`` is the file suffix of snapshots written with the codec; it is
+    informational only, :func:`decode` tells codecs apart by their content.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        suffix: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        requires: str | None = None,
+    ) -> None:
+        self.name = name
+        self.suffix = suffix
+        self._dumps = dumps
+        self._loads = loads
+        self.requires = requires
+
+    @property
+    def available(self) -> bool:
+        """Whether the package the codec needs is installed."""
+        if self.requires == "msgpack":
+            return msgpack is not None
+        if self.requires == "zstandard":
+            return zstandard is not None
+        return True
+
+    def encode(self, data: Any) -> bytes:
+        if not self.available:
+            raise RuntimeError(f"the {self.name} checkpoint codec needs the {self.requires} package")
+        return self._dumps(data)
+
+    def decode(self, payload: bytes) -> Any:
+        if not self.available:
+            raise RuntimeError(f"reading this snapshot needs the {self.requires} package")
+        return self._loads(payload)
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _zstd_dumps(data: Any) -> bytes:
+    return zstandard.ZstdCompressor().compress(_json_dumps(data))
+
+
+def _zstd_loads(payload: bytes) -> Any:
+    return json.loads(zstandard.ZstdDecompressor().decompress(payload))
+
+
+CODECS: dict[str, Codec] = {
+    codec.name: codec
+    for codec in (
+        Codec("json", ".json", _json_dumps, json.loads),
+        # mtime=0 keeps the bytes of equal snapshots equal
+        Codec(
+            "json.gz",
+            ".json.gz",
+            lambda data: gzip.compress(_json_dumps(data), mtime=0),
+            lambda payload: json.loads(gzip.decompress(payload)),
+        ),
+        Codec("json.zst", ".json.zst", _zstd_dumps, _zstd_loads, requires="zstandard"),
+        Codec(
+            "msgpack",
+            ".msgpack",
+            lambda data: msgpack.packb(data),
+            lambda payload: msgpack.unpackb(payload, strict_map_key=False),
+            requires="msgpack",
+        ),
+    )
+}
+
+
+def get_codec(name: str) -> Codec:
+    """Return the codec called ``name``."""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown checkpoint codec {name!r}; choose from {', '.join(CODECS)}") from None
+
+
+def detect_codec(payload: bytes) -> Codec:
+    """Return the codec ``payload`` was written with, judging by its first bytes."""
+    if payload.startswith(_GZIP_MAGIC):
+        return CODECS["json.gz"]
+    if payload.startswith(_ZSTD_MAGIC):
+        return CODECS["json.zst"]
+    if payload.lstrip()[:1] in (b"{", b"["):
+        return CODECS["json"]
+    return CODECS["msgpack"]
+
+
+def encode_project(project: Project, codec: str = "json") -> bytes:
+    """Serialize ``project`` in the normalized layout with ``codec``."""
+    return get_codec(codec).encode(normalize(project))
+
+
+def decode_project(
+    payload: bytes, *, lazy: bool = False, blobs: Callable[[str], bytes] | None = None
+) -> Project:
+    """Load a project written by any codec, in either layout.
+
+    With ``lazy`` the task results are validated on first access, see
+    :class:`LazyResults`; only the tasks themselves are validated up front.
+    Results spilled to a blob store are read with ``blobs``.
+    """
+    data = detect_codec(payload).decode(payload)
+    if isinstance(data, dict) and data.get("layout") == LAYOUT:
+        return denormalize(data, lazy=lazy, blobs=blobs)
+    project = Project.model_validate({**data, "taskResults": {}})
+    project.taskResults = LazyResults(data.get("taskResults") or {}, _validate, blobs)
+    return project if lazy else materialize(project)
+
+
+def materialize(project: Project) -> Project:
+    """Load every task result of ``project`` into a plain dict."""
+    if isinstance(project.taskResults, LazyResults):
+        project.taskResults = dict(project.taskResults.items())
+    return project
+
+
+def _validate(task_id: str, stored: Any) -> ModelResponse:
+    return RESPONSE_ADAPTER.validate_python(stored)
+
+
+def normalize(project: Project) -> dict[str, Any]:
+    """Return ``project`` as plain data that stores each task once.
+
+    ``project.model_dump()`` repeats a task in its list, as the root task and
+    in the decomposed response that created it. Here tasks live in one
+    ``tasks`` table keyed by id, and the lists, the root task and the
+    subtasks of decomposed responses refer to them by id. A subtask that is
+    not the task in the table (one the spawn rules dropped) is kept inline.
+    """
+    tasks: dict[str, Task] = {}
+    lists: dict[str, list[str]] = {}
+    for name in _LISTS:
+        ids = lists[name] = []
+        for task in getattr(project, name):
+            tasks.setdefault(task.id, task)
+            ids.append(task.id)
+
+    def ref(task: Task) -> dict[str, Any]:
+        known = tasks.get(task.id)
+        if known is not None and (known is task or known == task):
+            return {"ref": task.id}
+        return task.model_dump(mode="json")
+
+    results: dict[str, Any] = {}
+    lazy = project.taskResults if isinstance(project.taskResults, LazyResults) else None
+    for task_id in project.taskResults:
+        stored = lazy.stored(task_id) if lazy is not None else None
+        if stored is not None:
+            # not loaded (or spilled): still in the form it was read in, which is valid here too
+            results[task_id] = json.loads(stored) if isinstance(stored, str) else stored
+        else:
+            results[task_id] = _response(project.taskResults[task_id], ref)
+    latest: Any = None
+    if project.latestResponse is not None:
+        latest_id = find_result(project.taskResults, project.latestResponse)
+        latest = {"ref": latest_id} if latest_id is not None else _response(project.latestResponse, ref)
+
+    return {
+        "layout": LAYOUT,
+        "tasks": {task_id: task.model_dump(mode="json") for task_id, task in tasks.items()},
+        "rootTask": ref(project.rootTask),
+        **lists,
+        "taskResults": results,
+        "latestResponse": latest,
+    }
+
+
+def _response(response: ModelResponse, ref: Callable[[Task], dict[str, Any]]) -> dict[str, Any]:
+    if isinstance(response, DecomposedResponse):
+        data = response.model_dump(mode="json", exclude={"subtasks"})
+        data["subtasks"] = [ref(task) for task in response.subtasks]
+        return data
+    return response.model_dump(mode="json")
+
+
+def denormalize(
+    data: dict[str, Any], *, lazy: bool = False, blobs: Callable[[str], bytes] | None = None
+) -> Project:
+    """Rebuild the project stored by :func:`normalize`, sharing one object per task.
+
+    With ``lazy`` the results are validated on first access. Results spilled
+    to a blob store are read with ``blobs``.
+    """
+    tasks = {task_id: Task.model_validate(task) for task_id, task in data["tasks"].items()}
+
+    def task(item: dict[str, Any]) -> Any:
+        return tasks[item["ref"]] if "ref" in item else item
+
+    def response(item: dict[str, Any], task: Callable[[dict[str, Any]], Any] = task) -> dict[str, Any]:
+        if "subtasks" in item:
+            item = {**item, "subtasks": [task(sub) for sub in item["subtasks"]]}
+        return item
+
+    def dumped(task_id: str, item: dict[str, Any]) -> dict[str, Any]:
+        return response(item, lambda sub: tasks[sub["ref"]].model_dump(mode="json") if "ref" in sub else sub)
+
+    latest = data.get("latestResponse")
+    latest_ref = latest.get("ref") if isinstance(latest, dict) else None
+    project = Project.model_validate(
+        {
+            "rootTask": task(data["rootTask"]),
+            **{name: [tasks[task_id] for task_id in data[name]] for name in _LISTS},
+            "latestResponse": None if latest is None or latest_ref is not None else response(latest),
+        }
+    )
+    project.taskResults = LazyResults(
+        data["taskResults"], lambda task_id, item: RESPONSE_ADAPTER.validate_python(response(item)), blobs, dump=dumped
+    )
+    project.taskResults.latest = latest_ref
+    if not lazy:
+        materialize(project)
+    if latest_ref is not None:
+        project.latestResponse = project.taskResults[latest_ref]
+    return project
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import DecomposedResponse
+from src.dataModel.project import Project
+from src.dataModel.results import blob_digest
+from src.dataModel.task import Task, TaskStatus
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path(snapshot: str | Path) -> Path:
+    """Return the journal holding the changes made after ``snapshot``."""
+    path = Path(snapshot)
+    return path.with_name(path.name.split(".")[0] + JOURNAL_SUFFIX)
+
+
+class ProjectJournal:
+    """Append-only log of task transitions between full snapshots.
+
+    Each checkpoint appends one compact JSON line per change drained from a
+    :class:`TaskStore`, so its cost depends on what changed rather than on the
+    size of the project. After each full snapshot the caller calls
+    :meth:`rotate`, which starts a new journal next to it and bounds how much
+    has to be replayed on resume. With ``fsync`` appends survive power loss,
+    not just a crash of the process.
+    """
+
+    def __init__(self, fsync: bool = False) -> None:
+        self.fsync = fsync
+        self.path: Path | None = None
+        self._fh: IO[str] | None = None
+
+    def rotate(self, snapshot: str | Path) -> None:
+        """Start journaling the changes made after ``snapshot``."""
+        self.close()
+        self.path = journal_path(snapshot)
+        self._fh = open(self.path, "a", encoding="utf-8")  # noqa: SIM115 - held until the next rotate
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        """Append ``records`` and flush them to the operating system."""
+        if self._fh is None:
+            raise RuntimeError("journal has no snapshot; call rotate() first")
+        self._fh.writelines(json.dumps(rec, separators=(",", ":")) + "\n" for rec in records)
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def replay_journal(project: Project, path: str | Path) -> Project:
+    """Apply the records of the journal at ``path`` to ``project``.
+
+    A torn last line, left by a crash in the middle of an append, ends the
+    replay instead of failing it.
+    """
+    store = TaskStore(project)
+    with open(path, encoding="utf-8") as fh:
+        apply_changes(store, _records(fh))
+    return store.sync()
+
+
+def apply_changes(store: TaskStore, records: Iterable[dict[str, Any]]) -> None:
+    """Apply change records of :meth:`TaskStore.drain_changes` to ``store``."""
+    decomposed: list[tuple[str, DecomposedResponse]] = []
+    for rec in records:
+        match rec["op"]:
+            case "add":
+                store.add([Task.model_validate(rec["task"])])
+            case "status":
+                task = store.get(rec["id"])
+                if task is not None:
+                    store.set_status(task, TaskStatus(rec["status"]))
+            case "description":
+                task = store.get(rec["id"])
+                if task is not None:
+                    store.set_description(task, rec["description"])
+            case "result":
+                digest = blob_digest(rec["response"])
+                if digest is not None:
+                    store.set_spilled(rec["id"], digest)
+                    continue
+                response = RESPONSE_ADAPTER.validate_python(rec["response"])
+                store.set_result(rec["id"], response)
+                if isinstance(response, DecomposedResponse):
+                    decomposed.append((rec["id"], response))
+
+    # results were serialized when drained; point decomposed results at the
+    # live subtasks so they carry the same state a snapshot would
+    for task_id, response in decomposed:
+        response.subtasks = [_live(store, task_id, sub) for sub in response.subtasks]
+
+
+def _records(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            return
+
+
+def _live(store: TaskStore, parent_id: str, sub: Task) -> Task:
+    task = store.get(sub.id)
+    return task if task is not None and task.parent_id == parent_id else sub
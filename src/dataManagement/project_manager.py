@@ -1,60 +1,163 @@
 from __future__ import annotations
 
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 import uuid
 
+from src.dataManagement.blobs import BLOB_DIR, BlobStore, fsync_dir
+from src.dataManagement.codec import CODECS, decode_project, encode_project, get_codec, materialize
+from src.dataManagement.journal import journal_path, replay_journal
 from src.dataModel.project import Project
+from src.dataModel.task import TaskStatus
 
+# names the newest snapshot of a checkpoint directory and its sequence number
+MANIFEST = "LATEST"
 
-def save_project_state(project: Project, directory: str | Path) -> Path:
+
+def save_project_state(
+    project: Project, directory: str | Path, *, fsync: bool = False, codec: str = "json"
+) -> Path:
     """Save ``project`` to ``directory`` with a timestamped filename.
 
-    Filename pattern (new): YYYYMMDDHHMMSSmmm-<uuid>.json where mmm = milliseconds.
-    This guarantees uniqueness even for multiple snapshots within the same second.
+    Filename pattern (new): YYYYMMDDHHMMSSmmm-<seq>-<uuid><suffix> where mmm =
+    milliseconds, seq counts the snapshots of the directory and the suffix
+    names the ``codec`` (``.json``, ``.json.gz``, ...). This guarantees
+    uniqueness even for multiple snapshots within the same second.
+    Snapshots use the normalized layout of :mod:`src.dataManagement.codec`.
+    The file is renamed into place, so readers never see a partial snapshot,
+    and then recorded in the ``LATEST`` manifest; with ``fsync`` both are
+    also flushed to disk before this returns.
     """
+    encoder = get_codec(codec)
     dir_path = Path(directory)
     dir_path.mkdir(parents=True, exist_ok=True)
 
+    manifest = _read_manifest(dir_path)
+    seq = manifest[1] + 1 if manifest else 1
     now = datetime.utcnow()
     # 14 digits for seconds + 3 digits for milliseconds
     timestamp = now.strftime("%Y%m%d%H%M%S") + f"{now.microsecond // 1000:03d}"
     unique_id = uuid.uuid4().hex
-    file_path = dir_path / f"{timestamp}-{unique_id}.json"
-    tmp = file_path.with_suffix(file_path.suffix + ".tmp")
-    tmp.write_text(json.dumps(project.model_dump(), indent=2), encoding="utf-8")
-    tmp.replace(file_path)
+    file_path = dir_path / f"{timestamp}-{seq:06d}-{unique_id}{encoder.suffix}"
+    _write_atomic(file_path, encode_project(project, codec), fsync)
+    manifest_data = json.dumps({"snapshot": file_path.name, "seq": seq}).encode("utf-8")
+    _write_atomic(dir_path / MANIFEST, manifest_data, fsync)
+    if fsync:
+        fsync_dir(dir_path)
     return file_path
 
 
-def load_project_state(file_path: str | Path) -> Project:
-    """Load a :class:`Project` from ``file_path``."""
-    data = json.loads(Path(file_path).read_text(encoding="utf-8"))
-    project = Project.model_validate(data)
+def _write_atomic(path: Path, data: bytes, fsync: bool) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        if fsync:
+            fh.flush()
+            os.fsync(fh.fileno())
+    tmp.replace(path)
+
+
+def _read_manifest(directory: Path) -> tuple[str, int] | None:
+    """Return the snapshot name and sequence number recorded in ``directory``'s manifest."""
+    try:
+        data = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+        return str(data["snapshot"]), int(data["seq"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _snapshots(directory: Path) -> list[Path]:
+    """Return the snapshot files of ``directory``, whatever their codec."""
+    suffixes = tuple(codec.suffix for codec in CODECS.values())
+    return [path for path in directory.iterdir() if path.name.endswith(suffixes)]
+
+
+def _sequence(snapshot: Path) -> int | None:
+    """Return the sequence number in the name of ``snapshot``, None for older names."""
+    parts = snapshot.name.split(".")[0].split("-")
+    return int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else None
+
+
+def prune_snapshots(directory: str | Path, keep_last: int, keep_every: int | None = None) -> list[Path]:
+    """Delete old snapshots of ``directory`` with their journals and return them.
+
+    The newest ``keep_last`` snapshots are kept, and so is every
+    ``keep_every``th one by sequence number, so a long run keeps a sparse
+    history. The snapshot named by the manifest and snapshots without a
+    sequence number (written before it existed) are never deleted.
+    """
+    if keep_last < 1:
+        raise ValueError("keep_last must be >= 1")
+    dir_path = Path(directory)
+    manifest = _read_manifest(dir_path)
+    numbered = sorted(
+        (seq, path) for path in _snapshots(dir_path) if (seq := _sequence(path)) is not None
+    )
+    deleted: list[Path] = []
+    for seq, path in numbered[:-keep_last]:
+        if (keep_every and seq % keep_every == 0) or (manifest and path.name == manifest[0]):
+            continue
+        journal_path(path).unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        deleted.append(path)
+    return deleted
+
+
+def load_project_state(file_path: str | Path, *, lazy: bool = True) -> Project:
+    """Load a :class:`Project` from ``file_path``.
+
+    The codec and layout are detected from the content, so snapshots written
+    with any codec, and older pretty-printed ones, load alike. Changes
+    journaled after the snapshot are replayed on top of it. With ``lazy``
+    (the default) task results are validated only when they are first read,
+    but are still held as parsed JSON; only results spilled to the run's
+    ``blobs`` store (large ones, by default) stay on disk until read.
+    """
+    blobs = BlobStore(Path(file_path).parent / BLOB_DIR)
+    project = decode_project(Path(file_path).read_bytes(), lazy=True, blobs=blobs.get)
+    journal = journal_path(file_path)
+    if journal.exists():
+        project = replay_journal(project, journal)
+    return requeue_interrupted(project if lazy else materialize(project))
+
+
+def requeue_interrupted(project: Project) -> Project:
+    """Queue the in-progress tasks of a loaded ``project`` to run again.
+
+    Tasks might have been mid-flight when the state was saved; they are
+    restarted, but those waiting for a user's answer are left waiting.
+    """
     if project.inProgressTasks:
-        # tasks might have been mid-flight when the snapshot was taken; restart them
-        project.queuedTasks = project.inProgressTasks + project.queuedTasks
-        project.inProgressTasks = []
+        restart = [t for t in project.inProgressTasks if t.status is not TaskStatus.PENDING_USER_INPUT]
+        project.queuedTasks = restart + project.queuedTasks
+        project.inProgressTasks = [t for t in project.inProgressTasks if t.status is TaskStatus.PENDING_USER_INPUT]
     return project
 
 
 def latest_snapshot_path(directory: str | Path) -> Path:
     """Return the most recent snapshot file in ``directory``.
 
-    Supports both old filenames (YYYYMMDDHHMMSS.json) and new filenames
-    (YYYYMMDDHHMMSSmmm-<uuid>.json). Selection is based on the embedded
-    timestamp (to millisecond precision when available), with file mtime as a
-    secondary tie-breaker.
+    Reads the ``LATEST`` manifest, so the cost does not grow with the number
+    of snapshots. Directories without one are scanned instead, supporting
+    both old filenames (YYYYMMDDHHMMSS.json) and new filenames
+    (YYYYMMDDHHMMSSmmm-[<seq>-]<uuid>.json). Selection is then based on the
+    embedded timestamp (to millisecond precision when available), with file
+    mtime as a secondary tie-breaker.
     """
     dir_path = Path(directory)
-    snapshots = list(dir_path.glob("*.json"))
+    manifest = _read_manifest(dir_path)
+    if manifest is not None and (dir_path / manifest[0]).exists():
+        return dir_path / manifest[0]
+    snapshots = _snapshots(dir_path) if dir_path.is_dir() else []
     if not snapshots:
         raise FileNotFoundError(f"no snapshot in {directory}")
 
     def sort_key(p: Path) -> tuple[float, float]:
-        stem = p.stem  # without .json
+        stem = p.name.split(".")[0]  # without .json, .json.gz, ...
         ts_part = stem.split("-")[0]
+        mtime = p.stat().st_mtime
         try:
             if len(ts_part) == 17:  # seconds (14) + ms (3)
                 base = datetime.strptime(ts_part[:14], "%Y%m%d%H%M%S")
@@ -68,10 +171,10 @@ def latest_snapshot_path(directory: str | Path) -> Path:
                 micros = int(ts_part[14:20])
                 ts = base.timestamp() + micros / 1_000_000.0
             else:
-                ts = p.stat().st_mtime
-        except (ValueError, OSError):
-            ts = p.stat().st_mtime
-        return (ts, p.stat().st_mtime)
+                ts = mtime
+        except ValueError:
+            ts = mtime
+        return (ts, mtime)
 
     snapshots.sort(key=sort_key)
     return snapshots[-1]
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+from src.dataManagement.blobs import BLOB_DIR, BlobStore, find_result
+from src.dataManagement.codec import materialize
+from src.dataManagement.task_store import STATUS_LISTS
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import DecomposedResponse, ModelResponse, ModelResponseType
+from src.dataModel.project import Project
+from src.dataModel.results import UNREAD, LazyResults, blob_digest, blob_ref
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+SQLITE_SCHEME = "sqlite:///"
+
+# the project lists, in the order their tasks are numbered by ``save``
+_LISTS = tuple(dict.fromkeys(STATUS_LISTS.values()))
+
+
+class ProjectStore(ABC):
+    """A database holding the state of one project.
+
+    Unlike a directory of snapshots, a store is updated in place: the first
+    checkpoint of a run calls :meth:`save` with the whole project and every
+    later one calls :meth:`append` with the records drained from a
+    :class:`TaskStore`, so a checkpoint costs what changed since the last one.
+    ``directory`` holds the files of the run kept next to the store, such as
+    its answer inbox.
+    """
+
+    directory: Path
+
+    @abstractmethod
+    def save(self, project: Project) -> None:
+        """Replace the stored project with ``project``."""
+
+    @abstractmethod
+    def append(self, records: list[dict[str, Any]]) -> None:
+        """Apply the change records of :meth:`TaskStore.drain_changes`."""
+
+    @abstractmethod
+    def load(self) -> Project:
+        """Return the stored project."""
+
+    def close(self) -> None:
+        """Release the store; further calls are not allowed."""
+
+
+def open_project_store(location: str | Path, *, fsync: bool = False) -> ProjectStore | None:
+    """Return the store a checkpoint ``location`` names, or None for a snapshot directory.
+
+    ``sqlite:///path/to/project.db`` selects :class:`SQLiteProjectStore`
+    (``sqlite:////abs/path.db`` for an absolute path); anything without a
+    scheme is a directory of snapshots.
+    """
+    location = str(location)
+    if "://" not in location:
+        return None
+    if location.startswith(SQLITE_SCHEME) and len(location) > len(SQLITE_SCHEME):
+        return SQLiteProjectStore(location[len(SQLITE_SCHEME) :], fsync=fsync)
+    raise ValueError(f"unsupported project store URL {location!r}; expected {SQLITE_SCHEME}PATH")
+
+
+class SQLiteProjectStore(ProjectStore):
+    """Keep a project in SQLite, one row per task and per result.
+
+    Tasks are indexed by status and type and by parent, so :meth:`find`
+    answers questions such as "failed IMPLEMENT tasks under X" without
+    loading the project. Each :meth:`append` is one transaction; a crash
+    leaves the state of the last complete checkpoint. :meth:`load` reads
+    only the ids of the results; a result body is read when the result is,
+    so the project must not be replaced under a loaded one. Without ``fsync`` the
+    database runs with ``synchronous=NORMAL`` and may lose the last
+    checkpoints on power loss, but not on a crash of the process. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: str | Path, *, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.directory = self.path.parent
+        self.blobs = self.directory / BLOB_DIR
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                parent_id TEXT,
+                type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                list TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status_type ON tasks (status, type);
+            CREATE INDEX IF NOT EXISTS tasks_parent ON tasks (parent_id);
+            CREATE INDEX IF NOT EXISTS tasks_list ON tasks (list, seq);
+            CREATE TABLE IF NOT EXISTS results (
+                task_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL DEFAULT 'inline',
+                body TEXT NOT NULL
+            );
+            """
+        )
+        if "kind" not in {row[1] for row in self._db.execute("PRAGMA table_info(results)")}:
+            # stores written before results could spill: blob references were inline JSON
+            self._db.executescript(
+                """
+                BEGIN;
+                ALTER TABLE results ADD COLUMN kind TEXT NOT NULL DEFAULT 'inline';
+                UPDATE results SET kind = 'blob', body = json_extract(body, '$.blob')
+                    WHERE json_valid(body) AND json_type(body, '$.blob') = 'text'
+                    AND (SELECT COUNT(*) FROM json_each(body)) = 1;
+                COMMIT;
+                """
+            )
+        # orders each project list: a task moved to another list goes to its end
+        self._seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM tasks").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._transaction() as db:
+            return db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def save(self, project: Project) -> None:
+        results = project.taskResults
+        latest = find_result(results, project.latestResponse)
+        # rows of results loaded from this store and never read stay as they are
+        kept: list[str] = []
+        rows: list[tuple[str, str, str]] = []
+        for task_id in results:
+            if self._owns(results, task_id):
+                kept.append(task_id)
+            else:
+                rows.append((task_id, *_result_row(results, task_id)))
+        with self._transaction() as db:
+            db.execute("DELETE FROM tasks")
+            db.execute("DELETE FROM results WHERE task_id NOT IN (SELECT value FROM json_each(?))", (json.dumps(kept),))
+            db.execute("DELETE FROM meta")
+            db.execute("INSERT INTO meta VALUES ('root', ?)", (project.rootTask.model_dump_json(),))
+            for name in _LISTS:
+                db.executemany(
+                    "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (t.id, t.parent_id, t.type.value, t.status.value, name, self._next_seq(), t.model_dump_json())
+                        for t in getattr(project, name)
+                    ],
+                )
+            db.executemany("INSERT OR REPLACE INTO results (task_id, kind, body) VALUES (?, ?, ?)", rows)
+            if latest is not None:
+                db.execute("INSERT INTO meta VALUES ('latest', ?)", (latest,))
+            elif project.latestResponse is not None:
+                db.execute(
+                    "INSERT INTO meta VALUES ('latest_response', ?)",
+                    (RESPONSE_ADAPTER.dump_json(project.latestResponse).decode(),),
+                )
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        with self._transaction() as db:
+            for rec in records:
+                match rec["op"]:
+                    case "add":
+                        task = rec["task"]
+                        # like TaskStore.add: a new task joins the queue
+                        db.execute(
+                            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                task["id"],
+                                task.get("parent_id"),
+                                task["type"],
+                                TaskStatus.PENDING.value,
+                                STATUS_LISTS[TaskStatus.PENDING],
+                                self._next_seq(),
+                                json.dumps(task),
+                            ),
+                        )
+                    case "status":
+                        name = STATUS_LISTS[TaskStatus(rec["status"])]
+                        db.execute(
+                            "UPDATE tasks SET status = ?, list = ?,"
+                            " seq = CASE WHEN list = ? THEN seq ELSE ? END WHERE id = ?",
+                            (rec["status"], name, name, self._next_seq(), rec["id"]),
+                        )
+                    case "description":
+                        db.execute(
+                            "UPDATE tasks SET body = json_set(body, '$.description', ?) WHERE id = ?",
+                            (rec["description"], rec["id"]),
+                        )
+                    case "result":
+                        db.execute(
+                            "INSERT INTO results (task_id, kind, body) VALUES (?, ?, ?)"
+                            " ON CONFLICT (task_id) DO UPDATE SET kind = excluded.kind, body = excluded.body",
+                            (rec["id"], *_stored_row(rec["response"])),
+                        )
+                        db.execute("INSERT OR REPLACE INTO meta VALUES ('latest', ?)", (rec["id"],))
+
+    def load(self, *, lazy: bool = True) -> Project:
+        """Return the stored project; with ``lazy`` results are validated when first read."""
+        with self._transaction() as db:
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+            if "root" not in meta:
+                raise FileNotFoundError(f"no project in {self.path}")
+            task_rows = db.execute("SELECT list, status, body FROM tasks ORDER BY seq").fetchall()
+            # the bodies of inline results are read on demand, see _ResultReader
+            result_rows = db.execute(
+                "SELECT task_id, CASE kind WHEN 'blob' THEN body END FROM results ORDER BY rowid"
+            ).fetchall()
+
+        tasks: dict[str, Task] = {}
+        lists: dict[str, list[Task]] = {name: [] for name in _LISTS}
+        for name, status, body in task_rows:
+            task = Task.model_validate_json(body)
+            task.status = TaskStatus(status)
+            tasks[task.id] = task
+            lists[name].append(task)
+        root = Task.model_validate_json(meta["root"])
+
+        def result(task_id: str, body: str) -> ModelResponse:
+            response = RESPONSE_ADAPTER.validate_json(body)
+            if isinstance(response, DecomposedResponse):
+                # the stored subtasks are as they were spawned; use their current state
+                response.subtasks = [
+                    tasks[sub.id] if sub.id in tasks and tasks[sub.id].parent_id == task_id else sub
+                    for sub in response.subtasks
+                ]
+            return response
+
+        def result_data(task_id: str, body: str) -> Any:
+            data = json.loads(body)
+            if data.get("response_type") == ModelResponseType.DECOMPOSED.value:
+                data["subtasks"] = [
+                    tasks[sub["id"]].model_dump(mode="json")
+                    if sub["id"] in tasks and tasks[sub["id"]].parent_id == task_id
+                    else sub
+                    for sub in data["subtasks"]
+                ]
+            return data
+
+        # spilled results are kept as blob references, see TaskStore.set_result
+        stored = {task_id: UNREAD if digest is None else blob_ref(digest) for task_id, digest in result_rows}
+        results = LazyResults(stored, result, BlobStore(self.blobs).get, read=_ResultReader(self.path), dump=result_data)
+        results.latest = meta.get("latest")
+        if "latest" in meta:
+            latest: ModelResponse | None = results.get(meta["latest"])
+        elif "latest_response" in meta:
+            latest = RESPONSE_ADAPTER.validate_json(meta["latest_response"])
+        else:
+            latest = None
+        project = Project.model_validate({"rootTask": tasks.get(root.id, root), **lists})
+        # assigned after validation, which would copy the results into a plain dict
+        project.taskResults = results
+        project.latestResponse = latest
+        return project if lazy else materialize(project)
+
+    def find(
+        self,
+        *,
+        status: TaskStatus | None = None,
+        type: TaskType | None = None,
+        under: str | None = None,
+    ) -> list[Task]:
+        """Return the stored tasks with ``status`` and ``type`` that descend from ``under``.
+
+        Each filter left as None matches every task. Tasks come in the order
+        they joined their current list.
+        """
+        sql = "SELECT status, body FROM tasks WHERE 1 = 1"
+        params: list[Any] = []
+        if under is not None:
+            sql = (
+                "WITH RECURSIVE subtree (id) AS ("
+                " SELECT id FROM tasks WHERE parent_id = ?"
+                " UNION ALL SELECT tasks.id FROM tasks JOIN subtree ON tasks.parent_id = subtree.id"
+                f") {sql} AND id IN subtree"
+            )
+            params.append(under)
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status.value)
+        if type is not None:
+            sql += " AND type = ?"
+            params.append(type.value)
+        with self._transaction() as db:
+            rows = db.execute(sql + " ORDER BY seq", params).fetchall()
+        found = []
+        for row_status, body in rows:
+            task = Task.model_validate_json(body)
+            task.status = TaskStatus(row_status)
+            found.append(task)
+        return found
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _owns(self, results: dict[str, ModelResponse], task_id: str) -> bool:
+        return (
+            isinstance(results, LazyResults)
+            and isinstance(results.read, _ResultReader)
+            and results.read.path == self.path
+            and results.unread(task_id)
+        )
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._db is None:
+                raise RuntimeError(f"{self.path} is closed")
+            self._db.execute("BEGIN")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+
+class _ResultReader:
+    """Read result bodies of a store on demand.
+
+    Each read opens a connection of its own, so results stay readable after
+    the store that loaded them is closed, and no connection outlives a read.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __call__(self, task_id: str) -> Any:
+        with closing(sqlite3.connect(str(self.path))) as db:
+            row = db.execute("SELECT kind, body FROM results WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no result of {task_id} in {self.path}")
+        kind, body = row
+        return blob_ref(body) if kind == "blob" else body
+
+
+def _result_row(results: dict[str, ModelResponse], task_id: str) -> tuple[str, str]:
+    stored = results.stored(task_id) if isinstance(results, LazyResults) else None
+    if isinstance(stored, str):
+        return "inline", stored  # read from another store and never loaded
+    digest = blob_digest(stored)
+    if digest is not None:
+        return "blob", digest
+    return "inline", RESPONSE_ADAPTER.dump_json(results[task_id]).decode()
+
+
+def _stored_row(data: Any) -> tuple[str, str]:
+    """Return the kind and body of the row storing JSON-ready result ``data``."""
+    digest = blob_digest(data)
+    if digest is not None:
+        return "blob", digest
+    return "inline", json.dumps(data, separators=(",", ":"))
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from src.dataManagement.blobs import BlobStore
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import DecomposedResponse, ModelResponse
+from src.dataModel.project import Project
+from src.dataModel.results import LazyResults, blob_ref
+from src.dataModel.task import Task, TaskStatus
+
+# Status a task is given when loaded from a list that does not match it.
+_LIST_STATUS: dict[str, TaskStatus] = {
+    "completedTasks": TaskStatus.COMPLETED,
+    "failedTasks": TaskStatus.FAILED,
+    "inProgressTasks": TaskStatus.IN_PROGRESS,
+    "queuedTasks": TaskStatus.PENDING,
+}
+
+# Project list each status is serialized into.
+STATUS_LISTS: dict[TaskStatus, str] = {
+    TaskStatus.PENDING: "queuedTasks",
+    TaskStatus.IN_PROGRESS: "inProgressTasks",
+    TaskStatus.PENDING_VALIDATION: "inProgressTasks",
+    TaskStatus.PENDING_USER_REVIEW: "inProgressTasks",
+    TaskStatus.PENDING_USER_INPUT: "inProgressTasks",
+    TaskStatus.COMPLETED: "completedTasks",
+    TaskStatus.BLOCKED: "failedTasks",
+    TaskStatus.FAILED: "failedTasks",
+}
+
+
+class TaskStore:
+    """Index the tasks of a :class:`Project` by id, status and parent.
+
+    Status changes are O(1): each project list is mirrored by an
+    insertion-ordered dict, so moving a task appends it to its new list just
+    like the list-based code did. :meth:`sync` writes the lists back to the
+    project before it is serialized.
+
+    With ``track_changes`` every mutation is also remembered so it can be
+    appended to a journal; see :meth:`drain_changes`.
+
+    With ``blobs``, a result whose content and artifacts exceed
+    ``spill_bytes`` characters is written to that store and the project keeps
+    only its digest, see :meth:`LazyResults.spill`.
+    """
+
+    def __init__(
+        self,
+        project: Project,
+        *,
+        track_changes: bool = False,
+        blobs: BlobStore | None = None,
+        spill_bytes: int | None = None,
+    ) -> None:
+        if blobs is not None and (spill_bytes is None or spill_bytes < 1):
+            raise ValueError("spill_bytes must be >= 1 with a blob store")
+        self.project = project
+        self.track_changes = track_changes
+        self.blobs = blobs
+        self.spill_bytes = spill_bytes
+        self._changes: list[tuple[str, Any]] = []
+        self._tasks: dict[str, Task] = {}
+        # dicts rather than sets so iteration order is deterministic
+        self._by_status: dict[TaskStatus, dict[str, None]] = {status: {} for status in TaskStatus}
+        self._lists: dict[str, dict[str, Task]] = {name: {} for name in STATUS_LISTS.values()}
+        self._children: dict[str, list[str]] = defaultdict(list)
+
+        for name, list_status in _LIST_STATUS.items():
+            for task in getattr(project, name):
+                if STATUS_LISTS[task.status] != name:
+                    # e.g. in-progress tasks requeued by load_project_state
+                    task.status = list_status
+                self._claim_id(task, set())
+                self._index(task)
+        if project.rootTask.id in self._tasks:
+            # a loaded project holds a separate copy of the root task
+            project.rootTask = self._tasks[project.rootTask.id]
+        else:
+            self._tasks[project.rootTask.id] = project.rootTask
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def get(self, task_id: str) -> Task | None:
+        """Return the task with ``task_id`` if it is known."""
+        return self._tasks.get(task_id)
+
+    def status(self, task_id: str) -> TaskStatus | None:
+        """Return the status of ``task_id`` or ``None`` for unknown ids."""
+        task = self._tasks.get(task_id)
+        return task.status if task else None
+
+    def count(self, status: TaskStatus) -> int:
+        """Return how many tasks currently have ``status``."""
+        return len(self._by_status[status])
+
+    def with_status(self, *statuses: TaskStatus) -> list[Task]:
+        """Return tasks having any of ``statuses``, oldest transition first."""
+        return [self._tasks[tid] for status in statuses for tid in self._by_status[status]]
+
+    def children(self, task_id: str) -> list[Task]:
+        """Return the direct children of ``task_id`` in spawn order."""
+        return [self._tasks[tid] for tid in self._children.get(task_id, [])]
+
+    def subtree(self, task_id: str) -> list[Task]:
+        """Return every descendant of ``task_id``, breadth first."""
+        out: list[Task] = []
+        frontier = [task_id]
+        while frontier:
+            nxt: list[str] = []
+            for tid in frontier:
+                kids = self._children.get(tid, [])
+                out.extend(self._tasks[k] for k in kids)
+                nxt.extend(kids)
+            frontier = nxt
+        return out
+
+    def add(self, tasks: Iterable[Task]) -> list[Task]:
+        """Register new pending ``tasks`` and return them.
+
+        Ids must be unique within the store. Colliding ids (models tend to
+        reuse names such as ``task-1`` under different parents) are prefixed
+        with the parent id, and ``depends_on`` entries of the same batch are
+        rewritten to match.
+        """
+        batch = list(tasks)
+        renamed: dict[str, str] = {}
+        taken: set[str] = set()
+        for task in batch:
+            old_id = task.id
+            if self._claim_id(task, taken):
+                renamed[old_id] = task.id
+            taken.add(task.id)
+        for task in batch:
+            if renamed and any(dep in renamed for dep in task.depends_on):
+                task.depends_on = [renamed.get(dep, dep) for dep in task.depends_on]
+            task.status = TaskStatus.PENDING
+            self._index(task)
+            if self.track_changes:
+                self._changes.append(("add", task))
+        return batch
+
+    def set_status(self, task: Task, status: TaskStatus) -> None:
+        """Move ``task`` to ``status`` in O(1)."""
+        old = task.status
+        del self._by_status[old][task.id]
+        self._by_status[status][task.id] = None
+        old_list, new_list = STATUS_LISTS[old], STATUS_LISTS[status]
+        if old_list != new_list:
+            del self._lists[old_list][task.id]
+            self._lists[new_list][task.id] = task
+        task.status = status
+        if self.track_changes:
+            self._changes.append(("status", (task.id, status)))
+
+    def set_description(self, task: Task, description: str) -> None:
+        """Replace the description of ``task``, e.g. with a user's answer added."""
+        task.description = description
+        if self.track_changes:
+            self._changes.append(("description", (task.id, description)))
+
+    def set_result(self, task_id: str, response: ModelResponse) -> None:
+        """Store ``response`` as the result of ``task_id``, in the blob store if it is large."""
+        if self._spills(response):
+            assert self.blobs is not None
+            self.set_spilled(task_id, self.blobs.put(RESPONSE_ADAPTER.dump_json(response)), response)
+            return
+        self.project.taskResults[task_id] = response
+        self.project.latestResponse = response
+        if self.track_changes:
+            self._changes.append(("result", (task_id, response)))
+
+    def set_spilled(self, task_id: str, digest: str, response: ModelResponse | None = None) -> None:
+        """Record that the result of ``task_id`` is blob ``digest``; ``response`` is its content if known."""
+        results = self.project.taskResults
+        if not isinstance(results, LazyResults):
+            results = LazyResults({}, lambda task_id, stored: RESPONSE_ADAPTER.validate_python(stored))
+            dict.update(results, self.project.taskResults)
+            self.project.taskResults = results
+        if self.blobs is not None and results.blobs is None:
+            results.blobs = self.blobs.get
+        results.spill(task_id, digest)
+        self.project.latestResponse = response if response is not None else results[task_id]
+        if self.track_changes:
+            self._changes.append(("result", (task_id, blob_ref(digest))))
+
+    def _spills(self, response: ModelResponse) -> bool:
+        # decomposed results refer to live subtasks and stay in memory
+        if self.blobs is None or isinstance(response, DecomposedResponse):
+            return False
+        assert self.spill_bytes is not None
+        size = len(response.content or "") + sum(map(len, response.artifacts))
+        return size > self.spill_bytes
+
+    def drain_changes(self) -> list[dict[str, Any]]:
+        """Return JSON-ready records of the changes since the last drain.
+
+        Tasks and responses are serialized now rather than when they changed,
+        so records reflect later in-place edits such as id renames.
+        """
+        records: list[dict[str, Any]] = []
+        for op, payload in self._changes:
+            match op:
+                case "add":
+                    records.append({"op": op, "task": payload.model_dump(mode="json")})
+                case "status":
+                    records.append({"op": op, "id": payload[0], "status": payload[1].value})
+                case "description":
+                    records.append({"op": op, "id": payload[0], "description": payload[1]})
+                case "result":
+                    response = payload[1] if isinstance(payload[1], dict) else payload[1].model_dump(mode="json")
+                    records.append({"op": op, "id": payload[0], "response": response})
+        self._changes.clear()
+        return records
+
+    def sync(self) -> Project:
+        """Rewrite the project's task lists from the index and return it."""
+        for name, tasks in self._lists.items():
+            setattr(self.project, name, list(tasks.values()))
+        return self.project
+
+    def _claim_id(self, task: Task, taken: set[str]) -> bool:
+        """Give ``task`` a unique id, returning ``True`` if it was renamed."""
+        if task.id not in self._tasks and task.id not in taken:
+            return False
+        base = f"{task.parent_id}.{task.id}" if task.parent_id else task.id
+        new_id, n = base, 1
+        while new_id in self._tasks or new_id in taken:
+            n += 1
+            new_id = f"{base}-{n}"
+        task.id = new_id
+        return True
+
+    def _index(self, task: Task) -> None:
+        self._tasks[task.id] = task
+        self._by_status[task.status][task.id] = None
+        self._lists[STATUS_LISTS[task.status]][task.id] = task
+        if task.parent_id:
+            self._children[task.parent_id].append(task.id)
@@ -0,0 +1,61 @@
+"""Compiled pydantic validators shared by the whole process.
+
+Building a ``TypeAdapter`` compiles a core schema, which costs several times
+more than validating a typical response with it, so adapters are built once
+per type and reused everywhere.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import cache
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from .model_response import (
+    DecomposedResponse,
+    FailedResponse,
+    FollowUpResponse,
+    ImplementedResponse,
+    ModelResponse,
+)
+
+try:  # optional: only used when selected, see ``parse_response``
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+_RESPONSE_TYPES = (DecomposedResponse, ImplementedResponse, FollowUpResponse, FailedResponse)
+
+
+@cache
+def type_adapter(tp: Any) -> TypeAdapter[Any]:
+    """Return the shared validator for ``tp``, compiling it on first use."""
+    return TypeAdapter(tp)
+
+
+RESPONSE_ADAPTER: TypeAdapter[ModelResponse] = type_adapter(ModelResponse)
+
+# ``TREEAGENT_JSON_DECODER=orjson`` decodes payloads with orjson before
+# validating them; pydantic's own JSON parser is at least as fast for
+# response-sized documents, so it stays the default
+_USE_ORJSON = orjson is not None and os.environ.get("TREEAGENT_JSON_DECODER") == "orjson"
+
+
+def parse_response(payload: str | bytes) -> ModelResponse:
+    """Validate the JSON ``payload`` of a provider into a ``ModelResponse``."""
+    if _USE_ORJSON:
+        return RESPONSE_ADAPTER.validate_python(orjson.loads(payload))
+    return RESPONSE_ADAPTER.validate_json(payload)
+
+
+def as_response(value: Any) -> ModelResponse:
+    """Return ``value`` as a ``ModelResponse``.
+
+    Response objects are already validated and are passed through as they
+    are; only plain data (e.g. a node's ``model_dump()``) is validated.
+    """
+    if isinstance(value, _RESPONSE_TYPES):
+        return value
+    return RESPONSE_ADAPTER.validate_python(value)
@@ -4,6 +4,8 @@ from pydantic import BaseModel
 class AccessorType(str, Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
+    GEMINI = "gemini"
+    LOCAL = "local"
     MOCK = "mock"
 
 class Model(BaseModel):
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from typing import Any
+
+from pydantic import BaseModel, Field, SerializerFunctionWrapHandler, field_serializer
 
 from .model_response import ModelResponse
+from .results import LazyResults
 
 from .task import Task
 
@@ -17,3 +20,12 @@ class Project(BaseModel):
     queuedTasks: list[Task]
     taskResults: dict[str, ModelResponse] = Field(default_factory=dict)
     latestResponse: ModelResponse | None = None
+
+    @field_serializer("taskResults", mode="wrap")
+    def _dump_results(self, results: dict[str, ModelResponse], handler: SerializerFunctionWrapHandler) -> Any:
+        # the serializer reads a dict's storage directly, past LazyResults' loading;
+        # results not loaded yet are dumped from their stored form, unvalidated
+        if not isinstance(results, LazyResults):
+            return handler(results)
+        dumped = handler(dict(results.loaded()))
+        return {task_id: dumped[task_id] if task_id in dumped else results.raw(task_id) for task_id in results}
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from copy import deepcopy
+from typing import Any
+
+from .adapters import RESPONSE_ADAPTER
+from .model_response import ModelResponse
+
+_MISSING = object()
+
+#: stored form of a result whose body is fetched with ``LazyResults.read`` when needed
+UNREAD: Any = object()
+
+
+def blob_ref(digest: str) -> dict[str, str]:
+    """Return the stored form of a result kept in a blob store under ``digest``."""
+    return {"blob": digest}
+
+
+def blob_digest(stored: Any) -> str | None:
+    """Return the digest if ``stored`` refers to a blob, else None."""
+    if isinstance(stored, dict) and len(stored) == 1 and isinstance(stored.get("blob"), str):
+        return stored["blob"]
+    return None
+
+
+class LazyResults(dict[str, ModelResponse]):
+    """``Project.taskResults`` whose responses are validated on first access.
+
+    ``stored`` maps task ids to responses in the form they were saved in
+    (JSON-ready data or JSON text); ``load(task_id, stored)`` turns one into a
+    :class:`ModelResponse` when it is read. A resumed run only touches the
+    results of the tasks it works on, so the others are never validated, and
+    writers can copy them back out as they are (see :meth:`stored`).
+    Assigning a result replaces the stored form. Iteration order is that of
+    ``stored``, with later assignments appended, as for a plain dict.
+
+    A stored form made by :func:`blob_ref` is read with ``blobs(digest)``
+    each time the result is accessed and is never kept, so results spilled to
+    a blob store (see :meth:`spill`) do not come back into memory for good.
+    A stored form of :data:`UNREAD` is fetched with ``read(task_id)`` each
+    time it is needed, so a database can keep the bodies until they are used.
+
+    Dumps and comparisons do not load results: ``dump(task_id, stored)``
+    returns the JSON-ready data of a stored form (by default JSON text is
+    parsed and data is returned as is), see :meth:`raw`.
+
+    ``latest`` is the id of the result assigned or spilled last, so writers
+    can refer to ``Project.latestResponse`` without searching for it (see
+    ``find_result``); loaders set it to the id they read the latest from.
+    """
+
+    def __init__(
+        self,
+        stored: Mapping[str, Any],
+        load: Callable[[str, Any], ModelResponse],
+        blobs: Callable[[str], bytes] | None = None,
+        *,
+        read: Callable[[str], Any] | None = None,
+        dump: Callable[[str, Any], Any] | None = None,
+    ) -> None:
+        super().__init__()
+        self._load = load
+        self._dump = dump or _json_data
+        self.blobs = blobs
+        self.read = read
+        self._stored: dict[str, Any] = dict(stored)
+        self.latest: str | None = None
+        # placeholders keep the keys, their order and len() in the dict itself
+        dict.update(self, dict.fromkeys(self._stored))  # type: ignore[arg-type]
+
+    @property
+    def pending(self) -> int:
+        """How many results have not been loaded yet."""
+        return len(self._stored)
+
+    def stored(self, task_id: str) -> Any:
+        """Return the stored form of ``task_id``'s result, or None once it is loaded."""
+        stored = self._stored.get(task_id)
+        if stored is UNREAD:
+            assert self.read is not None
+            return self.read(task_id)
+        return stored
+
+    def unread(self, task_id: str) -> bool:
+        """Whether ``task_id``'s result is still only in the store ``read`` fetches from."""
+        return self._stored.get(task_id) is UNREAD
+
+    def spilled(self, task_id: str) -> str | None:
+        """Return the blob digest of ``task_id``'s result if it is spilled, without reading it."""
+        stored = self._stored.get(task_id)
+        return None if stored is UNREAD else blob_digest(stored)
+
+    def raw(self, task_id: str) -> Any:
+        """Return ``task_id``'s result as JSON-ready data, without validating it if not loaded."""
+        if task_id not in self._stored:
+            return RESPONSE_ADAPTER.dump_python(dict.__getitem__(self, task_id), mode="json")
+        stored = self.stored(task_id)
+        digest = blob_digest(stored)
+        if digest is not None:
+            return json.loads(self._blob(task_id, digest))
+        return self._dump(task_id, stored)
+
+    def spill(self, task_id: str, digest: str) -> None:
+        """Keep only a reference to ``task_id``'s result, stored as blob ``digest``."""
+        # the placeholder keeps the position of a result that was already set
+        dict.__setitem__(self, task_id, None)  # type: ignore[misc]
+        self._stored[task_id] = blob_ref(digest)
+        self.latest = task_id
+
+    def loaded(self) -> Iterator[tuple[str, ModelResponse]]:
+        """Iterate over the results loaded so far without loading the others."""
+        for task_id, response in dict.items(self):
+            if task_id not in self._stored:
+                yield task_id, response
+
+    def __getitem__(self, task_id: str) -> ModelResponse:
+        if task_id not in self._stored:
+            return dict.__getitem__(self, task_id)
+        stored = self.stored(task_id)
+        digest = blob_digest(stored)
+        if digest is not None:
+            return RESPONSE_ADAPTER.validate_json(self._blob(task_id, digest))
+        response = self._load(task_id, stored)
+        dict.__setitem__(self, task_id, response)
+        del self._stored[task_id]
+        return response
+
+    def _peek(self, task_id: str) -> ModelResponse:
+        """Like ``self[task_id]``, but without keeping the loaded result."""
+        if task_id not in self._stored:
+            return dict.__getitem__(self, task_id)
+        stored = self.stored(task_id)
+        digest = blob_digest(stored)
+        if digest is not None:
+            return RESPONSE_ADAPTER.validate_json(self._blob(task_id, digest))
+        return self._load(task_id, stored)
+
+    def _blob(self, task_id: str, digest: str) -> bytes:
+        if self.blobs is None:
+            raise KeyError(f"result of {task_id} is in blob {digest}, but no blob store is attached")
+        return self.blobs(digest)
+
+    def get(self, task_id: str, default: Any = None) -> Any:
+        return self[task_id] if task_id in self else default  # noqa: SIM401 - this is get()
+
+    def __setitem__(self, task_id: str, response: ModelResponse) -> None:
+        self._stored.pop(task_id, None)
+        dict.__setitem__(self, task_id, response)
+        self.latest = task_id
+
+    def __delitem__(self, task_id: str) -> None:
+        self._stored.pop(task_id, None)
+        dict.__delitem__(self, task_id)
+        if self.latest == task_id:
+            self.latest = None
+
+    def pop(self, task_id: str, *default: Any) -> Any:
+        if task_id not in self:
+            return dict.pop(self, task_id, *default)
+        response = self[task_id]
+        del self[task_id]
+        return response
+
+    def setdefault(self, task_id: str, default: Any = None) -> Any:
+        if task_id not in self:
+            self[task_id] = default
+        return self[task_id]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for task_id, response in dict(*args, **kwargs).items():
+            self[task_id] = response
+
+    def __iter__(self) -> Iterator[str]:
+        # not inherited, so dict(results) and {**results} go through keys() and __getitem__
+        return dict.__iter__(self)
+
+    def values(self) -> Iterable[ModelResponse]:  # type: ignore[override]
+        return [self[task_id] for task_id in self]
+
+    def items(self) -> Iterable[tuple[str, ModelResponse]]:  # type: ignore[override]
+        return [(task_id, self[task_id]) for task_id in self]
+
+    def copy(self) -> dict[str, ModelResponse]:
+        return dict(self.items())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if len(self) != len(other) or any(task_id not in other for task_id in self):
+            return False
+        for task_id in self:
+            if isinstance(other, LazyResults):
+                if self._same_stored(other, task_id):
+                    continue
+                theirs = other._peek(task_id)
+            else:
+                theirs = other[task_id]
+            if self._peek(task_id) != theirs:
+                return False
+        return True
+
+    def _same_stored(self, other: LazyResults, task_id: str) -> bool:
+        # results neither side loaded are equal when stored alike, e.g. in a copy
+        mine = self._stored.get(task_id, _MISSING)
+        theirs = other._stored.get(task_id, _MISSING)
+        if mine is _MISSING or theirs is _MISSING:
+            return False
+        if mine is UNREAD or theirs is UNREAD:
+            return mine is theirs and self.read is other.read
+        return bool(mine == theirs)
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} results, {self.pending} not loaded)"
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> LazyResults:
+        # stored forms are never mutated, so copies share them
+        copy = LazyResults({}, self._load, self.blobs, read=self.read, dump=self._dump)
+        copy._stored = dict(self._stored)
+        copy.latest = self.latest
+        dict.update(copy, {key: deepcopy(value, memo) for key, value in dict.items(self)})
+        return copy
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return dict, (self.items(),)
+
+
+def _json_data(task_id: str, stored: Any) -> Any:
+    return json.loads(stored) if isinstance(stored, (str, bytes)) else stored
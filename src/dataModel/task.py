@@ -43,6 +43,7 @@ class Task(BaseModel):
     status: TaskStatus = TaskStatus.PENDING
     complexity: int = 1
     parent_id: Optional[str] = None
+    depends_on: list[str] = Field(default_factory=list)
     metadata: dict = Field(default_factory=dict)
     tools: list[Tool] = Field(default_factory=list)
     model: Model = Field(default_factory=Model)
@@ -1,8 +1,9 @@
 # Model accessors package
-from .base_accessor import BaseModelAccessor
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor
 from .data.tool import Tool
 
 __all__ = [
+    "AsyncBaseModelAccessor",
     "BaseModelAccessor",
     "Tool",
 ]
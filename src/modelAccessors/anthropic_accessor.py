@@ -1,37 +1,125 @@
+from collections.abc import AsyncIterator, Callable, Iterator
 from os import environ
 from typing import Any, Optional, Dict
-from pydantic import TypeAdapter
-from anthropic import Anthropic
-from .base_accessor import BaseModelAccessor, Tool
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient, DefaultHttpxClient
+from anthropic._constants import DEFAULT_CONNECTION_LIMITS
+from anthropic import APIConnectionError, APITimeoutError, InternalServerError
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
+from .registry import pool_limits
+from .resilience import CallPolicy, CallStats, request_options
+from .streaming import acollect_stream, collect_stream
+from src.dataModel.adapters import parse_response
 from src.dataModel.model_response import ModelResponse
 
-class AnthropicAccessor(BaseModelAccessor):
-    def __init__(self):
-        self.client = Anthropic(api_key=environ.get("ANTHROPIC_API_KEY"))
-        # Models with tool support
-        self.tool_supported_models = ["claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-5-sonnet-20240620"]
-        
+
+class _ClaudeToolSupport:
+    """Tool helpers shared by the sync and async Anthropic accessors."""
+
+    # Models with tool support
+    tool_supported_models = ("claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-5-sonnet-20240620")
+
+    def supports_tools(self, model: str) -> bool:
+        """Check if model supports native tool use"""
+        return model in self.tool_supported_models
+
+    def _convert_to_claude_tools(self, tools: list[Tool]) -> list[Dict[str, Any]]:
+        """Convert our Tool objects to Claude's tool format"""
+        claude_tools = []
+        for tool in tools:
+            claude_tools.append({
+                "name": tool.name,
+                "description": tool.description,
+                "input_schema": {
+                    "type": "object",
+                    "properties": tool.parameters,
+                    "required": []
+                }
+            })
+        return claude_tools
+
+    def _format_tools_for_prompt(self, tools: list[Tool]) -> str:
+        """Format tools into a readable description for the prompt"""
+        tool_descriptions = []
+        for tool in tools:
+            params_desc = ", ".join(f"{k}" for k in tool.parameters.keys())
+            tool_descriptions.append(f"- {tool.name}: {tool.description} [Parameters: {params_desc}]")
+
+        return "\n".join(tool_descriptions)
+
+
+class AnthropicAccessor(_ClaudeToolSupport, BaseModelAccessor):
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None):
+        """Create the client; ``max_connections`` caps its HTTP connection pool.
+
+        ``call_policy`` sets per-call deadlines, retries and hedging; their
+        counters are kept in ``stats``.
+        """
+        http_client = (
+            DefaultHttpxClient(limits=pool_limits(DEFAULT_CONNECTION_LIMITS, max_connections))
+            if max_connections
+            else None
+        )
+        self.client = Anthropic(api_key=environ.get("ANTHROPIC_API_KEY"), http_client=http_client, max_retries=0)
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
+
     def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
         """Basic text prompting for Claude models"""
-        response = self.client.messages.create(
-            model=model,
-            max_tokens=4096,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-        
-        content = response.content[0].text
-        if not content:
-            raise ValueError("No content in response")
-            
-        return TypeAdapter(ModelResponse).validate_json(content)
+        def attempt(timeout: float | None) -> ModelResponse:
+            response = self._rate_limited(
+                model,
+                lambda: self.client.messages.create(
+                    model=model,
+                    max_tokens=4096,
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content = response.content[0].text
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return self._resilient(attempt)
 
     def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
         """Convenience wrapper used by simple agent nodes."""
         return self.prompt_model("claude-3-opus-20240229", "", prompt)
         
+    def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        for event in self._rate_limited_stream(
+            model,
+            lambda: self.client.messages.create(
+                model=model,
+                max_tokens=4096,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ],
+                stream=True,
+                **request_options(self.call_policy.timeout),
+            ),
+            system_prompt,
+            user_prompt,
+        ):
+            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return collect_stream(self.stream_model("claude-3-opus-20240229", "", prompt), on_subtask)
+
     def execute_task_with_tools(
         self,
         model: str,
@@ -47,51 +135,149 @@ class AnthropicAccessor(BaseModelAccessor):
             # Use Claude's native tool use
             claude_tools = self._convert_to_claude_tools(tools)
             
-            response = self.client.messages.create(
+            def attempt(timeout: float | None) -> ModelResponse:
+                response = self._rate_limited(
+                    model,
+                    lambda: self.client.messages.create(
+                        model=model,
+                        max_tokens=4096,
+                        system=system_prompt,
+                        messages=[
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        tools=claude_tools,
+                        **request_options(timeout),
+                    ),
+                    system_prompt,
+                    user_prompt,
+                )
+
+                content = response.content[0].text
+                if not content:
+                    raise ValueError("No content in response")
+
+                return parse_response(content)
+
+            return self._resilient(attempt)
+        else:
+            # Fallback for models without tool support
+            tools_description = self._format_tools_for_prompt(tools)
+            enhanced_system_prompt = f"{system_prompt}\n\nAvailable tools:\n{tools_description}"
+            return self.prompt_model(model, enhanced_system_prompt, user_prompt)
+
+
+class AsyncAnthropicAccessor(_ClaudeToolSupport, AsyncBaseModelAccessor):
+    """Non-blocking Anthropic accessor backed by ``AsyncAnthropic``."""
+
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None):
+        """Create the client; ``max_connections`` caps its HTTP connection pool.
+
+        ``call_policy`` sets per-call deadlines, retries and hedging; their
+        counters are kept in ``stats``.
+        """
+        http_client = (
+            DefaultAsyncHttpxClient(limits=pool_limits(DEFAULT_CONNECTION_LIMITS, max_connections))
+            if max_connections
+            else None
+        )
+        self.client = AsyncAnthropic(api_key=environ.get("ANTHROPIC_API_KEY"), http_client=http_client, max_retries=0)
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
+        """Basic text prompting for Claude models"""
+        async def attempt(timeout: float | None) -> ModelResponse:
+            response = await self._rate_limited(
+                model,
+                lambda: self.client.messages.create(
+                    model=model,
+                    max_tokens=4096,
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content = response.content[0].text
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return await self._resilient(attempt)
+
+    async def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
+        """Convenience wrapper used by simple agent nodes."""
+        return await self.prompt_model("claude-3-opus-20240229", "", prompt)
+
+    async def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        async for event in self._rate_limited_stream(
+            model,
+            lambda: self.client.messages.create(
                 model=model,
                 max_tokens=4096,
                 system=system_prompt,
                 messages=[
                     {"role": "user", "content": user_prompt}
                 ],
-                tools=claude_tools
+                stream=True,
+                **request_options(self.call_policy.timeout),
+            ),
+            system_prompt,
+            user_prompt,
+        ):
+            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return await acollect_stream(self.stream_model("claude-3-opus-20240229", "", prompt), on_subtask)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> ModelResponse:
+        """Execute task with tools - native tools if supported"""
+        if not tools:
+            return await self.prompt_model(model, system_prompt, user_prompt)
+
+        if not self.supports_tools(model):
+            tools_description = self._format_tools_for_prompt(tools)
+            enhanced_system_prompt = f"{system_prompt}\n\nAvailable tools:\n{tools_description}"
+            return await self.prompt_model(model, enhanced_system_prompt, user_prompt)
+
+        async def attempt(timeout: float | None) -> ModelResponse:
+            response = await self._rate_limited(
+                model,
+                lambda: self.client.messages.create(
+                    model=model,
+                    max_tokens=4096,
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    tools=self._convert_to_claude_tools(tools),
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
             )
-            
+
             content = response.content[0].text
             if not content:
                 raise ValueError("No content in response")
-                
-            return TypeAdapter(ModelResponse).validate_json(content)
-        else:
-            # Fallback for models without tool support
-            tools_description = self._format_tools_for_prompt(tools)
-            enhanced_system_prompt = f"{system_prompt}\n\nAvailable tools:\n{tools_description}"
-            return self.prompt_model(model, enhanced_system_prompt, user_prompt)
-    
-    def supports_tools(self, model: str) -> bool:
-        """Check if model supports native tool use"""
-        return model in self.tool_supported_models
-        
-    def _convert_to_claude_tools(self, tools: list[Tool]) -> list[Dict[str, Any]]:
-        """Convert our Tool objects to Claude's tool format"""
-        claude_tools = []
-        for tool in tools:
-            claude_tools.append({
-                "name": tool.name,
-                "description": tool.description,
-                "input_schema": {
-                    "type": "object",
-                    "properties": tool.parameters,
-                    "required": []
-                }
-            })
-        return claude_tools
-        
-    def _format_tools_for_prompt(self, tools: list[Tool]) -> str:
-        """Format tools into a readable description for the prompt"""
-        tool_descriptions = []
-        for tool in tools:
-            params_desc = ", ".join(f"{k}" for k in tool.parameters.keys())
-            tool_descriptions.append(f"- {tool.name}: {tool.description} [Parameters: {params_desc}]")
-        
-        return "\n".join(tool_descriptions)
+
+            return parse_response(content)
+
+        return await self._resilient(attempt)
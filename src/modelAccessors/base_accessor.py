@@ -1,9 +1,40 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, TypeVar
 
 from .data.tool import Tool
+from .rate_limiter import RATE_LIMITERS, estimate_tokens
+from .resilience import CallPolicy, CallStats, ResilientCall
+from .request_key import provider_name
 
-class BaseModelAccessor(ABC):
+T = TypeVar("T")
+
+
+def emit_subtasks(response: T, on_subtask: Callable[[Any], Any]) -> T:
+    """Hand the subtasks of a complete ``response`` to ``on_subtask``, for callers that did not stream it."""
+    for subtask in getattr(response, "subtasks", None) or []:
+        on_subtask(subtask)
+    return response
+
+class _CallPolicySupport:
+    """Deadline, retry and hedging settings shared by the sync and async accessors.
+
+    Provider accessors set ``call_policy`` and ``stats`` per instance and list
+    the SDK exceptions worth retrying in ``retryable_errors``.
+    """
+
+    call_policy: CallPolicy = CallPolicy()
+    stats: CallStats
+    retryable_errors: tuple[type[BaseException], ...] = (TimeoutError, ConnectionError)
+    timeout_errors: tuple[type[BaseException], ...] = (TimeoutError,)
+
+    def _resilient_call(self) -> ResilientCall:
+        return ResilientCall(self.call_policy, self.stats, self.retryable_errors, self.timeout_errors)
+
+
+class BaseModelAccessor(_CallPolicySupport, ABC):
     @abstractmethod
     def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
         """Basic text prompting with no tools"""
@@ -32,3 +63,108 @@ class BaseModelAccessor(ABC):
     def supports_tools(self, model: str) -> bool:
         """Check if a model supports native tool use"""
         return False
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        """Like :meth:`call_model`, handing each subtask to ``on_subtask`` once it is generated.
+
+        Accessors that cannot stream hand over the subtasks after the whole
+        response arrived.
+        """
+        return emit_subtasks(self.call_model(prompt, schema), on_subtask)
+
+    def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        """Answer several independent :meth:`call_model` prompts, in order.
+
+        A prompt whose call raised gets the exception in its place, so one
+        failure does not sink its siblings. The calls are fanned out over
+        threads; accessors with a batch endpoint override this.
+        """
+        def call(prompt: str) -> Any:
+            try:
+                return self.call_model(prompt, schema)
+            except Exception as exc:  # noqa: BLE001 - handed back to the caller
+                return exc
+
+        if len(prompts) < 2:
+            return [call(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(len(prompts)) as pool:
+            return list(pool.map(call, prompts))
+
+    def _rate_limited(self, model: str, call: Callable[[], T], *prompts: str) -> T:
+        """Run the provider ``call`` for ``model`` under its shared rate limiter.
+
+        Provider clients are built with ``max_retries=0``: a 429 retried inside
+        the SDK would never reach the limiter.
+        """
+        limiter = RATE_LIMITERS.get(provider_name(self), model)
+        return limiter.call(call, estimate_tokens(*prompts))
+
+    def _rate_limited_stream(self, model: str, call: Callable[[], Iterable[T]], *prompts: str) -> Iterator[T]:
+        """Read the stream opened by ``call`` under the rate limiter of ``model``."""
+        limiter = RATE_LIMITERS.get(provider_name(self), model)
+        return limiter.stream(call, estimate_tokens(*prompts))
+
+    def _resilient(self, attempt: Callable[[float | None], T]) -> T:
+        """Run ``attempt`` (given its timeout) under ``call_policy``."""
+        return self._resilient_call().run(attempt)
+
+
+class AsyncBaseModelAccessor(_CallPolicySupport, ABC):
+    """Asyncio counterpart of :class:`BaseModelAccessor`.
+
+    Implementations must not block the event loop so that many requests can
+    be in flight from a single thread.
+    """
+
+    @abstractmethod
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        """Basic text prompting with no tools"""
+
+    @abstractmethod
+    async def call_model(self, prompt: str, schema) -> Any:
+        """Simpler helper for tests and lightweight callers"""
+
+    @abstractmethod
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        """Execute a task with available tools (see :meth:`BaseModelAccessor.execute_task_with_tools`)."""
+
+    def supports_tools(self, model: str) -> bool:
+        """Check if a model supports native tool use"""
+        return False
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        """Async counterpart of :meth:`BaseModelAccessor.stream_call_model`."""
+        return emit_subtasks(await self.call_model(prompt, schema), on_subtask)
+
+    async def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        """Async counterpart of :meth:`BaseModelAccessor.call_model_batch`; the calls run concurrently."""
+        results = await asyncio.gather(*(self.call_model(p, schema) for p in prompts), return_exceptions=True)
+        return list(results)
+
+    async def aclose(self) -> None:
+        """Close the SDK client of the accessor, if it has one."""
+        client = getattr(self, "client", None)
+        if client is not None:
+            await client.close()
+
+    async def _rate_limited(self, model: str, call: Callable[[], Awaitable[T]], *prompts: str) -> T:
+        """Await the provider ``call`` for ``model`` under its shared rate limiter."""
+        limiter = RATE_LIMITERS.get(provider_name(self), model)
+        return await limiter.acall(call, estimate_tokens(*prompts))
+
+    def _rate_limited_stream(
+        self, model: str, call: Callable[[], Awaitable[AsyncIterable[T]]], *prompts: str
+    ) -> AsyncIterator[T]:
+        """Read the stream opened by ``call`` under the rate limiter of ``model``."""
+        limiter = RATE_LIMITERS.get(provider_name(self), model)
+        return limiter.astream(call, estimate_tokens(*prompts))
+
+    async def _resilient(self, attempt: Callable[[float | None], Awaitable[T]]) -> T:
+        """Await ``attempt`` (given its timeout) under ``call_policy``."""
+        return await self._resilient_call().arun(attempt)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, cast
+
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
+from .request_key import accessor_model, provider_name
+
+
+class _Batch:
+    """Requests collected under one key, answered together by ``send``."""
+
+    def __init__(self, send: Callable[[list[Any]], Any], full: threading.Event | asyncio.Event) -> None:
+        self.send = send
+        self.items: list[Any] = []
+        self.futures: list[Any] = []
+        # set once the batch stops taking requests
+        self.full = full
+
+
+def _settle(futures: list[Any], results: Any) -> None:
+    """Hand each future its result, or the exception given in its place."""
+    if not isinstance(results, BaseException) and len(results) != len(futures):
+        results = ValueError(f"batch of {len(futures)} requests got {len(results)} responses")
+    for i, future in enumerate(futures):
+        if future.done():  # an async caller gave up
+            continue
+        result = results if isinstance(results, BaseException) else results[i]
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+class _Batches:
+    """Open batches by key, and how many were sent."""
+
+    def __init__(self, window: float, max_size: int = 16) -> None:
+        if window < 0:
+            raise ValueError("window must be >= 0")
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.window = window
+        self.max_size = max_size
+        self.batches = 0
+        self.batched = 0
+        self._pending: dict[Hashable, _Batch] = {}
+
+    def _close(self, key: Hashable, batch: _Batch) -> None:
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+            self.batches += 1
+            if len(batch.items) > 1:
+                self.batched += len(batch.items)
+        batch.full.set()
+
+
+class MicroBatcher(_Batches):
+    """Collect concurrent requests for ``window`` seconds and send them as one batch.
+
+    The first request of a key opens a batch and, once the window passed or
+    ``max_size`` requests joined, sends it with the ``send`` it brought and
+    hands every caller its own result. A caller never waits longer than the
+    window plus the batch call. ``batches`` counts the batches sent and
+    ``batched`` the requests that shared one.
+    """
+
+    def __init__(self, window: float, max_size: int = 16) -> None:
+        super().__init__(window, max_size)
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, item: Any, send: Callable[[list[Any]], list[Any]]) -> Any:
+        future: Future[Any] = Future()
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if batch is None:
+                batch = self._pending[key] = _Batch(send, threading.Event())
+            batch.items.append(item)
+            batch.futures.append(future)
+            if len(batch.items) >= self.max_size:
+                self._close(key, batch)
+        if leader:
+            cast(threading.Event, batch.full).wait(self.window)
+            with self._lock:
+                self._close(key, batch)
+            self._send(batch)
+        return future.result()
+
+    @staticmethod
+    def _send(batch: _Batch) -> None:
+        try:
+            results = batch.send(batch.items)
+        except Exception as exc:  # noqa: BLE001 - every caller sees it
+            results = exc
+        _settle(batch.futures, results)
+
+
+class AsyncMicroBatcher(_Batches):
+    """Asyncio counterpart of :class:`MicroBatcher`, bound to one event loop.
+
+    Each batch is sent from its own task, so a cancelled caller does not
+    take the requests of the others down with it.
+    """
+
+    def __init__(self, window: float, max_size: int = 16) -> None:
+        super().__init__(window, max_size)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, key: Hashable, item: Any, send: Callable[[list[Any]], Awaitable[list[Any]]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch(send, asyncio.Event())
+            task = asyncio.create_task(self._send_later(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_size:
+            self._close(key, batch)
+        return await future
+
+    async def _send_later(self, key: Hashable, batch: _Batch) -> None:
+        try:
+            await asyncio.wait_for(cast(asyncio.Event, batch.full).wait(), self.window)
+        except TimeoutError:
+            pass
+        self._close(key, batch)
+        try:
+            results = await batch.send(batch.items)
+        except Exception as exc:  # noqa: BLE001 - every caller sees it
+            results = exc
+        _settle(batch.futures, results)
+
+
+def _batch_key(provider: str, schema: Any) -> tuple[str, str]:
+    # schemas are response classes or unions of them; same schema, same node type
+    return provider, repr(schema)
+
+
+class BatchingAccessor(BaseModelAccessor):
+    """Send concurrent :meth:`call_model` requests of one schema to ``inner`` in batches.
+
+    Sibling tasks of one type finishing their prompts at about the same time
+    then share one :meth:`~BaseModelAccessor.call_model_batch` call. Share
+    one :class:`MicroBatcher` between the accessors of a run; batches never
+    mix providers. Other requests go to ``inner`` unchanged.
+    """
+
+    def __init__(self, inner: BaseModelAccessor, batcher: MicroBatcher, provider: str | None = None) -> None:
+        self.inner = inner
+        self.batcher = batcher
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    def call_model(self, prompt: str, schema) -> Any:
+        return self.batcher.submit(
+            _batch_key(self.provider, schema),
+            prompt,
+            lambda prompts: self.inner.call_model_batch(prompts, schema),
+        )
+
+    def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        return self.inner.call_model_batch(prompts, schema)
+
+    def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return self.inner.prompt_model(model, system_prompt, user_prompt)
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        return self.inner.stream_call_model(prompt, schema, on_subtask)
+
+    def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools)
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
+
+
+class AsyncBatchingAccessor(AsyncBaseModelAccessor):
+    """Asyncio counterpart of :class:`BatchingAccessor`."""
+
+    def __init__(
+        self, inner: AsyncBaseModelAccessor, batcher: AsyncMicroBatcher, provider: str | None = None
+    ) -> None:
+        self.inner = inner
+        self.batcher = batcher
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    async def call_model(self, prompt: str, schema) -> Any:
+        return await self.batcher.submit(
+            _batch_key(self.provider, schema),
+            prompt,
+            lambda prompts: self.inner.call_model_batch(prompts, schema),
+        )
+
+    async def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        return await self.inner.call_model_batch(prompts, schema)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return await self.inner.prompt_model(model, system_prompt, user_prompt)
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        return await self.inner.stream_call_model(prompt, schema, on_subtask)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return await self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools)
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from src.dataModel.adapters import RESPONSE_ADAPTER
+from src.dataModel.model_response import (
+    DecomposedResponse,
+    FollowUpResponse,
+    ImplementedResponse,
+    ModelResponse,
+)
+
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool, emit_subtasks
+from .request_key import accessor_model, call_model_parts, provider_name, request_key
+
+# failures are never cached so a rerun tries them again
+_CACHEABLE = (DecomposedResponse, ImplementedResponse, FollowUpResponse)
+
+# recency stamp of an entry just used; taken from the database, which every process shares
+_NEXT_USE = "(SELECT COALESCE(MAX(used), 0) + 1 FROM responses)"
+
+
+class ResponseCache:
+    """Size-bounded LRU store of model responses, kept in SQLite.
+
+    Entries are keyed by :func:`request_key` and hold the response JSON.
+    Once the stored bodies exceed ``max_bytes`` the least recently used
+    entries are evicted. ``hits``, ``misses`` and ``evictions`` count the
+    lookups of this instance. Safe to share between threads, and between
+    processes using the same file: the recency order and the total size are
+    kept in the database, and each :meth:`put` is one transaction.
+    """
+
+    def __init__(self, path: str | Path = ":memory:", max_bytes: int = 256 * 1024 * 1024) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+            """
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the stored responses."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        """Return the response JSON stored under ``key`` and mark it used."""
+        with self._lock:
+            row = self._db.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute(f"UPDATE responses SET used = {_NEXT_USE} WHERE key = ?", (key,))
+            return row[0]
+
+    def put(self, key: str, body: str) -> None:
+        """Store ``body`` under ``key``, evicting old entries beyond ``max_bytes``."""
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._transaction() as db:
+            db.execute(
+                f"INSERT OR REPLACE INTO responses (key, body, size, used) VALUES (?, ?, ?, {_NEXT_USE})",
+                (key, body, size),
+            )
+            # other processes may have written since, so the total is read, not tracked
+            total = db.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+            while total > self.max_bytes:
+                victim, victim_size = db.execute("SELECT key, size FROM responses ORDER BY used LIMIT 1").fetchone()
+                db.execute("DELETE FROM responses WHERE key = ?", (victim,))
+                total -= victim_size
+                self.evictions += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock of the database for the whole block."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+
+class _CacheKeys:
+    """Request keys shared by the sync and async caching accessors."""
+
+    cache: ResponseCache
+    provider: str
+
+    def _lookup(self, method: str, *parts: Any) -> tuple[str, ModelResponse | None]:
+        key = request_key(self.provider, method, *parts)
+        body = self.cache.get(key)
+        return key, RESPONSE_ADAPTER.validate_json(body) if body is not None else None
+
+    def _store(self, key: str, response: Any) -> None:
+        if isinstance(response, _CACHEABLE):
+            self.cache.put(key, response.model_dump_json())
+
+
+class CachingAccessor(_CacheKeys, BaseModelAccessor):
+    """Serve repeated requests to ``inner`` from a :class:`ResponseCache`.
+
+    Requests are keyed on provider, model, prompts and tool or response
+    schema, so with temperature-0 models a rerun of unchanged nodes makes no
+    network calls. Every hit returns a fresh copy of the response. Streamed
+    calls share the entries of :meth:`call_model`: a miss streams from
+    ``inner`` and stores the final response, a hit hands its subtasks over at
+    once.
+    """
+
+    def __init__(self, inner: BaseModelAccessor, cache: ResponseCache, provider: str | None = None) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return self._cached(
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+            "prompt_model", model, system_prompt, user_prompt,
+        )
+
+    def call_model(self, prompt: str, schema) -> Any:
+        return self._cached(
+            lambda: self.inner.call_model(prompt, schema), "call_model", *call_model_parts(self.inner, prompt, schema)
+        )
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        key, hit = self._lookup("call_model", *call_model_parts(self.inner, prompt, schema))
+        if hit is not None:
+            return emit_subtasks(hit, on_subtask)
+        response = self.inner.stream_call_model(prompt, schema, on_subtask)
+        self._store(key, response)
+        return response
+
+    def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return self._cached(
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+            "execute_task_with_tools", model, system_prompt, user_prompt, tools or [],
+        )
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
+
+    def _cached(self, call: Callable[[], Any], method: str, *parts: Any) -> Any:
+        key, hit = self._lookup(method, *parts)
+        if hit is not None:
+            return hit
+        response = call()
+        self._store(key, response)
+        return response
+
+
+class AsyncCachingAccessor(_CacheKeys, AsyncBaseModelAccessor):
+    """Asyncio counterpart of :class:`CachingAccessor`.
+
+    Cache lookups are local SQLite reads and run inline.
+    """
+
+    def __init__(self, inner: AsyncBaseModelAccessor, cache: ResponseCache, provider: str | None = None) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return await self._cached(
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+            "prompt_model", model, system_prompt, user_prompt,
+        )
+
+    async def call_model(self, prompt: str, schema) -> Any:
+        return await self._cached(
+            lambda: self.inner.call_model(prompt, schema), "call_model", *call_model_parts(self.inner, prompt, schema)
+        )
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        key, hit = self._lookup("call_model", *call_model_parts(self.inner, prompt, schema))
+        if hit is not None:
+            return emit_subtasks(hit, on_subtask)
+        response = await self.inner.stream_call_model(prompt, schema, on_subtask)
+        self._store(key, response)
+        return response
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return await self._cached(
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+            "execute_task_with_tools", model, system_prompt, user_prompt, tools or [],
+        )
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
+
+    async def _cached(self, call: Callable[[], Awaitable[Any]], method: str, *parts: Any) -> Any:
+        key, hit = self._lookup(method, *parts)
+        if hit is not None:
+            return hit
+        response = await call()
+        self._store(key, response)
+        return response
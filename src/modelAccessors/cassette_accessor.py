@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from pydantic import BaseModel
+
+from src.dataModel.adapters import RESPONSE_ADAPTER
+
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool, emit_subtasks
+from .registry import is_transient
+from .request_key import accessor_model, call_model_parts, provider_name, request_key
+
+
+class CassetteMismatchError(LookupError):
+    """A replayed request was not recorded, or was made more often than recorded."""
+
+
+class RecordedError(RuntimeError):
+    """An exception raised by the provider while recording, raised again on replay.
+
+    ``transient`` keeps whether the original error was worth retrying (see
+    :func:`is_transient`), so a replay retries the tasks the recorded run did.
+    """
+
+    def __init__(self, message: str, transient: bool = False) -> None:
+        super().__init__(message)
+        self.transient = transient
+
+
+class _Entry:
+    __slots__ = ("record",)
+
+    def __init__(self, record: dict[str, Any]) -> None:
+        self.record = record
+
+    @property
+    def latency(self) -> float:
+        return float(self.record.get("latency", 0.0))
+
+    def result(self) -> Any:
+        if self.record.get("error") is not None:
+            raise RecordedError(self.record["error"], bool(self.record.get("transient")))
+        if self.record.get("raw"):
+            return self.record["response"]
+        return RESPONSE_ADAPTER.validate_python(self.record["response"])
+
+
+class Cassette:
+    """Request/response pairs of a run, stored one JSON object per line.
+
+    In ``record`` mode every call made through a :class:`CassetteAccessor`
+    is appended as soon as it returns, so a crashed run still leaves a usable
+    cassette. In ``replay`` mode requests are matched by :func:`request_key`;
+    identical requests get their recordings in recorded order. A request
+    with no recording left raises :class:`CassetteMismatchError`.
+    ``latency`` scales the recorded call durations on replay: 0 replays
+    instantly, 1 at recorded speed. The model a provider's ``call_model``
+    requests went to is recorded too (see :meth:`recorded_model`), as a
+    replay has no accessor to ask.
+    """
+
+    def __init__(self, path: str | Path, mode: Literal["record", "replay"], latency: float = 0.0) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if latency < 0:
+            raise ValueError("latency must be >= 0")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._fh: IO[str] | None = None
+        self._tapes: dict[str, deque[_Entry]] = defaultdict(deque)
+        self._models: dict[str, str] = {}
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "w", encoding="utf-8")  # noqa: SIM115 - held until close()
+        else:
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._tapes[record["key"]].append(_Entry(record))
+                        if record.get("model") is not None:
+                            self._models[record["provider"]] = record["model"]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def recorded_model(self, provider: str) -> str | None:
+        """Return the model ``provider``'s accessor named while recording, if any."""
+        return self._models.get(provider)
+
+    def remaining(self) -> int:
+        """Return how many recordings have not been replayed yet."""
+        with self._lock:
+            return sum(len(tape) for tape in self._tapes.values())
+
+    def record(
+        self,
+        provider: str,
+        method: str,
+        parts: tuple[Any, ...],
+        response: Any = None,
+        error: BaseException | None = None,
+        latency: float = 0.0,
+        model: str | None = None,
+    ) -> None:
+        """Append one call to the cassette; ``model`` is the model the accessor names."""
+        if self._fh is None:
+            raise RuntimeError("cassette is not recording")
+        record: dict[str, Any] = {
+            "key": request_key(provider, method, *parts),
+            "provider": provider,
+            "method": method,
+            "request": json.loads(json.dumps(list(parts), default=_jsonable)),
+            "latency": round(latency, 6),
+        }
+        if model is not None:
+            record["model"] = model
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+            if is_transient(provider, error):
+                record["transient"] = True
+        elif isinstance(response, BaseModel):
+            record["response"] = response.model_dump(mode="json")
+        else:
+            record["response"] = response
+            record["raw"] = True
+        line = json.dumps(record, separators=(",", ":"), default=_jsonable)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def play(self, provider: str, method: str, parts: tuple[Any, ...]) -> _Entry:
+        """Return the next recording for a request."""
+        key = request_key(provider, method, *parts)
+        with self._lock:
+            tape = self._tapes.get(key)
+            if not tape:
+                prompt = next((p for p in reversed(parts) if isinstance(p, str) and p), "")
+                raise CassetteMismatchError(
+                    f"No recorded {provider} {method} request left for prompt {prompt[:80]!r} "
+                    f"in {self.path}"
+                )
+            return tape.popleft()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return value.__name__
+    return repr(value)
+
+
+class _CassetteCalls:
+    """Request plumbing shared by the sync and async cassette accessors."""
+
+    cassette: Cassette
+    provider: str
+    inner: Any
+
+    @property
+    def model(self) -> str | None:
+        if self.inner is not None:
+            return accessor_model(self.inner)
+        return self.cassette.recorded_model(self.provider)
+
+    def _record(self, method: str, parts: tuple[Any, ...], start: float, **outcome: Any) -> None:
+        latency = time.perf_counter() - start
+        self.cassette.record(self.provider, method, parts, latency=latency, model=self.model, **outcome)
+
+    def _tool_parts(self, model: str, system_prompt: str, user_prompt: str, tools: list[Tool] | None) -> tuple[Any, ...]:
+        return (model, system_prompt, user_prompt, tools or [])
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model) if self.inner is not None else False
+
+
+class CassetteAccessor(_CassetteCalls, BaseModelAccessor):
+    """Record the calls made to ``inner`` into a :class:`Cassette`, or replay them.
+
+    When replaying, ``inner`` is never called and may be ``None``, so runs
+    need neither network access nor API keys. ``provider`` names the
+    recordings and must be the same when recording and replaying. A streamed
+    call is recorded as its final :meth:`call_model` response; on replay its
+    subtasks are handed over at once.
+    """
+
+    def __init__(self, inner: BaseModelAccessor | None, cassette: Cassette, provider: str | None = None) -> None:
+        if inner is None and not cassette.replaying:
+            raise ValueError("recording needs an accessor to record")
+        self.inner = inner
+        self.cassette = cassette
+        self.provider = provider or provider_name(inner)
+
+    def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return self._call(
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+            "prompt_model", (model, system_prompt, user_prompt),
+        )
+
+    def call_model(self, prompt: str, schema) -> Any:
+        return self._call(
+            lambda: self.inner.call_model(prompt, schema), "call_model", call_model_parts(self, prompt, schema)
+        )
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        if self.cassette.replaying:
+            return emit_subtasks(self.call_model(prompt, schema), on_subtask)
+        return self._call(
+            lambda: self.inner.stream_call_model(prompt, schema, on_subtask),
+            "call_model",
+            call_model_parts(self, prompt, schema),
+        )
+
+    def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return self._call(
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+            "execute_task_with_tools", self._tool_parts(model, system_prompt, user_prompt, tools),
+        )
+
+    def _call(self, call: Callable[[], Any], method: str, parts: tuple[Any, ...]) -> Any:
+        if self.cassette.replaying:
+            entry = self.cassette.play(self.provider, method, parts)
+            if self.cassette.latency and entry.latency:
+                time.sleep(entry.latency * self.cassette.latency)
+            return entry.result()
+        start = time.perf_counter()
+        try:
+            response = call()
+        except Exception as exc:
+            self._record(method, parts, start, error=exc)
+            raise
+        self._record(method, parts, start, response=response)
+        return response
+
+
+class AsyncCassetteAccessor(_CassetteCalls, AsyncBaseModelAccessor):
+    """Asyncio counterpart of :class:`CassetteAccessor`."""
+
+    def __init__(
+        self, inner: AsyncBaseModelAccessor | None, cassette: Cassette, provider: str | None = None
+    ) -> None:
+        if inner is None and not cassette.replaying:
+            raise ValueError("recording needs an accessor to record")
+        self.inner = inner
+        self.cassette = cassette
+        self.provider = provider or provider_name(inner)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return await self._call(
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+            "prompt_model", (model, system_prompt, user_prompt),
+        )
+
+    async def call_model(self, prompt: str, schema) -> Any:
+        return await self._call(
+            lambda: self.inner.call_model(prompt, schema), "call_model", call_model_parts(self, prompt, schema)
+        )
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        if self.cassette.replaying:
+            return emit_subtasks(await self.call_model(prompt, schema), on_subtask)
+        return await self._call(
+            lambda: self.inner.stream_call_model(prompt, schema, on_subtask),
+            "call_model",
+            call_model_parts(self, prompt, schema),
+        )
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return await self._call(
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+            "execute_task_with_tools", self._tool_parts(model, system_prompt, user_prompt, tools),
+        )
+
+    async def _call(self, call: Callable[[], Awaitable[Any]], method: str, parts: tuple[Any, ...]) -> Any:
+        if self.cassette.replaying:
+            entry = self.cassette.play(self.provider, method, parts)
+            if self.cassette.latency and entry.latency:
+                await asyncio.sleep(entry.latency * self.cassette.latency)
+            return entry.result()
+        start = time.perf_counter()
+        try:
+            response = await call()
+        except Exception as exc:
+            self._record(method, parts, start, error=exc)
+            raise
+        self._record(method, parts, start, response=response)
+        return response
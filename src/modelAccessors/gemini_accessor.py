@@ -1,16 +1,27 @@
 from os import environ
-import json
 from typing import Any, Dict, Optional
-from pydantic import TypeAdapter
 import google.generativeai as genai
+from google.api_core.exceptions import DeadlineExceeded, InternalServerError, ServiceUnavailable
 from .base_accessor import BaseModelAccessor, Tool
-from dataModel.model_response import ModelResponse
+from .resilience import CallPolicy, CallStats
+from src.dataModel.adapters import parse_response
+from src.dataModel.model_response import ModelResponse
 
 class GeminiAccessor(BaseModelAccessor):
-    def __init__(self):
+    retryable_errors = (ServiceUnavailable, InternalServerError)
+    timeout_errors = (DeadlineExceeded,)
+
+    def __init__(self, max_connections=None, call_policy=None):
+        """Configure the SDK; it manages its own connections, so ``max_connections`` is unused.
+
+        ``call_policy`` sets per-call deadlines, retries and hedging; their
+        counters are kept in ``stats``.
+        """
         genai.configure(api_key=environ.get("GOOGLE_API_KEY"))
         # Models that support function calling
         self.tool_supported_models = ["gemini-1.5-pro", "gemini-1.5-flash", "gemini-pro"]
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
         
     def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
         """Basic text prompting for Gemini models"""
@@ -18,21 +29,28 @@ class GeminiAccessor(BaseModelAccessor):
         
         # Combine system and user prompts
         full_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
-        
-        response = model_instance.generate_content(full_prompt)
-        
-        content = response.text
-        if not content:
-            raise ValueError("No content in response")
-            
-        # Convert content to JSON format if needed
-        try:
-            json_content = json.loads(content)
-        except json.JSONDecodeError:
-            # If the model didn't return JSON, wrap it in a simple structure
-            json_content = {"text": content}
-            
-        return TypeAdapter(ModelResponse).validate_python(json_content)
+
+        def attempt(timeout: float | None) -> ModelResponse:
+            response = self._rate_limited(
+                model,
+                lambda: model_instance.generate_content(
+                    full_prompt,
+                    request_options=None if timeout is None else {"timeout": timeout},
+                ),
+                full_prompt,
+            )
+
+            content = response.text
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return self._resilient(attempt)
+
+    def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
+        """Convenience wrapper used by simple agent nodes."""
+        return self.prompt_model("gemini-1.5-flash", "", prompt)
         
     def execute_task_with_tools(
         self,
@@ -49,23 +67,25 @@ class GeminiAccessor(BaseModelAccessor):
         gemini_tools = self._convert_to_gemini_tools(tools)
         
         full_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
-        
-        response = model_instance.generate_content(
-            full_prompt,
-            tools=gemini_tools
-        )
-        
-        content = response.text
-        if not content:
-            raise ValueError("No content in response")
-            
-        # Process and convert to ModelResponse
-        try:
-            json_content = json.loads(content)
-        except json.JSONDecodeError:
-            json_content = {"text": content}
-            
-        return TypeAdapter(ModelResponse).validate_python(json_content)
+
+        def attempt(timeout: float | None) -> ModelResponse:
+            response = self._rate_limited(
+                model,
+                lambda: model_instance.generate_content(
+                    full_prompt,
+                    tools=gemini_tools,
+                    request_options=None if timeout is None else {"timeout": timeout},
+                ),
+                full_prompt,
+            )
+
+            content = response.text
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return self._resilient(attempt)
     
     def supports_tools(self, model: str) -> bool:
         """Check if model supports function calling"""
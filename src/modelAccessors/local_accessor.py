@@ -0,0 +1,299 @@
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from os import environ
+from typing import Any
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    InternalServerError,
+    OpenAI,
+)
+from openai._constants import DEFAULT_CONNECTION_LIMITS
+
+from src.dataModel.adapters import parse_response
+from src.dataModel.model_response import FailedResponse, ModelResponse
+
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
+from .registry import pool_limits
+from .resilience import CallPolicy, CallStats, request_options
+from .streaming import acollect_stream, collect_stream
+
+DEFAULT_BASE_URL = "http://localhost:8080/v1"
+DEFAULT_MODEL = "local"
+DEFAULT_CONCURRENCY = 4
+
+
+class _LocalSupport:
+    """Settings and helpers shared by the sync and async local accessors.
+
+    Any server speaking the OpenAI HTTP API works: llama.cpp's server, vLLM,
+    Ollama and the like. Unset arguments are read from ``LOCAL_LLM_BASE_URL``,
+    ``LOCAL_LLM_MODEL``, ``LOCAL_LLM_CONCURRENCY`` and ``LOCAL_LLM_BATCH``.
+    """
+
+    provider = "local"
+
+    def _configure(self, max_connections, call_policy, base_url, model, max_concurrency, batch) -> None:
+        self.base_url: str = base_url or environ.get("LOCAL_LLM_BASE_URL", DEFAULT_BASE_URL)
+        self.model: str = model or environ.get("LOCAL_LLM_MODEL", DEFAULT_MODEL)
+        self.max_concurrency: int = max_concurrency or int(
+            environ.get("LOCAL_LLM_CONCURRENCY", DEFAULT_CONCURRENCY)
+        )
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.batch: bool = batch if batch is not None else environ.get("LOCAL_LLM_BATCH", "") not in ("", "0")
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
+        # keep a warm connection for every request that may be in flight
+        self._limits = pool_limits(DEFAULT_CONNECTION_LIMITS, max_connections or self.max_concurrency)
+        self._api_key = environ.get("LOCAL_LLM_API_KEY", "local")
+
+    @staticmethod
+    def _messages(system_prompt: str, user_prompt: str) -> list[Any]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    @staticmethod
+    def _render(system_prompt: str, user_prompt: str) -> str:
+        """Flatten a chat prompt for the completions endpoint."""
+        return f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
+
+    @staticmethod
+    def _parse(content: str | None) -> ModelResponse:
+        if not content:
+            raise ValueError("No content in response")
+        return parse_response(content)
+
+    def _parse_batch(self, response: Any, size: int) -> list[ModelResponse]:
+        """Return one response per prompt; unparsable answers become ``FailedResponse``s."""
+        texts: list[str | None] = [None] * size
+        for choice in response.choices:
+            texts[choice.index] = choice.text
+        results: list[ModelResponse] = []
+        for text in texts:
+            try:
+                results.append(self._parse(text))
+            except ValueError as exc:  # pydantic's ValidationError included
+                results.append(FailedResponse(error_message=str(exc)))
+        return results
+
+
+class LocalAccessor(_LocalSupport, BaseModelAccessor):
+    """Accessor for a self-hosted, OpenAI-compatible model server.
+
+    One keep-alive connection pool is shared by every caller and at most
+    ``max_concurrency`` requests are sent at once, matching the handful of
+    slots a local server decodes in parallel. :meth:`prompt_model_batch`
+    sends several prompts in one request when ``batch`` is set.
+    """
+
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None, base_url=None, model=None,
+                 max_concurrency=None, batch=None):
+        """Create the client; ``max_connections`` defaults to ``max_concurrency``."""
+        self._configure(max_connections, call_policy, base_url, model, max_concurrency, batch)
+        self.client = OpenAI(
+            base_url=self.base_url,
+            api_key=self._api_key,
+            http_client=DefaultHttpxClient(limits=self._limits),
+            max_retries=0,
+        )
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
+        """Send a prompt to ``model`` on the local server."""
+        def attempt(timeout: float | None) -> ModelResponse:
+            with self._slots:
+                response = self._rate_limited(
+                    model,
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=self._messages(system_prompt, user_prompt),
+                        response_format={"type": "json_object"},
+                        **request_options(timeout),
+                    ),
+                    system_prompt,
+                    user_prompt,
+                )
+            return self._parse(response.choices[0].message.content)
+
+        return self._resilient(attempt)
+
+    def prompt_model_batch(self, model: str, prompts: list[tuple[str, str]]) -> list[ModelResponse]:
+        """Answer several ``(system_prompt, user_prompt)`` pairs, in order.
+
+        With ``batch`` set they go to the completions endpoint as one request,
+        which llama.cpp and vLLM decode together; the server's chat template
+        and JSON mode are not applied there. Otherwise the prompts are sent
+        concurrently and the server batches them itself.
+        """
+        if not prompts:
+            return []
+        if not self.batch:
+            with ThreadPoolExecutor(min(len(prompts), self.max_concurrency)) as pool:
+                return list(pool.map(lambda p: self.prompt_model(model, *p), prompts))
+
+        rendered = [self._render(*p) for p in prompts]
+
+        def attempt(timeout: float | None) -> list[ModelResponse]:
+            with self._slots:
+                response = self._rate_limited(
+                    model,
+                    lambda: self.client.completions.create(model=model, prompt=rendered, **request_options(timeout)),
+                    *rendered,
+                )
+            return self._parse_batch(response, len(prompts))
+
+        return self._resilient(attempt)
+
+    def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
+        """Convenience wrapper used by simple agent nodes."""
+        return self.prompt_model(self.model, "", prompt)
+
+    def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        """Batched :meth:`call_model`, one completions request when ``batch`` is set."""
+        if not self.batch:
+            return super().call_model_batch(prompts, schema)
+        return list(self.prompt_model_batch(self.model, [("", prompt) for prompt in prompts]))
+
+    def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        with self._slots:
+            for chunk in self._rate_limited_stream(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=self._messages(system_prompt, user_prompt),
+                    response_format={"type": "json_object"},
+                    stream=True,
+                    **request_options(self.call_policy.timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return collect_stream(self.stream_model(self.model, "", prompt), on_subtask)
+
+    def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> ModelResponse:
+        """Local models get no native tools; the prompt is sent as is."""
+        return self.prompt_model(model, system_prompt, user_prompt)
+
+
+class AsyncLocalAccessor(_LocalSupport, AsyncBaseModelAccessor):
+    """Non-blocking :class:`LocalAccessor` backed by ``AsyncOpenAI``."""
+
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None, base_url=None, model=None,
+                 max_concurrency=None, batch=None):
+        """Create the client; ``max_connections`` defaults to ``max_concurrency``."""
+        self._configure(max_connections, call_policy, base_url, model, max_concurrency, batch)
+        self.client = AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self._api_key,
+            http_client=DefaultAsyncHttpxClient(limits=self._limits),
+            max_retries=0,
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
+        """Send a prompt to ``model`` without blocking the event loop."""
+        async def attempt(timeout: float | None) -> ModelResponse:
+            async with self._slots:
+                response = await self._rate_limited(
+                    model,
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=self._messages(system_prompt, user_prompt),
+                        response_format={"type": "json_object"},
+                        **request_options(timeout),
+                    ),
+                    system_prompt,
+                    user_prompt,
+                )
+            return self._parse(response.choices[0].message.content)
+
+        return await self._resilient(attempt)
+
+    async def prompt_model_batch(self, model: str, prompts: list[tuple[str, str]]) -> list[ModelResponse]:
+        """Async counterpart of :meth:`LocalAccessor.prompt_model_batch`."""
+        if not prompts:
+            return []
+        if not self.batch:
+            return list(await asyncio.gather(*(self.prompt_model(model, *p) for p in prompts)))
+
+        rendered = [self._render(*p) for p in prompts]
+
+        async def attempt(timeout: float | None) -> list[ModelResponse]:
+            async with self._slots:
+                response = await self._rate_limited(
+                    model,
+                    lambda: self.client.completions.create(model=model, prompt=rendered, **request_options(timeout)),
+                    *rendered,
+                )
+            return self._parse_batch(response, len(prompts))
+
+        return await self._resilient(attempt)
+
+    async def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
+        """Convenience wrapper used by simple agent nodes."""
+        return await self.prompt_model(self.model, "", prompt)
+
+    async def call_model_batch(self, prompts: list[str], schema) -> list[Any]:
+        """Async counterpart of :meth:`LocalAccessor.call_model_batch`."""
+        if not self.batch:
+            return await super().call_model_batch(prompts, schema)
+        return list(await self.prompt_model_batch(self.model, [("", prompt) for prompt in prompts]))
+
+    async def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        async with self._slots:
+            async for chunk in self._rate_limited_stream(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=self._messages(system_prompt, user_prompt),
+                    response_format={"type": "json_object"},
+                    stream=True,
+                    **request_options(self.call_policy.timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return await acollect_stream(self.stream_model(self.model, "", prompt), on_subtask)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> ModelResponse:
+        """Local models get no native tools; the prompt is sent as is."""
+        return await self.prompt_model(model, system_prompt, user_prompt)
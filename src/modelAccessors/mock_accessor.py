@@ -1,4 +1,4 @@
-from .base_accessor import BaseModelAccessor, Tool
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
 from typing import Optional
 from src.dataModel.model_response import (
     ModelResponse,
@@ -10,7 +10,7 @@ from src.dataModel.task import Task, TaskType
 class MockAccessor(BaseModelAccessor):
     """Mock accessor for testing without API calls"""
     
-    def __init__(self):
+    def __init__(self, max_connections=None, call_policy=None):
         # Mock models that "support" tools
         self.tool_supported_models = ["mock-gpt-4", "mock-claude"]
 
@@ -57,3 +57,28 @@ class MockAccessor(BaseModelAccessor):
     def supports_tools(self, model: str) -> bool:
         """Mock tool support for certain models"""
         return model in self.tool_supported_models
+
+
+class AsyncMockAccessor(AsyncBaseModelAccessor):
+    """Asyncio wrapper around :class:`MockAccessor`."""
+
+    def __init__(self, max_connections=None, call_policy=None):
+        self.sync = MockAccessor()
+
+    async def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - simple wrapper
+        return self.sync.call_model(prompt, schema)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
+        return self.sync.prompt_model(model, system_prompt, user_prompt)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> ModelResponse:
+        return self.sync.execute_task_with_tools(model, system_prompt, user_prompt, tools)
+
+    def supports_tools(self, model: str) -> bool:
+        return self.sync.supports_tools(model)
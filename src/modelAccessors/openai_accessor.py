@@ -1,39 +1,121 @@
+from collections.abc import AsyncIterator, Callable, Iterator
 from os import environ
-from typing import Optional
-from openai import OpenAI
-from pydantic import TypeAdapter
-from .base_accessor import BaseModelAccessor, Tool
+from typing import Any, Optional
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from openai._constants import DEFAULT_CONNECTION_LIMITS
+from openai import APIConnectionError, APITimeoutError, InternalServerError
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
+from .registry import pool_limits
+from .resilience import CallPolicy, CallStats, request_options
+from .streaming import acollect_stream, collect_stream
+from src.dataModel.adapters import parse_response
 from src.dataModel.model_response import ModelResponse
 
-class OpenAIAccessor(BaseModelAccessor):
-    def __init__(self):
-        self.client = OpenAI(api_key=environ.get("OPENAI_API_KEY"))
-        # Models that support function calling/tools
-        self.tool_supported_models = ["gpt-4", "gpt-4-turbo", "gpt-4o", "gpt-3.5-turbo-0125", "gpt-3.5-turbo"]
+
+class _OpenAIToolSupport:
+    """Tool helpers shared by the sync and async OpenAI accessors."""
+
+    # Models that support function calling/tools
+    tool_supported_models = ("gpt-4", "gpt-4-turbo", "gpt-4o", "gpt-3.5-turbo-0125", "gpt-3.5-turbo")
+
+    def supports_tools(self, model: str) -> bool:
+        """Check if model supports native tools/function calling"""
+        return model in self.tool_supported_models
+
+    def _convert_to_openai_tools(self, tools: list[Tool]) -> list[dict[str, object]]:
+        """Convert our Tool objects to OpenAI's tool format"""
+        openai_tools: list[dict[str, object]] = []
+        for tool in tools:
+            openai_tools.append({
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": {
+                        "type": "object",
+                        "properties": tool.parameters,
+                        "required": []  # Could be enhanced with required params
+                    }
+                }
+            })
+        return openai_tools
+
+
+class OpenAIAccessor(_OpenAIToolSupport, BaseModelAccessor):
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None):
+        """Create the client; ``max_connections`` caps its HTTP connection pool.
+
+        ``call_policy`` sets per-call deadlines, retries and hedging; their
+        counters are kept in ``stats``.
+        """
+        http_client = (
+            DefaultHttpxClient(limits=pool_limits(DEFAULT_CONNECTION_LIMITS, max_connections))
+            if max_connections
+            else None
+        )
+        self.client = OpenAI(api_key=environ.get("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
 
     def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
         """
         Sends a prompt to the specified OpenAI model and returns the response.
         """
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content: str | None = response.choices[0].message.content
-        if not content:
-            raise ValueError("No content in response")
-            
-        return TypeAdapter(ModelResponse).validate_json(content) # type: ignore
+        def attempt(timeout: float | None) -> ModelResponse:
+            response = self._rate_limited(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content: str | None = response.choices[0].message.content
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return self._resilient(attempt)
 
     def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
         """Convenience wrapper used by simple agent nodes."""
         return self.prompt_model("gpt-4", "", prompt)
 
+    def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        for chunk in self._rate_limited_stream(
+            model,
+            lambda: self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                response_format={"type": "json_object"},
+                stream=True,
+                **request_options(self.call_policy.timeout),
+            ),
+            system_prompt,
+            user_prompt,
+        ):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return collect_stream(self.stream_model("gpt-4", "", prompt), on_subtask)
+
     def execute_task_with_tools(
         self,
         model: str,
@@ -50,40 +132,139 @@ class OpenAIAccessor(BaseModelAccessor):
         # Use native OpenAI function calling
         openai_tools = self._convert_to_openai_tools(tools)
         
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            tools=openai_tools,
-            response_format={"type": "json_object"}
+        def attempt(timeout: float | None) -> ModelResponse:
+            response = self._rate_limited(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    tools=openai_tools,
+                    response_format={"type": "json_object"},
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content = response.choices[0].message.content
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return self._resilient(attempt)
+
+
+class AsyncOpenAIAccessor(_OpenAIToolSupport, AsyncBaseModelAccessor):
+    """Non-blocking OpenAI accessor backed by ``AsyncOpenAI``."""
+
+    retryable_errors = (APIConnectionError, InternalServerError)
+    timeout_errors = (APITimeoutError,)
+
+    def __init__(self, max_connections=None, call_policy=None):
+        """Create the client; ``max_connections`` caps its HTTP connection pool.
+
+        ``call_policy`` sets per-call deadlines, retries and hedging; their
+        counters are kept in ``stats``.
+        """
+        http_client = (
+            DefaultAsyncHttpxClient(limits=pool_limits(DEFAULT_CONNECTION_LIMITS, max_connections))
+            if max_connections
+            else None
         )
-        
-        content = response.choices[0].message.content
-        if not content:
-            raise ValueError("No content in response")
-            
-        return TypeAdapter(ModelResponse).validate_json(content)
-    
-    def supports_tools(self, model: str) -> bool:
-        """Check if model supports native tools/function calling"""
-        return model in self.tool_supported_models
-        
-    def _convert_to_openai_tools(self, tools: list[Tool]) -> list[dict[str, object]]:
-        """Convert our Tool objects to OpenAI's tool format"""
-        openai_tools: list[dict[str, object]] = []
-        for tool in tools:
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": {
-                        "type": "object",
-                        "properties": tool.parameters,
-                        "required": []  # Could be enhanced with required params
-                    }
-                }
-            })
-        return openai_tools
+        self.client = AsyncOpenAI(api_key=environ.get("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+        self.call_policy = call_policy or CallPolicy()
+        self.stats = CallStats()
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> ModelResponse:
+        """Send a prompt to ``model`` without blocking the event loop."""
+        async def attempt(timeout: float | None) -> ModelResponse:
+            response = await self._rate_limited(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content: str | None = response.choices[0].message.content
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return await self._resilient(attempt)
+
+    async def call_model(self, prompt: str, schema) -> ModelResponse:  # pragma: no cover - thin wrapper
+        """Convenience wrapper used by simple agent nodes."""
+        return await self.prompt_model("gpt-4", "", prompt)
+
+    async def stream_model(self, model: str, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Yield the response text of ``model`` as it is generated."""
+        async for chunk in self._rate_limited_stream(
+            model,
+            lambda: self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                response_format={"type": "json_object"},
+                stream=True,
+                **request_options(self.call_policy.timeout),
+            ),
+            system_prompt,
+            user_prompt,
+        ):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> ModelResponse:
+        """Streaming :meth:`call_model`; a half-streamed call is not retried."""
+        return await acollect_stream(self.stream_model("gpt-4", "", prompt), on_subtask)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> ModelResponse:
+        """Execute task with tools - using native function calling if supported"""
+        if not tools or not self.supports_tools(model):
+            return await self.prompt_model(model, system_prompt, user_prompt)
+
+        async def attempt(timeout: float | None) -> ModelResponse:
+            response = await self._rate_limited(
+                model,
+                lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    tools=self._convert_to_openai_tools(tools),
+                    response_format={"type": "json_object"},
+                    **request_options(timeout),
+                ),
+                system_prompt,
+                user_prompt,
+            )
+
+            content = response.choices[0].message.content
+            if not content:
+                raise ValueError("No content in response")
+
+            return parse_response(content)
+
+        return await self._resilient(attempt)
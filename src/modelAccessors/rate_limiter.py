@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from typing import TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field
+
+T = TypeVar("T")
+
+# how long a caller blocked on the concurrency limit sleeps between checks
+_POLL_SECONDS = 0.05
+
+
+class RateLimits(BaseModel):
+    """Quota of one provider model; limits left unset are not enforced.
+
+    ``max_concurrency`` is where additive increase stops, ``min_concurrency``
+    where multiplicative decrease (by ``backoff``) stops. A throttled call is
+    retried up to ``throttle_retries`` times once the shared pause is over.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    requests_per_minute: float | None = Field(default=None, gt=0)
+    tokens_per_minute: float | None = Field(default=None, gt=0)
+    max_concurrency: int = Field(default=32, ge=1)
+    min_concurrency: int = Field(default=1, ge=1)
+    backoff: float = Field(default=0.5, gt=0, lt=1)
+    throttle_retries: int = Field(default=3, ge=0)
+    default_retry_after: float = Field(default=1.0, ge=0)
+
+
+class TokenBucket:
+    """Refill ``rate_per_minute`` units per minute, holding at most a minute's worth."""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self._clock = clock
+        self._level = rate_per_minute
+        self._updated = clock()
+
+    def wait_time(self, amount: float) -> float:
+        """Return how long until ``amount`` units are available."""
+        self._refill()
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def is_throttle(exc: BaseException) -> bool:
+    """Whether ``exc`` is an HTTP 429 raised by a provider SDK."""
+    return getattr(exc, "status_code", None) == 429
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Return the delay requested by the ``retry-after`` headers of ``exc``."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return max(0.0, float(value) / scale)
+            except ValueError:
+                continue  # HTTP-date form; fall back to the default pause
+    return None
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Roughly estimate the prompt tokens of ``texts`` (four characters per token)."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+class RateLimiter:
+    """Pace the requests to one provider model.
+
+    Requests and prompt tokens are metered by token buckets, and concurrency
+    follows AIMD: every successful call raises the limit by ``1/limit``
+    (about one slot per round of calls) and a 429 halves it. A 429 also
+    pauses every caller until its ``retry-after`` has passed, so throttled
+    callers do not retry all at once. Thread-safe, and usable from threads
+    and event loops at the same time.
+    """
+
+    def __init__(self, limits: RateLimits | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = limits or RateLimits()
+        self.limit = float(self.limits.max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        self._clock = clock
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._buckets = [
+            (TokenBucket(rate, clock), weight)
+            for rate, weight in (
+                (self.limits.requests_per_minute, False),
+                (self.limits.tokens_per_minute, True),
+            )
+            if rate is not None
+        ]
+
+    def acquire(self, tokens: int = 1) -> None:
+        """Block until a call of ``tokens`` prompt tokens may start."""
+        with self._cond:
+            while (wait := self._try_acquire(tokens)) > 0:
+                self._cond.wait(wait)
+
+    async def acquire_async(self, tokens: int = 1) -> None:
+        """Asyncio counterpart of :meth:`acquire`."""
+        while True:
+            with self._cond:
+                wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, _POLL_SECONDS))
+
+    def release(self, ok: bool = True) -> None:
+        """End a call; successful calls grow the concurrency limit."""
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                self.limit = min(float(self.limits.max_concurrency), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def throttle(self, delay: float | None = None) -> None:
+        """Record a 429: pause every caller and cut the concurrency limit.
+
+        The limit is cut once per pause, however many in-flight calls come
+        back throttled.
+        """
+        with self._cond:
+            now = self._clock()
+            if now >= self._paused_until:
+                self.limit = max(float(self.limits.min_concurrency), self.limit * self.limits.backoff)
+            self.throttled += 1
+            pause = self.limits.default_retry_after if delay is None else delay
+            self._paused_until = max(self._paused_until, now + pause)
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[], T], tokens: int = 1) -> T:
+        """Run ``fn`` under the limiter, retrying it after 429s."""
+        for attempt in range(self.limits.throttle_retries + 1):
+            self.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as exc:
+                self.release(ok=False)
+                if not is_throttle(exc) or attempt == self.limits.throttle_retries:
+                    raise
+                self.throttle(retry_after(exc))
+                continue
+            self.release()
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 1) -> T:
+        """Asyncio counterpart of :meth:`call`."""
+        for attempt in range(self.limits.throttle_retries + 1):
+            await self.acquire_async(tokens)
+            try:
+                result = await fn()
+            except Exception as exc:
+                self.release(ok=False)
+                if not is_throttle(exc) or attempt == self.limits.throttle_retries:
+                    raise
+                self.throttle(retry_after(exc))
+                continue
+            self.release()
+            return result
+        raise AssertionError("unreachable")
+
+    def stream(self, fn: Callable[[], Iterable[T]], tokens: int = 1) -> Iterator[T]:
+        """Like :meth:`call` for a streamed response, yielding its items.
+
+        The call keeps its concurrency slot until the stream is exhausted or
+        closed, since the provider is generating for as long as it is read.
+        """
+        for attempt in range(self.limits.throttle_retries + 1):
+            self.acquire(tokens)
+            try:
+                items = fn()
+            except Exception as exc:
+                self.release(ok=False)
+                if not is_throttle(exc) or attempt == self.limits.throttle_retries:
+                    raise
+                self.throttle(retry_after(exc))
+                continue
+            ok = False
+            try:
+                yield from items
+                ok = True
+            finally:
+                self.release(ok)
+            return
+        raise AssertionError("unreachable")
+
+    async def astream(self, fn: Callable[[], Awaitable[AsyncIterable[T]]], tokens: int = 1) -> AsyncIterator[T]:
+        """Asyncio counterpart of :meth:`stream`."""
+        for attempt in range(self.limits.throttle_retries + 1):
+            await self.acquire_async(tokens)
+            try:
+                items = await fn()
+            except Exception as exc:
+                self.release(ok=False)
+                if not is_throttle(exc) or attempt == self.limits.throttle_retries:
+                    raise
+                self.throttle(retry_after(exc))
+                continue
+            ok = False
+            try:
+                async for item in items:
+                    yield item
+                ok = True
+            finally:
+                self.release(ok)
+            return
+        raise AssertionError("unreachable")
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Start a call and return 0, or return how long to wait first."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.in_flight >= int(self.limit):
+            return _POLL_SECONDS
+        wait = max((bucket.wait_time(tokens if weighted else 1) for bucket, weighted in self._buckets), default=0.0)
+        if wait > 0:
+            return wait
+        for bucket, weighted in self._buckets:
+            bucket.take(tokens if weighted else 1)
+        self.in_flight += 1
+        return 0.0
+
+
+class RateLimiterRegistry:
+    """Process-wide :class:`RateLimiter` per provider model.
+
+    Limits configured for ``provider/model`` take precedence over those of
+    ``provider``; models without either get the default :class:`RateLimits`.
+    """
+
+    def __init__(self) -> None:
+        self._limits: dict[str, RateLimits] = {}
+        self._limiters: dict[tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, provider: str, limits: RateLimits, model: str | None = None) -> None:
+        """Set the limits of ``provider`` (or one of its models)."""
+        with self._lock:
+            self._limits[f"{provider}/{model}" if model else provider] = limits
+            for key in [k for k in self._limiters if k[0] == provider and (model is None or k[1] == model)]:
+                del self._limiters[key]
+
+    def get(self, provider: str, model: str) -> RateLimiter:
+        with self._lock:
+            key = (provider, model)
+            if key not in self._limiters:
+                limits = self._limits.get(f"{provider}/{model}") or self._limits.get(provider)
+                self._limiters[key] = RateLimiter(limits)
+            return self._limiters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._limits.clear()
+            self._limiters.clear()
+
+
+RATE_LIMITERS = RateLimiterRegistry()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from functools import cache
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Any, TypeVar
+
+A = TypeVar("A")
+
+
+class AccessorRegistry:
+    """Hand out one shared accessor per key for the whole process.
+
+    Accessors own an SDK client and with it an HTTP connection pool, so
+    sharing them keeps TLS sessions and keep-alive connections across tasks.
+    The OpenAI and Anthropic clients are thread-safe, so one instance can
+    serve every worker thread.
+    """
+
+    def __init__(self) -> None:
+        self._instances: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def get(self, key: Hashable, factory: Callable[[], A]) -> A:
+        """Return the accessor stored under ``key``, creating it with ``factory`` once."""
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = factory()
+            return self._instances[key]
+
+    def clear(self) -> None:
+        """Forget every shared accessor, e.g. after API keys changed."""
+        with self._lock:
+            self._instances.clear()
+
+
+ACCESSOR_REGISTRY = AccessorRegistry()
+
+# entry point groups naming the accessor classes by provider; other packages
+# can add providers, or replace a built-in one, by declaring entry points here
+ACCESSOR_GROUP = "treeagent.accessors"
+ASYNC_ACCESSOR_GROUP = "treeagent.async_accessors"
+
+# the built-in providers, also declared as entry points in ``pyproject.toml``,
+# so a source checkout that was never installed still finds them
+_BUILTIN_ACCESSORS = {
+    ACCESSOR_GROUP: {
+        "openai": "src.modelAccessors.openai_accessor:OpenAIAccessor",
+        "anthropic": "src.modelAccessors.anthropic_accessor:AnthropicAccessor",
+        "gemini": "src.modelAccessors.gemini_accessor:GeminiAccessor",
+        "local": "src.modelAccessors.local_accessor:LocalAccessor",
+        "mock": "src.modelAccessors.mock_accessor:MockAccessor",
+    },
+    ASYNC_ACCESSOR_GROUP: {
+        "openai": "src.modelAccessors.openai_accessor:AsyncOpenAIAccessor",
+        "anthropic": "src.modelAccessors.anthropic_accessor:AsyncAnthropicAccessor",
+        "local": "src.modelAccessors.local_accessor:AsyncLocalAccessor",
+        "mock": "src.modelAccessors.mock_accessor:AsyncMockAccessor",
+    },
+}
+
+
+@cache
+def _declared(group: str) -> dict[str, str]:
+    """Map provider names to the ``module:Class`` references declared for ``group``."""
+    declared = dict(_BUILTIN_ACCESSORS[group])
+    declared.update((ep.name, ep.value) for ep in entry_points(group=group))
+    return declared
+
+
+@cache
+def accessor_class(provider: str, asynchronous: bool = False) -> type[Any]:
+    """Return the accessor class registered for ``provider``.
+
+    Only the module of that one accessor is imported, on first use, so a run
+    pays for the SDKs of the providers its tasks actually use and nothing
+    else. Built with ``(max_connections, call_policy)``.
+    """
+    group = ASYNC_ACCESSOR_GROUP if asynchronous else ACCESSOR_GROUP
+    reference = _declared(group).get(provider)
+    if reference is None:
+        kind = "asyncio accessor" if asynchronous else "accessor"
+        raise ValueError(f"No {kind} registered for {provider!r}")
+    module, _, name = reference.partition(":")
+    return getattr(import_module(module), name)
+
+
+def is_transient(provider: str, exc: BaseException) -> bool:
+    """Whether ``exc``, raised by a call to ``provider``, is worth retrying.
+
+    Decided by the ``retryable_errors`` and ``timeout_errors`` of the
+    provider's accessor class. An exception with a ``transient`` attribute,
+    such as a replayed recording, says so itself.
+    """
+    transient = getattr(exc, "transient", None)
+    if transient is not None:
+        return bool(transient)
+    try:
+        accessor = accessor_class(provider)
+    except (ValueError, ImportError):
+        from .base_accessor import BaseModelAccessor
+
+        accessor = BaseModelAccessor
+    return isinstance(exc, accessor.retryable_errors + accessor.timeout_errors)
+
+
+def pool_limits(defaults: Any, max_connections: int) -> Any:
+    """Return connection limits like the SDK's ``defaults`` capped at ``max_connections``.
+
+    Built from the type of the SDK's own default limits, so it works with
+    whichever HTTP library the installed SDK uses.
+    """
+    if max_connections < 1:
+        raise ValueError("max_connections must be >= 1")
+    return type(defaults)(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=defaults.keepalive_expiry,
+    )
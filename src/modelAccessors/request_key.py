@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def provider_name(accessor: object) -> str:
+    """Return the provider an accessor talks to, e.g. ``openai``.
+
+    Accessors may set a ``provider`` attribute; otherwise it is derived from
+    the class name, so sync and async accessors of a provider share keys.
+    """
+    name = getattr(accessor, "provider", None)
+    if isinstance(name, str):
+        return name
+    return type(accessor).__name__.removeprefix("Async").removesuffix("Accessor").lower()
+
+
+def accessor_model(accessor: object) -> str | None:
+    """Return the model ``accessor.call_model`` sends to, if the accessor names one.
+
+    ``call_model`` takes no model argument. Accessors whose model is
+    configurable, such as the local accessor, expose it as ``model``, and
+    wrappers pass their inner accessor's through.
+    """
+    model = getattr(accessor, "model", None)
+    return model if isinstance(model, str) else None
+
+
+def call_model_parts(accessor: object, prompt: str, schema: Any) -> tuple[Any, ...]:
+    """Return the key parts of a ``call_model`` request to ``accessor``.
+
+    The model leads them when the accessor names one, so responses of one
+    model are never served for another.
+    """
+    model = accessor_model(accessor)
+    return (prompt, schema) if model is None else (model, prompt, schema)
+
+
+def request_key(provider: str, method: str, *parts: Any) -> str:
+    """Return a stable content hash identifying one accessor request.
+
+    ``parts`` are the call arguments: prompts, model names, tool lists and
+    response schemas. Pydantic models and model classes are reduced to their
+    JSON form, so equal requests hash equally across runs.
+    """
+    payload = json.dumps(
+        [provider, method, *(_normalize(part) for part in parts)],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _normalize(part: Any) -> Any:
+    if isinstance(part, BaseModel):
+        return part.model_dump(mode="json")
+    if isinstance(part, type) and issubclass(part, BaseModel):
+        return part.model_json_schema()
+    if isinstance(part, (list, tuple)):
+        return [_normalize(item) for item in part]
+    return part
+
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CallPolicy(BaseModel):
+    """Deadlines, retries and hedging of each model call.
+
+    ``timeout`` bounds every attempt and ``deadline`` the whole call,
+    retries and hedges included; both are handed to the SDK as its request
+    timeout. Up to ``max_attempts`` attempts are made while the error is
+    retryable or the model answers with a ``FailedResponse`` marked
+    ``retryable``, sleeping a jittered exponential backoff in between; the
+    SDKs' own retries are off, so every attempt is one request. With
+    ``hedge`` a duplicate attempt is started once the first one has run for
+    the ``hedge_quantile`` latency of the last calls (after
+    ``hedge_min_samples`` of them), and whichever answers first wins.
+
+    ``max_connections`` caps the HTTP connection pool of each provider
+    client. With ``coalesce`` identical requests made while one is already
+    in flight wait for its response instead of calling the provider again.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    timeout: float | None = Field(default=None, gt=0)
+    deadline: float | None = Field(default=None, gt=0)
+    max_attempts: int = Field(default=1, ge=1)
+    backoff_base: float = Field(default=0.5, ge=0)
+    backoff_max: float = Field(default=8.0, ge=0)
+    hedge: bool = False
+    hedge_quantile: float = Field(default=0.95, gt=0, lt=1)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    max_connections: int | None = Field(default=None, ge=1)
+    coalesce: bool = True
+
+
+class CallStats:
+    """Counters of one accessor's calls, plus a window of recent latencies.
+
+    ``calls`` counts calls, ``attempts`` the requests they made, and
+    ``retries``, ``timeouts``, ``hedges`` (duplicates started),
+    ``hedge_wins`` (duplicates that answered first) and ``failures`` (calls
+    that gave up) what happened along the way. Thread-safe.
+    """
+
+    COUNTERS = ("calls", "attempts", "retries", "timeouts", "hedges", "hedge_wins", "failures")
+
+    def __init__(self, window: int = 200) -> None:
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.calls = self.attempts = self.retries = self.timeouts = 0
+        self.hedges = self.hedge_wins = self.failures = 0
+
+    def count(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a successful attempt."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, q: float, min_samples: int = 1) -> float | None:
+        """Return the ``q`` latency quantile, or None with fewer than ``min_samples``."""
+        with self._lock:
+            if len(self._latencies) < min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {name: getattr(self, name) for name in self.COUNTERS}
+
+
+def request_options(timeout: float | None) -> dict[str, Any]:
+    """SDK keyword arguments for an attempt; None keeps the client's default timeout."""
+    return {} if timeout is None else {"timeout": timeout}
+
+
+class ResilientCall:
+    """Run one model call under a :class:`CallPolicy`, updating :class:`CallStats`.
+
+    ``attempt`` makes one request given its timeout in seconds (or None).
+    Exceptions that are instances of ``retryable`` are retried, and those of
+    ``timeouts`` also count as timeouts.
+    """
+
+    def __init__(
+        self,
+        policy: CallPolicy,
+        stats: CallStats,
+        retryable: tuple[type[BaseException], ...] = (TimeoutError, ConnectionError),
+        timeouts: tuple[type[BaseException], ...] = (TimeoutError,),
+    ) -> None:
+        self.policy = policy
+        self.stats = stats
+        self.retryable = retryable
+        self.timeouts = timeouts
+        self._start = time.monotonic()
+
+    def run(self, attempt: Callable[[float | None], Any]) -> Any:
+        self.stats.count("calls")
+        for n in range(self.policy.max_attempts):
+            try:
+                result = self._hedged(attempt)
+            except Exception as exc:
+                if not self._retry(exc, n):
+                    raise
+            else:
+                if not self._retry(result, n):
+                    return result
+            time.sleep(self._backoff(n))
+        raise AssertionError("unreachable")
+
+    async def arun(self, attempt: Callable[[float | None], Awaitable[Any]]) -> Any:
+        self.stats.count("calls")
+        for n in range(self.policy.max_attempts):
+            try:
+                result = await self._ahedged(attempt)
+            except Exception as exc:
+                if not self._retry(exc, n):
+                    raise
+            else:
+                if not self._retry(result, n):
+                    return result
+            await asyncio.sleep(self._backoff(n))
+        raise AssertionError("unreachable")
+
+    def _remaining(self) -> float | None:
+        if self.policy.deadline is None:
+            return self.policy.timeout
+        left = max(0.001, self.policy.deadline - (time.monotonic() - self._start))
+        return left if self.policy.timeout is None else min(left, self.policy.timeout)
+
+    def _hedge_delay(self) -> float | None:
+        if not self.policy.hedge:
+            return None
+        return self.stats.percentile(self.policy.hedge_quantile, self.policy.hedge_min_samples)
+
+    def _timed(self, attempt: Callable[[float | None], Any]) -> Any:
+        self.stats.count("attempts")
+        started = time.monotonic()
+        try:
+            result = attempt(self._remaining())
+        except self.timeouts:
+            self.stats.count("timeouts")
+            raise
+        self.stats.observe(time.monotonic() - started)
+        return result
+
+    async def _atimed(self, attempt: Callable[[float | None], Awaitable[Any]]) -> Any:
+        self.stats.count("attempts")
+        started = time.monotonic()
+        try:
+            result = await attempt(self._remaining())
+        except self.timeouts:
+            self.stats.count("timeouts")
+            raise
+        self.stats.observe(time.monotonic() - started)
+        return result
+
+    def _started(self, attempt: Callable[[float | None], Any]) -> Future[Any]:
+        """Start ``attempt`` on a thread of its own and return its future.
+
+        Not a shared pool: a queued attempt would spend its hedge delay
+        waiting for a worker, and the pool size would cap every caller's
+        concurrency. Callers are bounded by the orchestrator anyway.
+        """
+        future: Future[Any] = Future()
+
+        def run() -> None:
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._timed(attempt))
+            except Exception as exc:  # noqa: BLE001 - handed back to the caller
+                future.set_exception(exc)
+
+        threading.Thread(target=run, name="treeagent-hedge", daemon=True).start()
+        return future
+
+    def _hedged(self, attempt: Callable[[float | None], Any]) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed(attempt)
+        primary = self._started(attempt)
+        if wait([primary], timeout=delay).done:
+            return primary.result()
+        self.stats.count("hedges")
+        # a losing sync attempt cannot be cancelled; it ends at its SDK timeout
+        hedge = self._started(attempt)
+        pending: set[Future[Any]] = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # prefer an answer; only fail once both attempts failed
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.stats.count("hedge_wins")
+                    return future.result()
+            if not pending:
+                return next(iter(done)).result()
+
+    async def _ahedged(self, attempt: Callable[[float | None], Awaitable[Any]]) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._atimed(attempt)
+        primary = asyncio.ensure_future(self._atimed(attempt))
+        first, _ = await asyncio.wait({primary}, timeout=delay)
+        if first:
+            return primary.result()
+        self.stats.count("hedges")
+        hedge = asyncio.ensure_future(self._atimed(attempt))
+        pending: set[asyncio.Future[Any]] = {primary, hedge}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self.stats.count("hedge_wins")
+                        return future.result()
+                if not pending:
+                    return next(iter(done)).result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _retry(self, outcome: Any, n: int) -> bool:
+        """Whether to retry after attempt ``n`` ended with ``outcome``."""
+        if isinstance(outcome, BaseException):
+            retryable = isinstance(outcome, self.retryable)
+        else:
+            # only FailedResponse carries the flag; any other response is a success
+            flag = getattr(outcome, "retryable", None)
+            if flag is None:
+                return False
+            retryable = bool(flag)
+        if retryable and n + 1 < self.policy.max_attempts and not self._out_of_time(self._backoff_cap(n)):
+            self.stats.count("retries")
+            return True
+        self.stats.count("failures")
+        return False
+
+    def _backoff_cap(self, n: int) -> float:
+        return min(self.policy.backoff_max, self.policy.backoff_base * 2**n)
+
+    def _backoff(self, n: int) -> float:
+        return random.uniform(0, self._backoff_cap(n))
+
+    def _out_of_time(self, pause: float) -> bool:
+        if self.policy.deadline is None:
+            return False
+        return time.monotonic() - self._start + pause >= self.policy.deadline
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from typing import Any
+
+from pydantic import BaseModel
+
+from .base_accessor import AsyncBaseModelAccessor, BaseModelAccessor, Tool
+from .request_key import accessor_model, call_model_parts, provider_name, request_key
+
+
+def _copy(response: Any) -> Any:
+    # followers get their own copy: nodes and the orchestrator mutate responses
+    if isinstance(response, BaseModel):
+        return response.model_copy(deep=True)
+    return copy.deepcopy(response)
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result.
+
+    The first caller of a key makes the call; callers arriving while it is in
+    flight wait for it and receive a copy of its response, or its exception.
+    Nothing is kept once the call finishes. ``shared`` counts the calls saved.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, Future[Any]] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._inflight[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return _copy(future.result())
+        try:
+            result = call()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of :class:`SingleFlight`, bound to one event loop."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self.shared = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            # shield so a cancelled follower does not cancel the leader's call
+            return _copy(await asyncio.shield(future))
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # mark retrieved so a call without followers does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+
+class SingleFlightAccessor(BaseModelAccessor):
+    """Coalesce identical concurrent requests to ``inner`` into one call.
+
+    Requests are keyed like the response cache, on provider, model, prompts
+    and tool or response schema. Share one :class:`SingleFlight` between the
+    accessors of a provider to coalesce across node types. Streamed calls go
+    straight to ``inner``: a follower could only see the subtasks once the
+    leader's call had finished, which would defeat the streaming.
+    """
+
+    def __init__(
+        self,
+        inner: BaseModelAccessor,
+        flight: SingleFlight | None = None,
+        provider: str | None = None,
+    ) -> None:
+        self.inner = inner
+        self.flight = flight or SingleFlight()
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return self.flight.do(
+            request_key(self.provider, "prompt_model", model, system_prompt, user_prompt),
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+        )
+
+    def call_model(self, prompt: str, schema) -> Any:
+        return self.flight.do(
+            request_key(self.provider, "call_model", *call_model_parts(self.inner, prompt, schema)),
+            lambda: self.inner.call_model(prompt, schema),
+        )
+
+    def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        return self.inner.stream_call_model(prompt, schema, on_subtask)
+
+    def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return self.flight.do(
+            request_key(self.provider, "execute_task_with_tools", model, system_prompt, user_prompt, tools or []),
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+        )
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
+
+
+class AsyncSingleFlightAccessor(AsyncBaseModelAccessor):
+    """Asyncio counterpart of :class:`SingleFlightAccessor`."""
+
+    def __init__(
+        self,
+        inner: AsyncBaseModelAccessor,
+        flight: AsyncSingleFlight | None = None,
+        provider: str | None = None,
+    ) -> None:
+        self.inner = inner
+        self.flight = flight or AsyncSingleFlight()
+        self.provider = provider or provider_name(inner)
+
+    @property
+    def model(self) -> str | None:
+        return accessor_model(self.inner)
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str) -> Any:
+        return await self.flight.do(
+            request_key(self.provider, "prompt_model", model, system_prompt, user_prompt),
+            lambda: self.inner.prompt_model(model, system_prompt, user_prompt),
+        )
+
+    async def call_model(self, prompt: str, schema) -> Any:
+        return await self.flight.do(
+            request_key(self.provider, "call_model", *call_model_parts(self.inner, prompt, schema)),
+            lambda: self.inner.call_model(prompt, schema),
+        )
+
+    async def stream_call_model(self, prompt: str, schema, on_subtask: Callable[[Any], Any]) -> Any:
+        return await self.inner.stream_call_model(prompt, schema, on_subtask)
+
+    async def execute_task_with_tools(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        tools: list[Tool] | None = None,
+    ) -> Any:
+        return await self.flight.do(
+            request_key(self.provider, "execute_task_with_tools", model, system_prompt, user_prompt, tools or []),
+            lambda: self.inner.execute_task_with_tools(model, system_prompt, user_prompt, tools),
+        )
+
+    def supports_tools(self, model: str) -> bool:
+        return self.inner.supports_tools(model)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterable, Callable, Iterable
+from typing import Any
+
+from src.dataModel.adapters import parse_response
+from src.dataModel.model_response import DecomposedResponse, ModelResponse
+from src.dataModel.task import Task
+
+# the array has been closed; no depth matches it any more
+_CLOSED = -1
+
+
+class SubtaskStreamParser:
+    """Pick the elements of a JSON document's top-level ``subtasks`` array out of a stream.
+
+    :meth:`feed` takes the document piece by piece and returns every array
+    element that became complete, so callers can act on a subtask while the
+    model is still generating the next one. Only string, escape and nesting
+    state is tracked, each character is looked at once, and the whole
+    document stays available as ``text`` for the final validation.
+    """
+
+    def __init__(self, field: str = "subtasks") -> None:
+        self.text = ""
+        self._key = json.dumps(field)
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = ""
+        self._array_depth: int | None = None
+        self._element_start: int | None = None
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Add ``chunk`` and return the array elements it completed."""
+        self.text += chunk
+        text = self.text
+        elements: list[dict[str, Any]] = []
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start : i + 1]
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                if c == "[" and self._depth == 1 and self._array_depth is None and self._last_string == self._key:
+                    self._array_depth = 2
+                elif c == "{" and self._depth == self._array_depth:
+                    self._element_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if c == "}" and self._depth == self._array_depth and self._element_start is not None:
+                    elements.append(json.loads(text[self._element_start : i + 1]))
+                    self._element_start = None
+                elif c == "]" and self._depth == 1 and self._array_depth == 2:
+                    self._array_depth = _CLOSED
+        self._pos = len(text)
+        return elements
+
+
+class _Collector:
+    """Validate streamed subtasks and assemble the final response."""
+
+    def __init__(self, on_subtask: Callable[[Task], Any]) -> None:
+        self.parser = SubtaskStreamParser()
+        self.on_subtask = on_subtask
+        self.emitted: list[Task] = []
+
+    def feed(self, chunk: str) -> None:
+        for element in self.parser.feed(chunk):
+            task = Task.model_validate(element)
+            self.emitted.append(task)
+            self.on_subtask(task)
+
+    def response(self) -> ModelResponse:
+        response = parse_response(self.parser.text)
+        if isinstance(response, DecomposedResponse):
+            # hand back the very tasks the callback saw
+            response.subtasks[: len(self.emitted)] = self.emitted
+        return response
+
+
+def collect_stream(chunks: Iterable[str], on_subtask: Callable[[Task], Any]) -> ModelResponse:
+    """Parse a streamed response, calling ``on_subtask`` for each subtask once it is complete."""
+    collector = _Collector(on_subtask)
+    for chunk in chunks:
+        collector.feed(chunk)
+    return collector.response()
+
+
+async def acollect_stream(chunks: AsyncIterable[str], on_subtask: Callable[[Task], Any]) -> ModelResponse:
+    """Asyncio counterpart of :func:`collect_stream`."""
+    collector = _Collector(on_subtask)
+    async for chunk in chunks:
+        collector.feed(chunk)
+    return collector.response()
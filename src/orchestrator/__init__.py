@@ -4,16 +4,27 @@ from src.dataManagement.project_manager import (
     load_project_state,
     latest_snapshot_path,
 )
+from src.dataManagement.checkpointer import CheckpointPolicy
+from src.modelAccessors.resilience import CallPolicy
 from .orchestrator import (
     AgentOrchestrator,
     NODE_FACTORY,
 )
+from .async_orchestrator import AsyncAgentOrchestrator
+from .retries import RetryPolicy
+from .scheduler import SchedulingPolicy, StreamingPolicy
 
 __all__ = [
     "AgentOrchestrator",
+    "AsyncAgentOrchestrator",
     "Project",
     "save_project_state",
     "load_project_state",
     "latest_snapshot_path",
     "NODE_FACTORY",
+    "SchedulingPolicy",
+    "StreamingPolicy",
+    "CheckpointPolicy",
+    "CallPolicy",
+    "RetryPolicy",
 ]
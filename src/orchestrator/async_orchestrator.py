@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections import deque
+from collections.abc import Callable
+from functools import partial
+from typing import Any, cast
+
+from src.agentNodes.base_node import AgentNode
+from src.dataModel.adapters import as_response
+from src.dataModel.model import AccessorType
+from src.dataModel.model_response import FailedResponse, ModelResponse
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus
+from src.modelAccessors.base_accessor import AsyncBaseModelAccessor, BaseModelAccessor
+from src.modelAccessors.batching import AsyncBatchingAccessor, AsyncMicroBatcher
+from src.modelAccessors.caching_accessor import AsyncCachingAccessor
+from src.modelAccessors.cassette_accessor import AsyncCassetteAccessor, CassetteMismatchError
+from src.modelAccessors.registry import accessor_class
+from src.modelAccessors.single_flight import AsyncSingleFlight, AsyncSingleFlightAccessor
+
+from . import orchestrator as _sync
+from .orchestrator import _Nodes, _Run
+
+
+class AsyncAgentOrchestrator(_sync.BaseOrchestrator):
+    """Run a project on a single event loop using asyncio accessors.
+
+    Node calls are awaited instead of occupying a thread each, so one process
+    can keep many LLM requests in flight across several projects. Results are
+    applied in dispatch order exactly like :class:`AgentOrchestrator`.
+    Nodes that are plain callables (not :class:`AgentNode`) are run in a
+    worker thread.
+    """
+
+    def _get_accessor(self, accessor_type: AccessorType) -> AsyncBaseModelAccessor:
+        """Get a new asyncio accessor for the given accessor type.
+
+        Called once per accessor type and run; the nodes built with it are
+        shared by every task of the run, and its client is closed when the
+        run ends.
+        """
+        cls = accessor_class(accessor_type.value, asynchronous=True)
+        return cls(self.call_policy.max_connections, self.call_policy)
+
+    async def implement_project(self, project_prompt: str, checkpoint_dir: str = "checkpoints") -> Project:
+        """Async counterpart of :meth:`AgentOrchestrator.implement_project`."""
+        return await self._run_loop(self._new_project(project_prompt, checkpoint_dir))
+
+    async def resume_project(self, checkpoint_dir: str) -> Project:
+        """Resume an existing project from ``checkpoint_dir``."""
+        return await self._run_loop(await asyncio.to_thread(self._load_project, checkpoint_dir))
+
+    def _nodes_for_run(self) -> _Nodes:
+        """Return new nodes for a run.
+
+        Async clients and futures are bound to the event loop, so nodes,
+        in-flight requests and open batches are shared per run only.
+        """
+        streaming = self.streaming_policy
+        batcher = AsyncMicroBatcher(streaming.batch_window, streaming.max_batch_size) if streaming.batch_window else None
+        return _Nodes(AsyncSingleFlight(), batcher)
+
+    def _accessor_for(self, run: _Run, task: Task) -> BaseModelAccessor:
+        """Return the accessor for ``task`` behind the configured cassette and cache."""
+        accessor: AsyncBaseModelAccessor
+        provider = task.model.accessor_type.value
+        if self.cassette is not None and self.cassette.replaying:
+            accessor = AsyncCassetteAccessor(None, self.cassette, provider)
+        else:
+            if task.model.accessor_type not in run.accessors:
+                run.accessors[task.model.accessor_type] = self._get_accessor(task.model.accessor_type)
+            accessor = run.accessors[task.model.accessor_type]
+            if run.nodes.batcher is not None:
+                accessor = AsyncBatchingAccessor(accessor, cast(AsyncMicroBatcher, run.nodes.batcher), provider)
+            # mock accessors answer instantly, so there is nothing to coalesce
+            if self.call_policy.coalesce and task.model.accessor_type != AccessorType.MOCK:
+                accessor = AsyncSingleFlightAccessor(accessor, cast(AsyncSingleFlight, run.nodes.flight), provider)
+            if self.cassette is not None:
+                accessor = AsyncCassetteAccessor(accessor, self.cassette, provider)
+        if self.response_cache is not None:
+            accessor = AsyncCachingAccessor(accessor, self.response_cache)
+        # nodes only duck-type the accessor, so the async one can be handed over as-is
+        return cast(BaseModelAccessor, accessor)
+
+    async def _execute_task(
+        self,
+        run: _Run,
+        task: Task,
+        on_subtask: Callable[[Task], Any] | None = None,
+    ) -> ModelResponse:
+        """Run the node for ``task`` and return its validated response."""
+        node = self._node_for(run, task)
+        if node is None:
+            return FailedResponse(error_message=f"No node for {task.type}")
+        try:
+            if isinstance(node, AgentNode):
+                response = await node.arespond(task, {"on_subtask": on_subtask} if on_subtask else None)
+            elif inspect.iscoroutinefunction(node):
+                response = await node(task)
+            else:
+                response = await asyncio.to_thread(node, task)
+            self.logger.debug("Raw response: %s", response)
+            return as_response(response)
+        except CassetteMismatchError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            return self._failure(task, exc)
+
+    async def _run_loop(self, run: _Run) -> Project:
+        """Execute ready tasks until the queue is empty, ``max_parallel`` at a time."""
+        inflight: deque[tuple[Task, asyncio.Task[ModelResponse]]] = deque()
+
+        # subtasks streamed by running tasks; ``streamed`` is set when one arrives
+        events: deque[tuple[Task, Task]] = deque()
+        streamed = asyncio.Event()
+
+        def on_subtask(parent: Task, subtask: Task) -> None:
+            events.append((parent, subtask))
+            streamed.set()
+
+        self._open_store(run)
+        scheduler, checkpointer = run.scheduler, run.checkpointer
+        store = scheduler.store
+        stream = self.streaming_policy.stream_subtasks
+
+        # whether the parked state was saved since the run went idle
+        saved = False
+
+        try:
+            while scheduler or inflight or store.count(TaskStatus.PENDING_USER_INPUT):
+                if self._take_answers(run):
+                    saved = False
+                self._release_retries(run)
+                # spawn streamed subtasks first so they can start right away
+                streamed.clear()
+                while events:
+                    self._spawn_streamed(run, *events.popleft())
+                while len(inflight) < self.max_parallel:
+                    current_task = self._start_task(scheduler)
+                    if current_task is None:
+                        break
+                    sink = partial(on_subtask, current_task) if stream else None
+                    inflight.append(
+                        (current_task, asyncio.create_task(self._execute_task(run, current_task, sink)))
+                    )
+
+                if not inflight:
+                    retry_in = run.retries.wait_time()
+                    if retry_in is not None:
+                        # nothing can run before the next retry is due
+                        await asyncio.sleep(min(retry_in, self.answer_poll_interval))
+                        continue
+                    if store.count(TaskStatus.PENDING_USER_INPUT):
+                        # only parked tasks are left
+                        if not self.wait_for_answers:
+                            break
+                        if not saved:
+                            await asyncio.to_thread(checkpointer.checkpoint, False, True)
+                            saved = True
+                            self.logger.info(
+                                "Waiting for answers: treeagent answer TASK_ID --checkpoint-dir %s", run.directory
+                            )
+                        await asyncio.sleep(self.answer_poll_interval)
+                        continue
+                    self._block_unrunnable(scheduler, idle=True)
+                    await asyncio.to_thread(checkpointer.checkpoint)
+                    continue
+
+                head = inflight[0][1]
+                retry_in = self._retry_wait(run, len(inflight))
+                if stream and not head.done():
+                    # wake up for streamed subtasks (and due retries) while the head task is still running
+                    wake = asyncio.ensure_future(streamed.wait())
+                    await asyncio.wait({head, wake}, timeout=retry_in, return_when=asyncio.FIRST_COMPLETED)
+                    wake.cancel()
+                    continue
+                if retry_in is not None and not (await asyncio.wait({head}, timeout=retry_in))[0]:
+                    # a retry became due before the head task finished; start it
+                    continue
+
+                current_task, pending = inflight.popleft()
+                self._finish_task(run, current_task, await pending)
+                await asyncio.to_thread(checkpointer.checkpoint)
+            await asyncio.to_thread(checkpointer.checkpoint, True)
+        finally:
+            for _, pending in inflight:
+                pending.cancel()
+            checkpointer.close()
+            # the run's clients hold connections bound to this event loop
+            await asyncio.gather(
+                *(accessor.aclose() for accessor in run.accessors.values() if isinstance(accessor, AsyncBaseModelAccessor))
+            )
+
+        self._log_cache_stats(run)
+        return run.project
@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable
+from queue import Empty, SimpleQueue
+from typing import Any, Callable, cast
 
 from src.logging_utils import init_logger
 
-from pydantic import TypeAdapter
-
 from src.dataModel.task import Task, TaskType, TaskStatus
+from src.dataModel.adapters import as_response
 from src.dataModel.model import AccessorType, Model
 from src.dataModel.model_response import (
     ModelResponse,
@@ -21,15 +26,27 @@ from src.dataModel.model_response import (
     FailedResponse,
 )
 from src.dataModel.project import Project
+from src.dataManagement.answers import AnswerInbox
+from src.dataManagement.blobs import BLOB_DIR, BlobStore
+from src.dataManagement.checkpointer import Checkpointer, CheckpointPolicy
+from src.dataManagement.task_store import TaskStore
 from src.dataManagement.project_manager import (
     save_project_state,
     load_project_state,
     latest_snapshot_path,
+    requeue_interrupted,
 )
+from src.dataManagement.project_store import ProjectStore, open_project_store
 from src.modelAccessors.base_accessor import BaseModelAccessor
-from src.modelAccessors.openai_accessor import OpenAIAccessor
-from src.modelAccessors.anthropic_accessor import AnthropicAccessor
-from src.modelAccessors.mock_accessor import MockAccessor
+from src.modelAccessors.batching import AsyncMicroBatcher, BatchingAccessor, MicroBatcher
+from src.modelAccessors.caching_accessor import CachingAccessor, ResponseCache
+from src.modelAccessors.resilience import CallPolicy
+from src.modelAccessors.single_flight import AsyncSingleFlight, SingleFlight, SingleFlightAccessor
+from src.modelAccessors.cassette_accessor import Cassette, CassetteAccessor, CassetteMismatchError
+from src.modelAccessors.registry import ACCESSOR_REGISTRY, accessor_class, is_transient
+from src.orchestrator.retries import RetryPolicy, RetryQueue
+from src.orchestrator.scheduler import SchedulingPolicy, StreamingPolicy, TaskScheduler
+from src.agentNodes.base_node import AgentNode
 from src.agentNodes.clarifier import Clarifier
 from src.agentNodes.hld_designer import HLDDesigner
 from src.agentNodes.lld_designer import LLDDesigner
@@ -54,7 +71,56 @@ NODE_FACTORY: dict[TaskType, Callable[[BaseModelAccessor], Any]] = {
 }
 
 
-class AgentOrchestrator:
+class _StreamedSubtasks:
+    """Subtasks a running task has streamed so far, and what became of them."""
+
+    def __init__(self) -> None:
+        self.emitted: list[Task] = []
+        self.spawned: dict[str, int] = {}
+        self.rejected: set[str] = set()
+        self.renamed: dict[str, str] = {}
+
+
+class _Nodes:
+    """Nodes built per task type, and the request sharing of their accessors."""
+
+    def __init__(
+        self, flight: SingleFlight | AsyncSingleFlight, batcher: MicroBatcher | AsyncMicroBatcher | None
+    ) -> None:
+        self.built: dict[tuple[TaskType, AccessorType, Callable[..., Any]], Any] = {}
+        self.lock = threading.Lock()
+        self.flight = flight
+        self.batcher = batcher
+
+
+class _Run:
+    """The state of one run of a project, kept off the orchestrator.
+
+    An orchestrator may run several projects at once (an async one on a
+    single event loop), so each run has its own retries, streamed subtasks
+    and answer inbox, and, where accessors are bound to the run, its own
+    nodes. The rest is set by :meth:`BaseOrchestrator._open_store` when the
+    run starts.
+    """
+
+    scheduler: TaskScheduler
+    checkpointer: Checkpointer
+    nodes: _Nodes
+    retries: RetryQueue
+    inbox: AnswerInbox
+
+    def __init__(self, project: Project, directory: Path, backend: ProjectStore | None = None) -> None:
+        self.project = project
+        self.directory = directory
+        self.backend = backend
+        # provider accessors built for this run only, released when it ends
+        self.accessors: dict[AccessorType, Any] = {}
+        self.streams: dict[str, _StreamedSubtasks] = {}
+
+
+class BaseOrchestrator:
+    """Spawn rules and task state transitions shared by the orchestrators."""
+
     def __init__(
         self,
         config_path: str | None = None,
@@ -62,11 +128,59 @@ class AgentOrchestrator:
         verbose: bool = False,
         logger: logging.Logger | None = None,
         default_accessor_type: AccessorType | None = None,
+        max_parallel: int = 1,
+        scheduling_policy: SchedulingPolicy = SchedulingPolicy.FIFO,
+        checkpoint_policy: CheckpointPolicy | None = None,
+        response_cache: ResponseCache | None = None,
+        cassette: Cassette | None = None,
+        call_policy: CallPolicy | None = None,
+        streaming_policy: StreamingPolicy | None = None,
+        wait_for_answers: bool = True,
+        answer_poll_interval: float = 1.0,
+        retry_policy: RetryPolicy | None = None,
     ) -> None:
-        """Load spawn rules and prepare orchestrator."""
+        """Load spawn rules and prepare orchestrator.
+
+        ``max_parallel`` bounds how many ready tasks may execute at once and
+        ``scheduling_policy`` decides which ready task is dispatched next.
+        ``checkpoint_policy`` sets how often checkpoints are written, whether a
+        background thread writes them and whether they are journaled (see
+        :class:`CheckpointPolicy`). A ``response_cache`` answers repeated model
+        requests without calling the provider again, and a ``cassette``
+        records every model call of the run or replays a recorded run offline.
+        ``call_policy`` sets the deadlines, retries and hedging of every
+        provider call, the connection pool of each client and whether
+        identical requests in flight are coalesced. ``streaming_policy``
+        decides whether decompositions are streamed and model requests
+        batched (see :class:`StreamingPolicy`). A task asking the user a follow-up question waits
+        in ``PENDING_USER_INPUT`` while the rest of the tree keeps running;
+        answers are dropped into the ``answers`` directory of the run (see
+        :class:`AnswerInbox`) and checked every ``answer_poll_interval``
+        seconds once nothing else is left to do. Without
+        ``wait_for_answers`` the run returns instead, to be resumed later.
+        ``retry_policy`` runs tasks that failed with a ``retryable`` response
+        (or a transient provider error) again after a backoff, while other
+        ready tasks keep running. A ``checkpoint_dir`` given as a URL such as
+        ``sqlite:///runs/project.db`` keeps the run in that
+        :class:`ProjectStore` instead of a directory of snapshots.
+        """
+        if max_parallel < 1:
+            raise ValueError("max_parallel must be >= 1")
         self.verbose = verbose
         self.logger = logger or init_logger(self.__class__.__name__, verbose)
         self.default_accessor_type = default_accessor_type
+        self.max_parallel = max_parallel
+        self.scheduling_policy = scheduling_policy
+        self.checkpoint_policy = checkpoint_policy or CheckpointPolicy()
+        self.response_cache = response_cache
+        self.cassette = cassette
+        self.call_policy = call_policy or CallPolicy()
+        self.streaming_policy = streaming_policy or StreamingPolicy()
+        self.wait_for_answers = wait_for_answers
+        self.answer_poll_interval = answer_poll_interval
+        # the inbox of the run started last, to tell the user where to answer
+        self.inbox: AnswerInbox | None = None
+        self.retry_policy = retry_policy or RetryPolicy()
 
         cfg_path: Path | None
         if config_path:
@@ -92,13 +206,17 @@ class AgentOrchestrator:
         return None
 
     def _enqueue_subtasks(
-        self, parent: Task, subtasks: list[Task]
+        self, parent: Task, subtasks: list[Task], spawned_count: dict[str, int] | None = None
     ) -> list[Task]:
-        """Filter subtasks based on spawn rules and return the allowed ones."""
+        """Filter subtasks based on spawn rules and return the allowed ones.
+
+        ``spawned_count`` carries the per-type counts over from earlier calls
+        for the same parent, as when its subtasks arrive one by one.
+        """
         rules = self.spawn_rules.get(parent.type.name, {})
         allowed = rules.get("can_spawn", {})
         allow_self = rules.get("self_spawn", True)
-        spawned_count: dict[str, int] = {}
+        spawned_count = {} if spawned_count is None else spawned_count
         out: list[Task] = []
         for sub in subtasks:
             if not allow_self and sub.type == parent.type:
@@ -117,28 +235,16 @@ class AgentOrchestrator:
             sub.parent_id = parent.id
             sub.status = TaskStatus.PENDING
             out.append(sub)
+
+        # a dependency on a sibling the spawn rules rejected could never be met
+        rejected = {sub.id for sub in subtasks} - {sub.id for sub in out}
+        for sub in out:
+            if rejected.intersection(sub.depends_on):
+                sub.depends_on = [dep for dep in sub.depends_on if dep not in rejected]
         return out
-    
-    def _get_accessor(self, accessor_type: AccessorType) -> BaseModelAccessor:
-        """Get the appropriate accessor for the given accessor type."""
-        match accessor_type:
-            case AccessorType.OPENAI:
-                return OpenAIAccessor()
-            case AccessorType.ANTHROPIC:
-                return AnthropicAccessor()
-            case AccessorType.MOCK:
-                return MockAccessor()
-            case _:
-                raise ValueError(f"Unknown accessor type: {accessor_type}")
 
-    def implement_project(self, project_prompt: str, checkpoint_dir: str = "checkpoints") -> Project:
-        """
-        Orchestrates the implementation of a project by decomposing it into tasks,
-        assigning them to agents, and collecting their responses.
-        
-        :param project_prompt: The initial prompt describing the project.
-        :return: Summary of the implemented project.
-        """
+    def _new_project(self, project_prompt: str, checkpoint_dir: str) -> _Run:
+        """Return the run of a fresh project, checkpointed under ``checkpoint_dir``."""
         root_task: Task = self.create_root_task(project_prompt)
         project = Project(
             rootTask=root_task,
@@ -148,137 +254,288 @@ class AgentOrchestrator:
             queuedTasks=[root_task],
         )
 
+        backend = open_project_store(checkpoint_dir, fsync=self.checkpoint_policy.fsync)
+        if backend is not None:
+            return _Run(project, backend.directory, backend)
         base = Path(checkpoint_dir)
         run_dir = base / datetime.now().strftime("%Y%m%d%H%M%S")
+        return _Run(project, run_dir)
 
-        return self._run_loop(project, run_dir)
+    def _load_project(self, checkpoint_dir: str) -> _Run:
+        """Return the run continuing the project saved in ``checkpoint_dir``."""
+        backend = open_project_store(checkpoint_dir, fsync=self.checkpoint_policy.fsync)
+        if backend is not None:
+            return _Run(requeue_interrupted(backend.load()), backend.directory, backend)
+        return _Run(load_project_state(latest_snapshot_path(checkpoint_dir)), Path(checkpoint_dir))
 
-    def resume_project(self, checkpoint_dir: str) -> Project:
-        """Resume an existing project from ``checkpoint_dir``."""
-        snapshot = latest_snapshot_path(checkpoint_dir)
-        project = load_project_state(snapshot)
-        return self._run_loop(project, Path(checkpoint_dir))
+    def _open_store(self, run: _Run) -> None:
+        """Index the project of ``run`` and prepare its checkpoints, answer inbox and nodes."""
+        run.inbox = self.inbox = AnswerInbox(run.directory / "answers")
+        run.retries = RetryQueue(self.retry_policy)
+        run.nodes = self._nodes_for_run()
+        track_changes = self.checkpoint_policy.journal_snapshot_every is not None or run.backend is not None
+        spill_bytes = self.checkpoint_policy.spill_bytes
+        blobs = BlobStore(run.directory / BLOB_DIR, fsync=self.checkpoint_policy.fsync) if spill_bytes else None
+        store = TaskStore(run.project, track_changes=track_changes, blobs=blobs, spill_bytes=spill_bytes)
+        run.scheduler = TaskScheduler(store, self.scheduling_policy)
+        run.checkpointer = Checkpointer(
+            store,
+            run.directory,
+            self._save_snapshot,
+            self.checkpoint_policy,
+            run.backend,
+        )
+
+    def _nodes_for_run(self) -> _Nodes:
+        """Return the nodes a new run executes its tasks with."""
+        raise NotImplementedError
 
-    def _run_loop(self, project: Project, checkpoint_dir: Path) -> Project:
-        """Execute tasks sequentially until the queue is empty."""
-        adapter: TypeAdapter[ModelResponse] = TypeAdapter(ModelResponse)
+    def _accessor_for(self, run: _Run, task: Task) -> Any:
+        """Return the accessor the node for ``task`` is built with."""
+        raise NotImplementedError
 
-        while project.queuedTasks:
-            current_task = project.queuedTasks.pop(0)
-            current_task.status = TaskStatus.IN_PROGRESS
-            project.inProgressTasks.append(current_task)
+    def _node_for(self, run: _Run, task: Task) -> Any | None:
+        """Return the node for ``task``, building it on first use.
 
+        Nodes keep no per-task state, so one instance per task type and
+        accessor type serves every task of the run, and so does its accessor.
+        """
+        factory = NODE_FACTORY.get(task.type)
+        if factory is None:
+            return None
+        key = (task.type, task.model.accessor_type, factory)
+        nodes = run.nodes
+        with nodes.lock:
+            if key not in nodes.built:
+                nodes.built[key] = factory(self._accessor_for(run, task))
+            return nodes.built[key]
+
+    def _log_cache_stats(self, run: _Run) -> None:
+        flight, batcher = run.nodes.flight, run.nodes.batcher
+        if flight.shared:
+            self.logger.info("Coalesced %d duplicate in-flight requests", flight.shared)
+        if batcher is not None and batcher.batched:
+            self.logger.info("Batched %d requests into %d batches", batcher.batched, batcher.batches)
+        if self.response_cache is not None:
             self.logger.info(
-                "Executing %s (%s) using %s",
-                current_task.id,
-                current_task.type.name,
-                current_task.model.accessor_type.value,
+                "Response cache: %d hits, %d misses, %d evictions",
+                self.response_cache.hits,
+                self.response_cache.misses,
+                self.response_cache.evictions,
             )
-            self.logger.debug("Description: %s", current_task.description)
-
-            accessor = self._get_accessor(current_task.model.accessor_type)
-            factory = NODE_FACTORY.get(current_task.type)
-            if not factory:
-                current_task.status = TaskStatus.FAILED
-                failure = FailedResponse(error_message=f"No node for {current_task.type}")
-                project.inProgressTasks.remove(current_task)
-                project.failedTasks.append(current_task)
-                project.taskResults[current_task.id] = failure
-                project.latestResponse = failure
-                save_project_state(project, checkpoint_dir)
-                continue
 
-            node = factory(accessor)
+    def _save_snapshot(self, project: Project, checkpoint_dir: Path) -> Path:
+        options: dict[str, Any] = {}
+        if self.checkpoint_policy.fsync:
+            options["fsync"] = True
+        if self.checkpoint_policy.codec != "json":
+            options["codec"] = self.checkpoint_policy.codec
+        return save_project_state(project, checkpoint_dir, **options)
 
-            try:
-                response_dict = node(current_task)
-                self.logger.debug("Raw response dict: %s", response_dict)
-                response = adapter.validate_python(response_dict)
-            except Exception as exc:  # noqa: BLE001
-                current_task.status = TaskStatus.FAILED
-                failure = FailedResponse(error_message=str(exc))
-                project.inProgressTasks.remove(current_task)
-                project.failedTasks.append(current_task)
-                project.taskResults[current_task.id] = failure
-                project.latestResponse = failure
-                save_project_state(project, checkpoint_dir)
-                self.logger.error("Task %s failed: %s", current_task.id, str(exc))
-                continue
+    def _start_task(self, scheduler: TaskScheduler) -> Task | None:
+        """Move the next ready task to in-progress and return it."""
+        current_task = scheduler.next_ready()
+        if current_task is None:
+            return None
+        scheduler.store.set_status(current_task, TaskStatus.IN_PROGRESS)
+
+        self.logger.info(
+            "Executing %s (%s) using %s",
+            current_task.id,
+            current_task.type.name,
+            current_task.model.accessor_type.value,
+        )
+        self.logger.debug("Description: %s", current_task.description)
+        return current_task
+
+    def _finish_task(self, run: _Run, current_task: Task, response: ModelResponse) -> None:
+        """Apply ``response``, queue spawned tasks and block those that can no longer run."""
+        if self._retry_later(run, current_task, response):
+            return
+        scheduler = run.scheduler
+        streamed = run.streams.pop(current_task.id, None)
+        new_tasks = self._apply_result(run, current_task, response, streamed)
+        scheduler.record(current_task)
+        scheduler.push(scheduler.store.add(new_tasks))
+        if streamed is not None:
+            # streamed siblings may wait on subtasks the spawn rules rejected later
+            for dep in streamed.rejected:
+                scheduler.drop_dependency(dep, current_task.id)
+        self._block_unrunnable(scheduler)
+
+    def _retry_later(self, run: _Run, task: Task, response: ModelResponse) -> bool:
+        """Queue ``task`` for another attempt if ``response`` is a retryable failure within its budget."""
+        if not isinstance(response, FailedResponse) or not response.retryable:
+            return False
+        delay = run.retries.schedule(task)
+        if delay is None:
+            return False
+        # the rerun finds the subtasks it streamed this time among the children
+        run.streams.pop(task.id, None)
+        run.scheduler.store.set_result(task.id, response)
+        run.scheduler.store.set_status(task, TaskStatus.PENDING)
+        self.logger.warning(
+            "Task %s failed: %s; retry %d in %.1fs",
+            task.id,
+            response.error_message,
+            run.retries.retries[task.id],
+            delay,
+        )
+        return True
+
+    def _release_retries(self, run: _Run) -> None:
+        """Make the tasks whose retry backoff has passed ready again."""
+        if run.retries:
+            run.scheduler.push(run.retries.due())
 
-            project.taskResults[current_task.id] = response
-            project.latestResponse = response
+    def _retry_wait(self, run: _Run, inflight: int) -> float | None:
+        """Seconds to wait at most for the running tasks before a due retry could start."""
+        return run.retries.wait_time() if inflight < self.max_parallel else None
 
-            match response.response_type:
-                case ModelResponseType.DECOMPOSED:
-                    assert isinstance(response, DecomposedResponse)
+    @staticmethod
+    def _failure(task: Task, exc: Exception) -> FailedResponse:
+        """Return the failure of ``task`` raised as ``exc``; provider errors worth retrying are ``retryable``."""
+        return FailedResponse(error_message=str(exc), retryable=is_transient(task.model.accessor_type.value, exc))
+
+    def _spawn_streamed(self, run: _Run, parent: Task, subtask: Task) -> None:
+        """Queue ``subtask``, streamed by the still running ``parent``."""
+        scheduler = run.scheduler
+        streamed = run.streams.setdefault(parent.id, _StreamedSubtasks())
+        original_id = subtask.id
+        # a rerun of a task interrupted while streaming finds its earlier subtasks
+        for existing in scheduler.store.children(parent.id):
+            if (existing.type, existing.description) == (subtask.type, subtask.description) and not any(
+                existing is seen for seen in streamed.emitted
+            ):
+                streamed.emitted.append(existing)
+                streamed.renamed[original_id] = existing.id
+                return
+        streamed.emitted.append(subtask)
+        subtask.depends_on = [
+            streamed.renamed.get(dep, dep) for dep in subtask.depends_on if dep not in streamed.rejected
+        ]
+        accepted = self._enqueue_subtasks(parent, [subtask], streamed.spawned)
+        if not accepted:
+            streamed.rejected.add(original_id)
+            return
+        scheduler.push(scheduler.store.add(accepted))
+        if subtask.id != original_id:
+            streamed.renamed[original_id] = subtask.id
+        self.logger.info("%s streamed subtask %s", parent.id, subtask.id)
+        self._block_unrunnable(scheduler)
+
+    def _block_unrunnable(self, scheduler: TaskScheduler, idle: bool = False) -> None:
+        """Record a failure for tasks whose dependencies can never be met."""
+        for task in scheduler.unrunnable(idle):
+            unmet = ", ".join(scheduler.unmet(task))
+            failure = FailedResponse(error_message=f"Unmet dependencies: {unmet}")
+            scheduler.store.set_result(task.id, failure)
+            self.logger.error("Task %s blocked on %s", task.id, unmet)
+
+    def _apply_result(
+        self,
+        run: _Run,
+        current_task: Task,
+        response: ModelResponse,
+        streamed: _StreamedSubtasks | None = None,
+    ) -> list[Task]:
+        """Record ``response`` for ``current_task`` and move it to its next state.
+
+        Returns the subtasks spawned by the response, leaving out those
+        already queued while it was ``streamed``.
+        """
+        new_tasks: list[Task] = []
+        store = run.scheduler.store
+        store.set_result(current_task.id, response)
+
+        match response.response_type:
+            case ModelResponseType.DECOMPOSED:
+                assert isinstance(response, DecomposedResponse)
+                if streamed is None:
                     new_tasks = self._enqueue_subtasks(current_task, response.subtasks)
-                    project.queuedTasks.extend(new_tasks)
-                    current_task.status = TaskStatus.COMPLETED
-                    project.inProgressTasks.remove(current_task)
-                    project.completedTasks.append(current_task)
-                    self.logger.info(
-                        "%s task completed: produced %d subtasks",
-                        current_task.type.name,
-                        len(response.subtasks),
-                    )
-                case ModelResponseType.IMPLEMENTED:
-                    assert isinstance(response, ImplementedResponse)
-                    if current_task.type is TaskType.REQUIREMENTS:
-                        hld = Task(
-                            id=f"{current_task.id}-hld",
-                            description=current_task.description,
-                            type=TaskType.HLD,
-                            model=Model(accessor_type=self.default_accessor_type)
-                            if self.default_accessor_type
-                            else Model(),
-                        )
-                        new_tasks = self._enqueue_subtasks(current_task, [hld])
-                        project.queuedTasks.extend(new_tasks)
-                    current_task.status = TaskStatus.COMPLETED
-                    project.inProgressTasks.remove(current_task)
-                    project.completedTasks.append(current_task)
-                    self.logger.info(
-                        "%s task completed: artifacts %s",
-                        current_task.type.name,
-                        ", ".join(response.artifacts) if response.artifacts else "none",
-                    )
-                case ModelResponseType.FOLLOW_UP_REQUIRED:
-                    assert isinstance(response, FollowUpResponse)
-                    if current_task.type is TaskType.REQUIREMENTS:
-                        question = response.follow_up_ask.description
-                        answer = input(question + " ")
-                        desc = f"{current_task.description}\n{answer}".strip()
-                        hld = Task(
-                            id=f"{current_task.id}-hld",
-                            description=desc,
-                            type=TaskType.HLD,
-                            model=Model(accessor_type=self.default_accessor_type)
-                            if self.default_accessor_type
-                            else Model(),
-                        )
-                        new_tasks = self._enqueue_subtasks(current_task, [hld])
-                        project.queuedTasks.extend(new_tasks)
-                        current_task.status = TaskStatus.COMPLETED
-                        project.inProgressTasks.remove(current_task)
-                        project.completedTasks.append(current_task)
-                    else:
-                        current_task.status = TaskStatus.BLOCKED
-                        project.inProgressTasks.remove(current_task)
-                        project.failedTasks.append(current_task)
-                    self.logger.info("%s task requires follow up", current_task.type.name)
-                case ModelResponseType.FAILED:
-                    assert isinstance(response, FailedResponse)
-                    current_task.status = TaskStatus.FAILED
-                    project.inProgressTasks.remove(current_task)
-                    project.failedTasks.append(current_task)
-                    self.logger.error("Task %s failed: %s", current_task.id, response.error_message)
-
-            save_project_state(project, checkpoint_dir)
-
-        save_project_state(project, checkpoint_dir)
-
-        return project
-    
+                else:
+                    new_tasks = self._enqueue_rest(current_task, response, streamed)
+                store.set_status(current_task, TaskStatus.COMPLETED)
+                self.logger.info(
+                    "%s task completed: produced %d subtasks",
+                    current_task.type.name,
+                    len(response.subtasks),
+                )
+            case ModelResponseType.IMPLEMENTED:
+                assert isinstance(response, ImplementedResponse)
+                if current_task.type is TaskType.REQUIREMENTS:
+                    hld = self._hld_task(current_task, current_task.description)
+                    new_tasks = self._enqueue_subtasks(current_task, [hld])
+                store.set_status(current_task, TaskStatus.COMPLETED)
+                self.logger.info(
+                    "%s task completed: artifacts %s",
+                    current_task.type.name,
+                    ", ".join(response.artifacts) if response.artifacts else "none",
+                )
+            case ModelResponseType.FOLLOW_UP_REQUIRED:
+                assert isinstance(response, FollowUpResponse)
+                # park the task; the rest of the tree keeps running meanwhile
+                store.set_status(current_task, TaskStatus.PENDING_USER_INPUT)
+                question = response.follow_up_ask.description
+                run.inbox.ask(current_task.id, question)
+                self.logger.warning("%s waits for input: %s", current_task.id, question)
+            case ModelResponseType.FAILED:
+                assert isinstance(response, FailedResponse)
+                store.set_status(current_task, TaskStatus.FAILED)
+                self.logger.error("Task %s failed: %s", current_task.id, response.error_message)
+        return new_tasks
+
+    def _take_answers(self, run: _Run) -> int:
+        """Resume the parked tasks answered so far and return how many were."""
+        parked = run.scheduler.store.with_status(TaskStatus.PENDING_USER_INPUT)
+        if not parked:
+            return 0
+        answers = run.inbox.collect([task.id for task in parked])
+        for task in parked:
+            if task.id in answers:
+                self._apply_answer(run.scheduler, task, answers[task.id])
+        return len(answers)
+
+    def _apply_answer(self, scheduler: TaskScheduler, task: Task, answer: str) -> None:
+        """Continue the parked ``task`` with the user's ``answer``.
+
+        A clarified project goes on to its HLD; any other task runs again
+        with the answer added to its description.
+        """
+        store = scheduler.store
+        description = f"{task.description}\n{answer}".strip()
+        self.logger.info("%s got its answer", task.id)
+        if task.type is TaskType.REQUIREMENTS:
+            new_tasks = self._enqueue_subtasks(task, [self._hld_task(task, description)])
+            store.set_status(task, TaskStatus.COMPLETED)
+            scheduler.record(task)
+            scheduler.push(store.add(new_tasks))
+        else:
+            store.set_description(task, description)
+            store.set_status(task, TaskStatus.PENDING)
+            scheduler.push([task])
+
+    def _hld_task(self, parent: Task, description: str) -> Task:
+        """Return the HLD task following the clarified REQUIREMENTS task ``parent``."""
+        return Task(
+            id=f"{parent.id}-hld",
+            description=description,
+            type=TaskType.HLD,
+            model=Model(accessor_type=self.default_accessor_type)
+            if self.default_accessor_type
+            else Model(),
+        )
+
+    def _enqueue_rest(self, parent: Task, response: DecomposedResponse, streamed: _StreamedSubtasks) -> list[Task]:
+        """Swap the streamed subtasks into ``response`` and enqueue the ones that were not streamed."""
+        response.subtasks[: len(streamed.emitted)] = streamed.emitted
+        rest = response.subtasks[len(streamed.emitted) :]
+        for sub in rest:
+            sub.depends_on = [streamed.renamed.get(dep, dep) for dep in sub.depends_on if dep not in streamed.rejected]
+        accepted = self._enqueue_subtasks(parent, rest, streamed.spawned)
+        streamed.rejected.update({sub.id for sub in rest} - {sub.id for sub in accepted})
+        return accepted
+
     def create_root_task(self, project_prompt: str) -> Task:
         """
         Creates the root task for the project based on the initial project prompt.
@@ -295,6 +552,212 @@ class AgentOrchestrator:
             else Model(),
         )
 
+
+class AgentOrchestrator(BaseOrchestrator):
+    """Run a project to completion using blocking accessors."""
+
+    _shared_nodes: _Nodes | None = None
+    _shared_lock = threading.Lock()
+
+    def _get_accessor(self, accessor_type: AccessorType) -> BaseModelAccessor:
+        """Get the process-wide shared accessor for the given accessor type.
+
+        The provider's module, and with it its SDK, is imported on first use.
+        """
+        cls = accessor_class(accessor_type.value)
+        key = (accessor_type, self.call_policy)
+        return ACCESSOR_REGISTRY.get(key, lambda: cls(self.call_policy.max_connections, self.call_policy))
+
+    def implement_project(self, project_prompt: str, checkpoint_dir: str = "checkpoints") -> Project:
+        """
+        Orchestrates the implementation of a project by decomposing it into tasks,
+        assigning them to agents, and collecting their responses.
+        
+        :param project_prompt: The initial prompt describing the project.
+        :return: Summary of the implemented project.
+        """
+        return self._run_loop(self._new_project(project_prompt, checkpoint_dir))
+
+    def resume_project(self, checkpoint_dir: str) -> Project:
+        """Resume an existing project from ``checkpoint_dir``."""
+        return self._run_loop(self._load_project(checkpoint_dir))
+
+    def _nodes_for_run(self) -> _Nodes:
+        """Return the nodes of this orchestrator, which all of its runs share.
+
+        Sync accessors are process-wide, so the nodes built with them, and
+        their in-flight requests and batches, can outlive a run.
+        """
+        with self._shared_lock:
+            if self._shared_nodes is None:
+                streaming = self.streaming_policy
+                batcher = MicroBatcher(streaming.batch_window, streaming.max_batch_size) if streaming.batch_window else None
+                self._shared_nodes = _Nodes(SingleFlight(), batcher)
+            return self._shared_nodes
+
+    def _accessor_for(self, run: _Run, task: Task) -> BaseModelAccessor:
+        """Return the accessor for ``task`` behind the configured cassette and cache."""
+        accessor: BaseModelAccessor
+        provider = task.model.accessor_type.value
+        if self.cassette is not None and self.cassette.replaying:
+            accessor = CassetteAccessor(None, self.cassette, provider)
+        else:
+            accessor = self._get_accessor(task.model.accessor_type)
+            if run.nodes.batcher is not None:
+                accessor = BatchingAccessor(accessor, cast(MicroBatcher, run.nodes.batcher), provider)
+            # mock accessors answer instantly, so there is nothing to coalesce
+            if self.call_policy.coalesce and task.model.accessor_type != AccessorType.MOCK:
+                accessor = SingleFlightAccessor(accessor, cast(SingleFlight, run.nodes.flight), provider)
+            if self.cassette is not None:
+                accessor = CassetteAccessor(accessor, self.cassette, provider)
+        if self.response_cache is not None:
+            accessor = CachingAccessor(accessor, self.response_cache)
+        return accessor
+
+    def _execute_task(
+        self,
+        run: _Run,
+        task: Task,
+        on_subtask: Callable[[Task], Any] | None = None,
+    ) -> ModelResponse:
+        """Run the node for ``task`` and return its validated response.
+
+        Safe to call from worker threads: it does not touch project state.
+        Streaming nodes hand each subtask to ``on_subtask`` as it is generated.
+        Agent nodes hand their response object over as is; plain callables
+        return data that is validated here.
+        """
+        node = self._node_for(run, task)
+        if node is None:
+            return FailedResponse(error_message=f"No node for {task.type}")
+        try:
+            if isinstance(node, AgentNode):
+                response = node.respond(task, {"on_subtask": on_subtask} if on_subtask else None)
+            else:
+                response = node(task)
+            self.logger.debug("Raw response: %s", response)
+            return as_response(response)
+        except CassetteMismatchError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            return self._failure(task, exc)
+
+    def _run_loop(self, run: _Run) -> Project:
+        """Execute tasks until the queue is empty.
+
+        Up to ``max_parallel`` ready tasks run at once, but results are
+        applied and checkpointed strictly in dispatch order so a parallel run
+        produces the same project as a sequential one.
+        """
+        inflight: deque[tuple[Task, Future[ModelResponse]]] = deque()
+        pool = (
+            ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="treeagent")
+            if self.max_parallel > 1
+            else None
+        )
+
+        # streamed subtasks, plus a None wake-up whenever a task finishes
+        events: SimpleQueue[tuple[Task, Task] | None] = SimpleQueue()
+
+        self._open_store(run)
+        scheduler, checkpointer = run.scheduler, run.checkpointer
+        store = scheduler.store
+        stream = self.streaming_policy.stream_subtasks
+
+        # whether the parked state was saved since the run went idle
+        saved = False
+
+        try:
+            while scheduler or inflight or store.count(TaskStatus.PENDING_USER_INPUT):
+                if self._take_answers(run):
+                    saved = False
+                self._release_retries(run)
+                while len(inflight) < self.max_parallel:
+                    current_task = self._start_task(scheduler)
+                    if current_task is None:
+                        break
+                    on_subtask = partial(self._put_streamed, events, current_task) if stream else None
+                    future: Future[ModelResponse]
+                    if pool is None:
+                        future = Future()
+                        future.set_result(self._execute_task(run, current_task, on_subtask))
+                    else:
+                        future = pool.submit(self._execute_task, run, current_task, on_subtask)
+                    if stream:
+                        future.add_done_callback(lambda _: events.put(None))
+                    inflight.append((current_task, future))
+
+                if not inflight:
+                    retry_in = run.retries.wait_time()
+                    if retry_in is not None:
+                        # nothing can run before the next retry is due
+                        time.sleep(min(retry_in, self.answer_poll_interval))
+                        continue
+                    if store.count(TaskStatus.PENDING_USER_INPUT):
+                        # only parked tasks are left
+                        if not self.wait_for_answers:
+                            break
+                        if not saved:
+                            checkpointer.checkpoint(force=True)
+                            saved = True
+                            self.logger.info(
+                                "Waiting for answers: treeagent answer TASK_ID --checkpoint-dir %s", run.directory
+                            )
+                        time.sleep(self.answer_poll_interval)
+                        continue
+                    self._block_unrunnable(scheduler, idle=True)
+                    checkpointer.checkpoint()
+                    continue
+
+                retry_in = self._retry_wait(run, len(inflight))
+                if stream:
+                    # a finished head has put all its subtasks, so check before draining
+                    head_done = inflight[0][1].done()
+                    self._drain_streamed(run, events, block=False)
+                    if not head_done:
+                        # dispatch streamed subtasks (and due retries) while the head task is still running
+                        self._drain_streamed(run, events, block=True, timeout=retry_in)
+                        continue
+                elif retry_in is not None and not wait([inflight[0][1]], timeout=retry_in).done:
+                    # a retry became due before the head task finished; start it
+                    continue
+
+                current_task, future = inflight.popleft()
+                self._finish_task(run, current_task, future.result())
+                checkpointer.checkpoint()
+            checkpointer.checkpoint(final=True)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            checkpointer.close()
+
+        self._log_cache_stats(run)
+        return run.project
+
+    @staticmethod
+    def _put_streamed(events: SimpleQueue[tuple[Task, Task] | None], parent: Task, subtask: Task) -> None:
+        events.put((parent, subtask))
+
+    def _drain_streamed(
+        self,
+        run: _Run,
+        events: SimpleQueue[tuple[Task, Task] | None],
+        block: bool,
+        timeout: float | None = None,
+    ) -> None:
+        """Queue the subtasks streamed so far, first waiting up to ``timeout`` for one event if ``block``."""
+        batch: list[tuple[Task, Task] | None] = []
+        if block:
+            try:
+                batch.append(events.get(timeout=timeout))
+            except Empty:
+                pass
+        while not events.empty():
+            batch.append(events.get())
+        for event in batch:
+            if event is not None:
+                self._spawn_streamed(run, *event)
+
 if __name__ == "__main__":
     orchestrator = AgentOrchestrator()
     example_prompt = "Build a simple web application with user authentication and a dashboard."
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.dataModel.task import Task, TaskType
+
+
+class RetryPolicy(BaseModel):
+    """How tasks that failed with a ``retryable`` response are run again.
+
+    Each task is retried up to ``max_retries`` times, or ``budgets[type]``
+    times for the task types listed there. Retry ``n`` (counting from 0)
+    waits a random delay of up to ``backoff_base * 2**n`` seconds, capped at
+    ``backoff_max``, so tasks failed by the same outage do not all come back
+    at once.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    max_retries: int = Field(default=0, ge=0)
+    budgets: dict[TaskType, int] = Field(default_factory=dict)
+    backoff_base: float = Field(default=1.0, ge=0)
+    backoff_max: float = Field(default=60.0, ge=0)
+
+    def budget(self, task_type: TaskType) -> int:
+        """Return how often a task of ``task_type`` may be retried."""
+        return self.budgets.get(task_type, self.max_retries)
+
+    def delay(self, retry: int) -> float:
+        """Return the jittered backoff before retry number ``retry``."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**retry))
+
+
+class RetryQueue:
+    """Failed tasks waiting out their backoff, in the order they become due.
+
+    A heap keyed by due time, so the orchestrator can sleep exactly until
+    the next retry instead of polling, and keeps running ready work
+    meanwhile. Remembers how many retries each task used.
+    """
+
+    def __init__(self, policy: RetryPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy
+        self.clock = clock
+        self.retries: Counter[str] = Counter()
+        self._heap: list[tuple[float, int, Task]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, task: Task) -> float | None:
+        """Queue ``task`` for another attempt and return its delay, or None if its budget is spent."""
+        retry = self.retries[task.id]
+        if retry >= self.policy.budget(task.type):
+            return None
+        delay = self.policy.delay(retry)
+        self.retries[task.id] += 1
+        heapq.heappush(self._heap, (self.clock() + delay, next(self._seq), task))
+        return delay
+
+    def due(self) -> list[Task]:
+        """Remove and return the tasks whose backoff has passed, earliest first."""
+        now = self.clock()
+        out: list[Task] = []
+        while self._heap and self._heap[0][0] <= now:
+            out.append(heapq.heappop(self._heap)[2])
+        return out
+
+    def wait_time(self) -> float | None:
+        """Return the seconds until the next retry is due, or None if none is queued."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import defaultdict, deque
+from collections.abc import Iterable
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.task import Task, TaskStatus
+
+
+class SchedulingPolicy(str, Enum):
+    """Order in which ready tasks are dispatched."""
+
+    FIFO = "fifo"
+    DEPTH_FIRST = "depth_first"
+    COMPLEXITY = "complexity"
+    CRITICAL_PATH = "critical_path"
+
+
+class StreamingPolicy(BaseModel):
+    """How decompositions and model requests reach the scheduler and the providers.
+
+    With ``stream_subtasks`` decomposing nodes stream their response, and each
+    subtask is queued as soon as it is complete, while its parent is still
+    generating; the order of a parallel run is then no longer fixed. A
+    positive ``batch_window`` (seconds) holds each ``call_model`` request that
+    long so concurrent requests of the same node type go to the provider as
+    one batch of at most ``max_batch_size``.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    stream_subtasks: bool = False
+    batch_window: float = Field(default=0.0, ge=0)
+    max_batch_size: int = Field(default=16, ge=1)
+
+
+_FAILED = (TaskStatus.FAILED, TaskStatus.BLOCKED)
+
+
+class TaskScheduler:
+    """Hand out the next runnable pending task of a :class:`TaskStore`.
+
+    A pending task is ready once every id in its ``depends_on`` list belongs
+    to a completed task. Ready tasks sit in a deque (``FIFO``) or a heap keyed
+    by the policy, while waiting tasks are indexed by the dependency they wait
+    on, so pushing, popping and releasing tasks never scans the whole queue.
+    Ties are broken by enqueue order, keeping dispatch deterministic.
+    """
+
+    def __init__(self, store: TaskStore, policy: SchedulingPolicy = SchedulingPolicy.FIFO) -> None:
+        self.store = store
+        self.policy = policy
+        self._waiting: dict[str, list[Task]] = defaultdict(list)
+        self._unmet: dict[str, int] = {}
+        self._fifo: deque[Task] = deque()
+        self._heap: list[tuple[tuple[int, ...], int, Task]] = []
+        self._seq = itertools.count()
+        self._priority: dict[str, tuple[int, ...]] = {}
+        self._stuck: list[Task] = []
+
+        self._depth: dict[str, int] = {}
+        self.push(store.with_status(TaskStatus.PENDING))
+
+    def __len__(self) -> int:
+        return self.store.count(TaskStatus.PENDING)
+
+    def push(self, tasks: Iterable[Task]) -> None:
+        """Schedule pending ``tasks``, making those without unmet dependencies ready."""
+        tasks = list(tasks)
+        weights = self._critical_path(tasks) if self.policy is SchedulingPolicy.CRITICAL_PATH else {}
+        for task in tasks:
+            self._priority[task.id] = self._key(task, weights.get(task.id, task.complexity))
+            unmet = self.unmet(task)
+            if any(self.store.status(dep) in _FAILED for dep in unmet):
+                self._block(task)
+            elif unmet:
+                self._unmet[task.id] = len(unmet)
+                for dep in unmet:
+                    self._waiting[dep].append(task)
+            else:
+                self._make_ready(task)
+
+    def record(self, task: Task) -> None:
+        """Note the status ``task`` reached after its result was applied."""
+        if task.status is TaskStatus.COMPLETED:
+            for waiter in self._waiting.pop(task.id, []):
+                if waiter.status is not TaskStatus.PENDING:
+                    continue
+                self._unmet[waiter.id] -= 1
+                if not self._unmet[waiter.id]:
+                    del self._unmet[waiter.id]
+                    self._make_ready(waiter)
+        elif task.status in _FAILED:
+            self._fail(task.id)
+
+    def drop_dependency(self, dep: str, parent_id: str) -> None:
+        """Release the children of ``parent_id`` waiting on ``dep``, a sibling that will never exist."""
+        waiters = self._waiting.pop(dep, [])
+        others = [waiter for waiter in waiters if waiter.parent_id != parent_id]
+        if others:
+            self._waiting[dep] = others
+        for waiter in waiters:
+            if waiter.parent_id != parent_id or waiter.status is not TaskStatus.PENDING:
+                continue
+            waiter.depends_on = [d for d in waiter.depends_on if d != dep]
+            self._unmet[waiter.id] -= 1
+            if not self._unmet[waiter.id]:
+                del self._unmet[waiter.id]
+                self._make_ready(waiter)
+
+    def unmet(self, task: Task) -> list[str]:
+        """Return the dependencies of ``task`` that have not completed."""
+        return [dep for dep in task.depends_on if self.store.status(dep) is not TaskStatus.COMPLETED]
+
+    def next_ready(self) -> Task | None:
+        """Remove and return the highest priority ready task."""
+        while self._fifo or self._heap:
+            if self.policy is SchedulingPolicy.FIFO:
+                task = self._fifo.popleft()
+            else:
+                task = heapq.heappop(self._heap)[2]
+            self._priority.pop(task.id, None)
+            if task.status is TaskStatus.PENDING:
+                return task
+        return None
+
+    def unrunnable(self, idle: bool = False) -> list[Task]:
+        """Block and return pending tasks that can never become ready.
+
+        A task is unrunnable once one of its dependencies failed or was
+        blocked, which cascades to its own dependents. When ``idle`` is set
+        (nothing in flight and nothing ready) every remaining task is
+        unrunnable, since its dependencies are unknown or cyclic.
+        """
+        if idle:
+            for task in self.store.with_status(TaskStatus.PENDING):
+                if task.status is TaskStatus.PENDING:
+                    self._block(task)
+        stuck, self._stuck = self._stuck, []
+        return stuck
+
+    def _make_ready(self, task: Task) -> None:
+        if self.policy is SchedulingPolicy.FIFO:
+            self._fifo.append(task)
+        else:
+            heapq.heappush(self._heap, (self._priority[task.id], next(self._seq), task))
+
+    def _block(self, task: Task) -> None:
+        self.store.set_status(task, TaskStatus.BLOCKED)
+        self._unmet.pop(task.id, None)
+        self._priority.pop(task.id, None)
+        self._stuck.append(task)
+        self._fail(task.id)
+
+    def _fail(self, task_id: str) -> None:
+        stack = [task_id]
+        while stack:
+            failed_id = stack.pop()
+            for waiter in self._waiting.pop(failed_id, []):
+                if waiter.status is TaskStatus.PENDING:
+                    self.store.set_status(waiter, TaskStatus.BLOCKED)
+                    self._unmet.pop(waiter.id, None)
+                    self._priority.pop(waiter.id, None)
+                    self._stuck.append(waiter)
+                    stack.append(waiter.id)
+
+    def _depth_of(self, task: Task) -> int:
+        if task.id not in self._depth:
+            parent = self.store.get(task.parent_id) if task.parent_id else None
+            self._depth[task.id] = self._depth_of(parent) + 1 if parent else 0
+        return self._depth[task.id]
+
+    def _key(self, task: Task, weight: int) -> tuple[int, ...]:
+        match self.policy:
+            case SchedulingPolicy.DEPTH_FIRST:
+                return (-self._depth_of(task),)
+            case SchedulingPolicy.COMPLEXITY:
+                return (-task.complexity,)
+            case SchedulingPolicy.CRITICAL_PATH:
+                return (-weight,)
+            case _:
+                return ()
+
+    @staticmethod
+    def _critical_path(tasks: list[Task]) -> dict[str, int]:
+        """Return the heaviest complexity chain starting at each task.
+
+        Dependencies only link siblings, so the chains of a batch are fully
+        known when it is pushed. Cycles are cut rather than followed.
+        """
+        dependents: dict[str, list[Task]] = defaultdict(list)
+        for task in tasks:
+            for dep in task.depends_on:
+                dependents[dep].append(task)
+
+        weights: dict[str, int] = {}
+        visiting: set[str] = set()
+
+        def weight(task: Task) -> int:
+            if task.id in weights:
+                return weights[task.id]
+            visiting.add(task.id)
+            tail = [weight(d) for d in dependents[task.id] if d.id not in visiting]
+            visiting.discard(task.id)
+            weights[task.id] = task.complexity + max(tail, default=0)
+            return weights[task.id]
+
+        for task in tasks:
+            weight(task)
+        return weights
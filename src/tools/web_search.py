@@ -1,4 +1,3 @@
-import requests
 from typing import Optional
 from urllib.parse import quote
 
@@ -30,6 +29,8 @@ _SearchTopic.model_rebuild()
 
 
 def _fetch(query: str) -> list[str]:
+    import requests  # deferred: only searches need it, not every CLI start
+
     api_url = (
         f"https://duckduckgo.com/?q={quote(query)}&format=json&no_redirect=1&skip_disambig=1"
     )
@@ -1,5 +1,84 @@
 import sys
 import pathlib
+import json
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
+
+from src import orchestrator
+from src.dataModel.project import Project
+
+
+class InMemoryStorage:
+    """Simple in-memory stand-in for project_manager functions."""
+
+    def __init__(self) -> None:
+        self.snapshots: list[tuple[Path, Project]] = []
+
+    def save_project_state(self, project: Project, directory: str | Path) -> Path:
+        path = Path(directory) / f"{len(self.snapshots)}.json"
+        self.snapshots.append((path, deepcopy(project)))
+        return path
+
+    def load_project_state(self, file_path: str | Path) -> Project:
+        for p, proj in self.snapshots:
+            if p == Path(file_path):
+                return deepcopy(proj)
+        raise FileNotFoundError(file_path)
+
+    def latest_snapshot_path(self, directory: str | Path) -> Path:
+        dir_path = Path(directory)
+        candidates = [p for p, _ in self.snapshots if p.parent == dir_path]
+        if not candidates:
+            raise FileNotFoundError(f"no snapshot in {directory}")
+        return sorted(candidates)[-1]
+
+
+@pytest.fixture
+def write_rules(tmp_path):
+    """Write spawn rules to ``tmp_path`` and return their path.
+
+    Called as ``write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 2})``:
+    each type spawns at most the given counts, the types only spawned are
+    leaves, and no type spawns itself.
+    """
+
+    def write(**can_spawn: dict[str, int]) -> str:
+        rules = {name: {"can_spawn": spawns, "self_spawn": False} for name, spawns in can_spawn.items()}
+        for spawns in can_spawn.values():
+            for child in spawns:
+                rules.setdefault(child, {"can_spawn": {}, "self_spawn": False})
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(rules))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def use_nodes(monkeypatch):
+    """Make orchestrators build their nodes from the given node map."""
+
+    def use(node_map) -> None:
+        monkeypatch.setattr(orchestrator.orchestrator, "NODE_FACTORY", node_map, raising=False)
+
+    return use
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Keep the snapshots of orchestrator runs in memory."""
+    storage = InMemoryStorage()
+    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
+    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
+    return storage
+
+
+@pytest.fixture
+def no_snapshots(monkeypatch):
+    """Run orchestrators without writing snapshots."""
+    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", lambda project, directory: None)
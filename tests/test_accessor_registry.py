@@ -0,0 +1,88 @@
+from collections import Counter
+
+import pytest
+
+from src import orchestrator
+from src.dataModel.model import AccessorType
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.openai_accessor import DEFAULT_CONNECTION_LIMITS, OpenAIAccessor
+from src.modelAccessors.registry import ACCESSOR_REGISTRY, AccessorRegistry, pool_limits
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    ACCESSOR_REGISTRY.clear()
+    yield
+    ACCESSOR_REGISTRY.clear()
+
+
+def test_registry_creates_each_accessor_once():
+    registry = AccessorRegistry()
+    calls = Counter[str]()
+
+    def factory(name):
+        calls[name] += 1
+        return object()
+
+    first = registry.get("a", lambda: factory("a"))
+    assert registry.get("a", lambda: factory("a")) is first
+    assert registry.get("b", lambda: factory("b")) is not first
+    assert calls == {"a": 1, "b": 1}
+
+
+def test_orchestrators_share_provider_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    a = orchestrator.AgentOrchestrator(call_policy=orchestrator.CallPolicy(max_connections=8))
+    b = orchestrator.AgentOrchestrator(call_policy=orchestrator.CallPolicy(max_connections=8))
+    c = orchestrator.AgentOrchestrator()
+
+    shared = a._get_accessor(AccessorType.OPENAI)
+    assert isinstance(shared, OpenAIAccessor)
+    assert b._get_accessor(AccessorType.OPENAI) is shared
+    assert c._get_accessor(AccessorType.OPENAI) is not shared
+    assert len(ACCESSOR_REGISTRY) == 2
+
+
+def test_pool_limits():
+    limits = pool_limits(DEFAULT_CONNECTION_LIMITS, 4)
+    assert (limits.max_connections, limits.max_keepalive_connections) == (4, 4)
+    assert limits.keepalive_expiry == DEFAULT_CONNECTION_LIMITS.keepalive_expiry
+    with pytest.raises(ValueError):
+        pool_limits(DEFAULT_CONNECTION_LIMITS, 0)
+
+
+def test_nodes_are_built_once_per_type(tmp_path, write_rules, use_nodes, no_snapshots):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 10})
+    built = Counter[TaskType]()
+    accessors = set()
+
+    def counting(task_type, node):
+        def factory(acc):
+            built[task_type] += 1
+            accessors.add(id(acc))
+            return node
+        return factory
+
+    def hld_node(task, config=None):
+        subtasks = [Task(id=f"i{n}", description="i", type=TaskType.IMPLEMENT) for n in range(6)]
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    def ok_node(task, config=None):
+        return ImplementedResponse().model_dump()
+
+    node_map = {
+        TaskType.REQUIREMENTS: counting(TaskType.REQUIREMENTS, ok_node),
+        TaskType.HLD: counting(TaskType.HLD, hld_node),
+        TaskType.IMPLEMENT: counting(TaskType.IMPLEMENT, ok_node),
+    }
+    use_nodes(node_map)
+
+    orch = orchestrator.AgentOrchestrator(config_path=path, max_parallel=3)
+    project = orch.implement_project("demo", checkpoint_dir=str(tmp_path))
+    orch.implement_project("again", checkpoint_dir=str(tmp_path))
+
+    assert len(project.completedTasks) == 8
+    assert built == {TaskType.REQUIREMENTS: 1, TaskType.HLD: 1, TaskType.IMPLEMENT: 1}
+    # every node got the same shared mock accessor
+    assert len(accessors) == 1
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from src import orchestrator
+from src.agentNodes.base_node import AgentNode
+from src.dataModel import adapters
+from src.dataModel.adapters import RESPONSE_ADAPTER, as_response, parse_response, type_adapter
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse, ModelResponse
+from src.dataModel.task import Task, TaskType
+
+PAYLOAD = json.dumps(
+    {
+        "response_type": "decomposed",
+        "content": "plan",
+        "subtasks": [{"id": "a", "description": "do it", "type": "implement"}],
+    }
+)
+
+
+def test_validators_are_compiled_once():
+    assert type_adapter(ModelResponse) is RESPONSE_ADAPTER
+    assert type_adapter(Task) is type_adapter(Task)
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_parse_response(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(adapters, "_USE_ORJSON", use_orjson)
+    response = parse_response(PAYLOAD)
+    assert isinstance(response, DecomposedResponse)
+    assert response.subtasks[0].type is TaskType.IMPLEMENT
+    assert parse_response(PAYLOAD.encode()) == response
+    with pytest.raises(ValueError):
+        parse_response("{not json")
+    with pytest.raises(ValueError):
+        parse_response('{"response_type": "unknown"}')
+
+
+def test_as_response_passes_response_objects_through():
+    response = ImplementedResponse(content="done")
+    assert as_response(response) is response
+    assert as_response(response.model_dump()) == response
+    with pytest.raises(ValueError):
+        as_response({"response_type": "implemented", "artifacts": "not a list"})
+
+
+class Recording(AgentNode):
+    """Answer with one response object and remember it."""
+
+    SCHEMA = ImplementedResponse
+
+    def __init__(self, _accessor):
+        self.responses = []
+
+    def execute_task(self, data):
+        self.responses.append(ImplementedResponse(content=data.id))
+        return self.responses[-1]
+
+
+def test_orchestrator_keeps_node_responses_without_copying(tmp_path, write_rules, use_nodes, no_snapshots):
+    path = write_rules()
+    nodes = []
+
+    def factory(acc):
+        nodes.append(Recording(acc))
+        return nodes[-1]
+
+    use_nodes({TaskType.REQUIREMENTS: factory})
+    project = orchestrator.AgentOrchestrator(config_path=path).implement_project("x", str(tmp_path))
+    assert project.taskResults[project.rootTask.id] is nodes[0].responses[0]
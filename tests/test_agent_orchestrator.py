@@ -1,48 +1,22 @@
-import json
-from pathlib import Path
+import threading
+import time
 from copy import deepcopy
 
 import pytest
 
-import src.orchestrator as orchestrator
-from src.dataModel.project import Project
-from src.dataModel.task import TaskType, Task
+from src import orchestrator
+from src.dataModel.task import TaskType, Task, TaskStatus
 from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
 from src.modelAccessors.mock_accessor import MockAccessor
 
 
-class InMemoryStorage:
-    """Simple in-memory stand-in for project_manager functions."""
+@pytest.fixture(autouse=True)
+def mock_accessors(monkeypatch):
+    monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", lambda self, t: MockAccessor())
 
-    def __init__(self) -> None:
-        self.snapshots: list[tuple[Path, Project]] = []
 
-    def save_project_state(self, project: Project, directory: str | Path) -> Path:
-        path = Path(directory) / f"{len(self.snapshots)}.json"
-        self.snapshots.append((path, deepcopy(project)))
-        return path
-
-    def load_project_state(self, file_path: str | Path) -> Project:
-        for p, proj in self.snapshots:
-            if p == Path(file_path):
-                return deepcopy(proj)
-        raise FileNotFoundError(file_path)
-
-    def latest_snapshot_path(self, directory: str | Path) -> Path:
-        dir_path = Path(directory)
-        candidates = [p for p, _ in self.snapshots if p.parent == dir_path]
-        if not candidates:
-            raise FileNotFoundError(f"no snapshot in {directory}")
-        return sorted(candidates)[-1]
-
-def test_orchestrator_runs_all_tasks(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"IMPLEMENT": 1}, "self_spawn": False},
-        "IMPLEMENT": {"can_spawn": {}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_orchestrator_runs_all_tasks(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 1})
 
     def hld_factory(_acc):
         def node(task, config=None):
@@ -68,19 +42,9 @@ def test_orchestrator_runs_all_tasks(monkeypatch, tmp_path):
         TaskType.HLD: hld_factory,
         TaskType.IMPLEMENT: lambda acc: impl_factory(),
     }
-    monkeypatch.setattr(orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(orchestrator.orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
-
-    storage = InMemoryStorage()
-    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
-    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
+    use_nodes(node_map)
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
 
     assert [t.type for t in project.completedTasks] == [
@@ -93,14 +57,8 @@ def test_orchestrator_runs_all_tasks(monkeypatch, tmp_path):
     assert not project.queuedTasks
 
 
-def test_spawn_rule_limit(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"IMPLEMENT": 1}, "self_spawn": False},
-        "IMPLEMENT": {"can_spawn": {}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_spawn_rule_limit(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 1})
 
     def hld_factory(_acc):
         def node(task, config=None):
@@ -126,19 +84,9 @@ def test_spawn_rule_limit(monkeypatch, tmp_path):
         TaskType.HLD: hld_factory,
         TaskType.IMPLEMENT: lambda acc: impl_factory(),
     }
-    monkeypatch.setattr(orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(orchestrator.orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
-
-    storage = InMemoryStorage()
-    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
-    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
+    use_nodes(node_map)
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
 
     completed_types = [t.type for t in project.completedTasks]
@@ -147,14 +95,8 @@ def test_spawn_rule_limit(monkeypatch, tmp_path):
     assert not project.queuedTasks
 
 
-def test_resume_from_checkpoint(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"IMPLEMENT": 2}, "self_spawn": False},
-        "IMPLEMENT": {"can_spawn": {}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_resume_from_checkpoint(monkeypatch, tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 2})
     checkpoint_base = tmp_path
 
     def hld_factory(_acc):
@@ -181,14 +123,7 @@ def test_resume_from_checkpoint(monkeypatch, tmp_path):
         TaskType.HLD: hld_factory,
         TaskType.IMPLEMENT: lambda acc: impl_factory(),
     }
-    monkeypatch.setattr(orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
-
-    storage = InMemoryStorage()
+    use_nodes(node_map)
 
     save_calls = {"count": 0}
 
@@ -206,7 +141,7 @@ def test_resume_from_checkpoint(monkeypatch, tmp_path):
     monkeypatch.setattr(orchestrator, "load_project_state", storage.load_project_state)
     monkeypatch.setattr(orchestrator, "latest_snapshot_path", storage.latest_snapshot_path)
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     with pytest.raises(RuntimeError):
         orch.implement_project("proj", checkpoint_dir=str(checkpoint_base))
 
@@ -219,13 +154,8 @@ def test_resume_from_checkpoint(monkeypatch, tmp_path):
     assert not project.failedTasks
     assert not project.queuedTasks
 
-def test_self_spawn_blocked(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"HLD": 2}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_self_spawn_blocked(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"HLD": 2})
 
     def hld_factory(_acc):
         def node(task, config=None):
@@ -240,23 +170,9 @@ def test_self_spawn_blocked(monkeypatch, tmp_path):
             return ImplementedResponse().model_dump()
         return node
 
-    monkeypatch.setattr(
-        orchestrator,
-        "NODE_FACTORY",
-        {TaskType.REQUIREMENTS: req_factory, TaskType.HLD: hld_factory},
-        raising=False,
-    )
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
-
-    storage = InMemoryStorage()
-    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
-    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
+    use_nodes({TaskType.REQUIREMENTS: req_factory, TaskType.HLD: hld_factory})
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
 
     assert [t.type for t in project.completedTasks] == [
@@ -267,14 +183,8 @@ def test_self_spawn_blocked(monkeypatch, tmp_path):
     assert not project.queuedTasks
 
 
-def test_checkpoint_written(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"IMPLEMENT": 1}, "self_spawn": False},
-        "IMPLEMENT": {"can_spawn": {}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_checkpoint_written(monkeypatch, tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 1})
 
     def hld_factory(_acc):
         def node(task, config=None):
@@ -299,20 +209,12 @@ def test_checkpoint_written(monkeypatch, tmp_path):
         TaskType.HLD: hld_factory,
         TaskType.IMPLEMENT: lambda acc: impl_factory(),
     }
-    monkeypatch.setattr(orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
+    use_nodes(node_map)
 
-    storage = InMemoryStorage()
-    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
-    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
     monkeypatch.setattr(orchestrator, "load_project_state", storage.load_project_state)
     monkeypatch.setattr(orchestrator.orchestrator, "load_project_state", storage.load_project_state)
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
 
     assert storage.snapshots, "no checkpoint files"
@@ -320,14 +222,8 @@ def test_checkpoint_written(monkeypatch, tmp_path):
     assert loaded.completedTasks == project.completedTasks
 
 
-def test_jury_spawn_limit(monkeypatch, tmp_path):
-    rules = {
-        "REQUIREMENTS": {"can_spawn": {"HLD": 1}, "self_spawn": False},
-        "HLD": {"can_spawn": {"JURY": 1}, "self_spawn": False},
-        "JURY": {"can_spawn": {}, "self_spawn": False},
-    }
-    path = tmp_path / "rules.json"
-    path.write_text(json.dumps(rules))
+def test_jury_spawn_limit(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"JURY": 1})
 
     def hld_factory(_acc):
         def node(task, config=None):
@@ -351,19 +247,9 @@ def test_jury_spawn_limit(monkeypatch, tmp_path):
         TaskType.HLD: hld_factory,
         TaskType.JURY: jury_factory,
     }
-    monkeypatch.setattr(orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(orchestrator.orchestrator, "NODE_FACTORY", node_map, raising=False)
-    monkeypatch.setattr(
-        orchestrator.AgentOrchestrator,
-        "_get_accessor",
-        lambda self, t: MockAccessor(),
-    )
-
-    storage = InMemoryStorage()
-    monkeypatch.setattr(orchestrator, "save_project_state", storage.save_project_state)
-    monkeypatch.setattr(orchestrator.orchestrator, "save_project_state", storage.save_project_state)
+    use_nodes(node_map)
 
-    orch = orchestrator.AgentOrchestrator(config_path=str(path))
+    orch = orchestrator.AgentOrchestrator(config_path=path)
     project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
 
     completed_types = [t.type for t in project.completedTasks]
@@ -371,3 +257,167 @@ def test_jury_spawn_limit(monkeypatch, tmp_path):
     assert not project.failedTasks
     assert not project.queuedTasks
 
+
+def _fan_out_node_map(impl_node):
+    def hld_factory(_acc):
+        def node(task, config=None):
+            subs = [
+                Task(id=f"impl{i}", description=f"impl {i}", type=TaskType.IMPLEMENT)
+                for i in range(3)
+            ]
+            return DecomposedResponse(subtasks=subs).model_dump()
+        return node
+
+    def req_factory(_acc):
+        def node(task, config=None):
+            return ImplementedResponse().model_dump()
+        return node
+
+    return {
+        TaskType.REQUIREMENTS: req_factory,
+        TaskType.HLD: hld_factory,
+        TaskType.IMPLEMENT: lambda acc: impl_node,
+    }
+
+
+def test_parallel_siblings_run_concurrently(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 3})
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def impl_node(task, config=None):
+        # only passes if all three siblings are running at the same time
+        barrier.wait()
+        if task.id == "impl0":
+            time.sleep(0.05)
+        return ImplementedResponse(content=task.id).model_dump()
+
+    use_nodes(_fan_out_node_map(impl_node))
+
+    orch = orchestrator.AgentOrchestrator(config_path=path, max_parallel=3)
+    project = orch.implement_project("proj", checkpoint_dir=str(tmp_path))
+
+    # results are applied in dispatch order even though impl0 finishes last
+    assert [t.id for t in project.completedTasks][2:] == ["impl0", "impl1", "impl2"]
+    assert not project.failedTasks
+    assert not project.queuedTasks
+    assert not project.inProgressTasks
+    assert [p.completedTasks[-1].id for _, p in storage.snapshots[2:5]] == ["impl0", "impl1", "impl2"]
+
+
+def test_parallel_run_matches_sequential(tmp_path, storage, write_rules, use_nodes):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 3})
+
+    def impl_node(task, config=None):
+        return ImplementedResponse(content=task.id).model_dump()
+
+    use_nodes(_fan_out_node_map(impl_node))
+
+    sequential = orchestrator.AgentOrchestrator(config_path=path).implement_project(
+        "proj", checkpoint_dir=str(tmp_path)
+    )
+    parallel = orchestrator.AgentOrchestrator(config_path=path, max_parallel=4).implement_project(
+        "proj", checkpoint_dir=str(tmp_path)
+    )
+
+    assert parallel == sequential
+
+
+def test_invalid_max_parallel():
+    with pytest.raises(ValueError):
+        orchestrator.AgentOrchestrator(max_parallel=0)
+
+
+@pytest.fixture
+def run_with_subtasks(tmp_path, write_rules, use_nodes, no_snapshots):
+    """Return a function running a project whose HLD decomposes into ``subtasks``."""
+
+    def run(subtasks, impl_node, can_spawn=None, max_parallel=1):
+        path = write_rules(REQUIREMENTS={"HLD": 1}, HLD=can_spawn or {"IMPLEMENT": 5})
+
+        def hld_factory(_acc):
+            def node(task, config=None):
+                return DecomposedResponse(subtasks=deepcopy(subtasks)).model_dump()
+            return node
+
+        def req_factory(_acc):
+            def node(task, config=None):
+                return ImplementedResponse().model_dump()
+            return node
+
+        node_map = {
+            TaskType.REQUIREMENTS: req_factory,
+            TaskType.HLD: hld_factory,
+            TaskType.IMPLEMENT: lambda acc: impl_node,
+        }
+        use_nodes(node_map)
+
+        orch = orchestrator.AgentOrchestrator(config_path=path, max_parallel=max_parallel)
+        return orch.implement_project("proj", checkpoint_dir=str(tmp_path))
+
+    return run
+
+
+def _ok_node(task, config=None):
+    return ImplementedResponse(content=task.id).model_dump()
+
+
+@pytest.mark.parametrize("max_parallel", [1, 3])
+def test_dependencies_run_first(max_parallel, run_with_subtasks):
+    subtasks = [
+        Task(id="b", description="b", type=TaskType.IMPLEMENT, depends_on=["a"]),
+        Task(id="c", description="c", type=TaskType.IMPLEMENT, depends_on=["b"]),
+        Task(id="a", description="a", type=TaskType.IMPLEMENT),
+    ]
+    project = run_with_subtasks(subtasks, _ok_node, max_parallel=max_parallel)
+
+    assert [t.id for t in project.completedTasks][2:] == ["a", "b", "c"]
+    assert not project.failedTasks
+    assert not project.queuedTasks
+
+
+def test_failed_dependency_blocks_dependents(run_with_subtasks):
+    subtasks = [
+        Task(id="a", description="a", type=TaskType.IMPLEMENT),
+        Task(id="b", description="b", type=TaskType.IMPLEMENT, depends_on=["a"]),
+        Task(id="c", description="c", type=TaskType.IMPLEMENT, depends_on=["b"]),
+        Task(id="d", description="d", type=TaskType.IMPLEMENT),
+    ]
+
+    def impl_node(task, config=None):
+        if task.id == "a":
+            raise RuntimeError("broken")
+        return _ok_node(task)
+
+    project = run_with_subtasks(subtasks, impl_node)
+
+    assert [t.id for t in project.failedTasks] == ["a", "b", "c"]
+    assert [t.status for t in project.failedTasks[1:]] == [TaskStatus.BLOCKED] * 2
+    assert project.taskResults["b"].error_message == "Unmet dependencies: a"
+    assert [t.id for t in project.completedTasks][2:] == ["d"]
+    assert not project.queuedTasks
+
+
+def test_cyclic_dependencies_are_blocked(run_with_subtasks):
+    subtasks = [
+        Task(id="a", description="a", type=TaskType.IMPLEMENT, depends_on=["b"]),
+        Task(id="b", description="b", type=TaskType.IMPLEMENT, depends_on=["a"]),
+        Task(id="c", description="c", type=TaskType.IMPLEMENT),
+    ]
+    project = run_with_subtasks(subtasks, _ok_node)
+
+    assert [t.id for t in project.completedTasks][2:] == ["c"]
+    assert {t.id for t in project.failedTasks} == {"a", "b"}
+    assert all(t.status is TaskStatus.BLOCKED for t in project.failedTasks)
+    assert not project.queuedTasks
+
+
+def test_dependency_on_rejected_sibling_is_dropped(run_with_subtasks):
+    subtasks = [
+        Task(id="r", description="r", type=TaskType.RESEARCH),
+        Task(id="a", description="a", type=TaskType.IMPLEMENT, depends_on=["r"]),
+    ]
+    project = run_with_subtasks(subtasks, _ok_node, can_spawn={"IMPLEMENT": 1})
+
+    assert [t.id for t in project.completedTasks][2:] == ["a"]
+    assert project.completedTasks[2].depends_on == []
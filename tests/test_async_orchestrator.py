@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from src import orchestrator
+from src.agentNodes.implementer import Implementer
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.base_accessor import AsyncBaseModelAccessor
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+
+@pytest.fixture
+def path(write_rules):
+    return write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 3})
+
+
+class _GatedAccessor(AsyncBaseModelAccessor):
+    """Async accessor whose calls only return once ``expected`` are in flight."""
+
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.in_flight = 0
+        self.all_started = asyncio.Event()
+
+    async def call_model(self, prompt: str, schema):
+        self.in_flight += 1
+        if self.in_flight == self.expected:
+            self.all_started.set()
+        await asyncio.wait_for(self.all_started.wait(), timeout=5)
+        return ImplementedResponse(content=prompt.splitlines()[1])
+
+    async def prompt_model(self, model: str, system_prompt: str, user_prompt: str):
+        raise NotImplementedError()
+
+    async def execute_task_with_tools(self, model: str, system_prompt: str, user_prompt: str, tools=None):
+        raise NotImplementedError()
+
+
+def _node_map(impl_factory):
+    def hld_factory(_acc):
+        def node(task, config=None):
+            subs = [
+                Task(id=f"impl{i}", description=f"impl {i}", type=TaskType.IMPLEMENT)
+                for i in range(3)
+            ]
+            return DecomposedResponse(subtasks=subs).model_dump()
+        return node
+
+    def req_factory(_acc):
+        def node(task, config=None):
+            return ImplementedResponse().model_dump()
+        return node
+
+    return {
+        TaskType.REQUIREMENTS: req_factory,
+        TaskType.HLD: hld_factory,
+        TaskType.IMPLEMENT: impl_factory,
+    }
+
+
+def test_async_nodes_share_event_loop(monkeypatch, tmp_path, path, use_nodes, storage):
+    use_nodes(_node_map(lambda acc: Implementer(acc)))
+
+    async def run():
+        accessor = _GatedAccessor(expected=3)
+        monkeypatch.setattr(
+            orchestrator.AsyncAgentOrchestrator, "_get_accessor", lambda self, t: accessor
+        )
+        orch = orchestrator.AsyncAgentOrchestrator(config_path=str(path), max_parallel=3)
+        return await orch.implement_project("proj", checkpoint_dir=str(tmp_path))
+
+    project = asyncio.run(run())
+
+    assert [t.id for t in project.completedTasks][2:] == ["impl0", "impl1", "impl2"]
+    assert project.taskResults["impl2"] == ImplementedResponse(content="impl 2")
+    assert not project.failedTasks
+    assert not project.queuedTasks
+    assert storage.snapshots
+
+
+def test_async_matches_sync(monkeypatch, tmp_path, path, use_nodes, storage):
+    def impl_factory(_acc):
+        def node(task, config=None):
+            return ImplementedResponse(content=task.id).model_dump()
+        return node
+
+    use_nodes(_node_map(impl_factory))
+    monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", lambda self, t: MockAccessor())
+    monkeypatch.setattr(
+        orchestrator.AsyncAgentOrchestrator, "_get_accessor", lambda self, t: AsyncMockAccessor()
+    )
+
+    expected = orchestrator.AgentOrchestrator(config_path=str(path)).implement_project(
+        "proj", checkpoint_dir=str(tmp_path)
+    )
+    orch = orchestrator.AsyncAgentOrchestrator(config_path=str(path), max_parallel=2)
+    project = asyncio.run(orch.implement_project("proj", checkpoint_dir=str(tmp_path)))
+
+    assert project == expected
+
+
+def test_async_unknown_node_fails_task(tmp_path, path, use_nodes, storage):
+    use_nodes({})
+
+    orch = orchestrator.AsyncAgentOrchestrator(config_path=str(path))
+    project = asyncio.run(orch.implement_project("proj", checkpoint_dir=str(tmp_path)))
+
+    assert [t.id for t in project.failedTasks] == ["root-task"]
+
+
+def test_concurrent_runs_keep_their_own_state(monkeypatch, tmp_path, path, use_nodes, storage):
+    use_nodes(_node_map(lambda acc: Implementer(acc)))
+    closed = []
+
+    class Closing(_GatedAccessor):
+        async def aclose(self):
+            closed.append(self)
+
+    async def run():
+        # both runs' implementers must be in flight together
+        accessor = Closing(expected=6)
+        monkeypatch.setattr(orchestrator.AsyncAgentOrchestrator, "_get_accessor", lambda self, t: accessor)
+        orch = orchestrator.AsyncAgentOrchestrator(config_path=str(path), max_parallel=3)
+        return await asyncio.gather(
+            orch.implement_project("one", checkpoint_dir=str(tmp_path / "one")),
+            orch.implement_project("two", checkpoint_dir=str(tmp_path / "two")),
+        )
+
+    projects = asyncio.run(run())
+
+    assert [p.rootTask.description for p in projects] == ["one", "two"]
+    for project in projects:
+        assert [t.id for t in project.completedTasks][2:] == ["impl0", "impl1", "impl2"]
+        assert not project.failedTasks and not project.queuedTasks
+    # each run closed the clients it opened
+    assert len(closed) == 2
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import orchestrator
+from src.agentNodes.implementer import Implementer
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.batching import AsyncMicroBatcher, MicroBatcher
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+
+
+def _echo(sent):
+    def send(items):
+        sent.append(list(items))
+        return [ValueError(item) if item.startswith("bad") else item.upper() for item in items]
+
+    return send
+
+
+def _submit(batcher, key, item, send):
+    try:
+        return batcher.submit(key, item, send)
+    except ValueError as exc:
+        return f"error: {exc}"
+
+
+def test_concurrent_requests_share_a_batch():
+    batcher = MicroBatcher(window=0.2)
+    sent = []
+    items = ["a", "b", "bad", "c"]
+    with ThreadPoolExecutor(len(items)) as pool:
+        results = list(pool.map(lambda item: _submit(batcher, "k", item, _echo(sent)), items))
+    assert results == ["A", "B", "error: bad", "C"]
+    assert len(sent) == 1 and sorted(sent[0]) == sorted(items)
+    assert (batcher.batches, batcher.batched) == (1, 4)
+
+    # a lone request goes out alone once its window passed
+    assert batcher.submit("other", "x", _echo(sent)) == "X"
+    assert (batcher.batches, batcher.batched) == (2, 4)
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    batcher = MicroBatcher(window=5, max_size=3)
+    sent = []
+    start = time.monotonic()
+    with ThreadPoolExecutor(3) as pool:
+        assert sorted(pool.map(lambda item: batcher.submit("k", item, _echo(sent)), "xyz")) == ["X", "Y", "Z"]
+    assert time.monotonic() - start < 1
+    assert len(sent) == 1
+
+    with pytest.raises(ValueError):
+        MicroBatcher(window=-1)
+
+
+def test_async_batches_and_cancelled_callers():
+    sent = []
+
+    async def send(items):
+        sent.append(list(items))
+        await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = AsyncMicroBatcher(window=0.05)
+        quitter = asyncio.ensure_future(batcher.submit("k", "q", send))
+        calls = [batcher.submit("k", item, send) for item in "abc"]
+        await asyncio.sleep(0)
+        quitter.cancel()
+        results = await asyncio.gather(*calls)
+        return results, batcher
+
+    results, batcher = asyncio.run(main())
+    assert results == ["aa", "bb", "cc"]
+    assert sent == [["q", "a", "b", "c"]]
+    assert batcher.batches == 1
+
+
+def test_default_batch_keeps_failures_apart():
+    class Flaky(MockAccessor):
+        def call_model(self, prompt, schema):
+            if prompt == "bad":
+                raise ValueError(prompt)
+            return super().call_model(prompt, schema)
+
+    ok, failed = Flaky().call_model_batch(["ok", "bad"], ImplementedResponse)
+    assert isinstance(ok, ImplementedResponse)
+    assert isinstance(failed, ValueError)
+
+
+class BatchRecorder(MockAccessor):
+    """Answer batches itself and remember their sizes."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def call_model_batch(self, prompts, schema):
+        with self.lock:
+            self.batch_sizes.append(len(prompts))
+        return [ImplementedResponse(content=prompt.splitlines()[1]) for prompt in prompts]
+
+
+def test_orchestrator_batches_sibling_requests(monkeypatch, tmp_path, write_rules, use_nodes, no_snapshots):
+    path = write_rules(REQUIREMENTS={"IMPLEMENT": 4})
+    subtasks = [Task(id=f"i{n}", description=f"part {n}", type=TaskType.IMPLEMENT) for n in range(4)]
+    node_map = {
+        TaskType.REQUIREMENTS: lambda acc: lambda task, config=None: DecomposedResponse(subtasks=subtasks).model_dump(),
+        TaskType.IMPLEMENT: Implementer,
+    }
+    recorder = BatchRecorder()
+    use_nodes(node_map)
+    monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", lambda self, t: recorder)
+
+    orch = orchestrator.AgentOrchestrator(
+        config_path=path, max_parallel=4, streaming_policy=orchestrator.StreamingPolicy(batch_window=0.2)
+    )
+    project = orch.implement_project("build", checkpoint_dir=str(tmp_path))
+    assert recorder.batch_sizes == [4]
+    assert {project.taskResults[f"i{n}"].content for n in range(4)} == {f"part {n}" for n in range(4)}
+
+
+def test_async_orchestrator_batches_sibling_requests(monkeypatch, tmp_path, write_rules, use_nodes, no_snapshots):
+    path = write_rules(REQUIREMENTS={"IMPLEMENT": 3})
+    subtasks = [Task(id=f"i{n}", description=f"part {n}", type=TaskType.IMPLEMENT) for n in range(3)]
+    batches = []
+
+    class AsyncRecorder(AsyncMockAccessor):
+        async def call_model_batch(self, prompts, schema):
+            batches.append(len(prompts))
+            return await super().call_model_batch(prompts, schema)
+
+    async def decompose(task, config=None):
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    node_map = {TaskType.REQUIREMENTS: lambda acc: decompose, TaskType.IMPLEMENT: Implementer}
+    use_nodes(node_map)
+    monkeypatch.setattr(orchestrator.AsyncAgentOrchestrator, "_get_accessor", lambda self, t: AsyncRecorder())
+
+    orch = orchestrator.AsyncAgentOrchestrator(
+        config_path=path, max_parallel=3, streaming_policy=orchestrator.StreamingPolicy(batch_window=0.05)
+    )
+    project = asyncio.run(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+    assert batches == [3]
+    assert len(project.completedTasks) == 4
@@ -0,0 +1,140 @@
+import pytest
+
+from src import orchestrator
+from src.dataManagement import blobs as blobs_module
+from src.dataManagement.blobs import BLOB_DIR, BlobStore, find_result
+from src.dataManagement.checkpointer import CheckpointPolicy
+from src.dataManagement.journal import ProjectJournal
+from src.dataManagement.project_manager import latest_snapshot_path, load_project_state, save_project_state
+from src.dataManagement.project_store import SQLiteProjectStore
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.project import Project
+from src.dataModel.results import LazyResults
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+BIG = "x = 1\n" * 100
+
+
+def test_blobs_are_stored_once_by_content(tmp_path):
+    blobs = BlobStore(tmp_path)
+    digest = blobs.put(b"payload")
+    assert blobs.put(b"payload") == digest and digest in blobs
+    assert blobs.get(digest) == b"payload"
+    assert len(list(tmp_path.rglob("*"))) == 2  # one fan-out directory, one file
+    with pytest.raises(ValueError):
+        blobs.get("../etc/passwd")
+
+
+def test_fsynced_blobs_persist_their_directory_entries(monkeypatch, tmp_path):
+    synced = []
+    monkeypatch.setattr(blobs_module, "fsync_dir", synced.append)
+    blobs = BlobStore(tmp_path / BLOB_DIR, fsync=True)
+    digest = blobs.put(b"payload")
+    # the rename into the shard, then the new shard itself
+    assert synced == [tmp_path / BLOB_DIR / digest[:2], tmp_path / BLOB_DIR]
+    # a blob put into an existing shard only persists its rename
+    assert blobs.put(b"p71")[:2] == digest[:2]
+    assert synced[2:] == [tmp_path / BLOB_DIR / digest[:2]]
+
+
+def build_store(tmp_path) -> TaskStore:
+    root = Task(id="root", description="r", type=TaskType.HLD)
+    project = Project(rootTask=root, failedTasks=[], completedTasks=[], inProgressTasks=[], queuedTasks=[root])
+    return TaskStore(project, track_changes=True, blobs=BlobStore(tmp_path / BLOB_DIR), spill_bytes=100)
+
+
+def test_large_results_are_spilled_and_read_back_transparently(monkeypatch, tmp_path):
+    store = build_store(tmp_path)
+    journal = ProjectJournal()
+    journal.rotate(save_project_state(store.sync(), tmp_path))
+    store.drain_changes()
+
+    store.set_result("small", ImplementedResponse(content="ok"))
+    store.set_result("big", ImplementedResponse(content=BIG))
+    results = store.project.taskResults
+    assert isinstance(results, LazyResults) and results.pending == 1
+    assert results.stored("big") == {"blob": results.stored("big")["blob"]}
+    assert results["big"].content == BIG
+    assert results.pending == 1  # read from the blob, not kept
+    assert results.latest == "big" and find_result(results, store.project.latestResponse) == "big"
+
+    # the journal refers to the blob too, and replays into the same state
+    journal.append(store.drain_changes())
+    journal.close()
+    assert BIG not in (tmp_path / next(tmp_path.glob("*.journal")).name).read_text()
+    replayed = load_project_state(latest_snapshot_path(tmp_path))
+    assert replayed.taskResults["big"].content == BIG
+    assert replayed.latestResponse == ImplementedResponse(content=BIG)
+
+    snapshot = save_project_state(store.sync(), tmp_path)
+    assert BIG not in snapshot.read_text()
+    eager = load_project_state(snapshot, lazy=False)
+    assert type(eager.taskResults) is dict
+    assert eager.taskResults["big"].content == BIG
+    assert eager.latestResponse == eager.taskResults["big"]
+
+    # the latest result is looked up, not searched for among the others
+    checked = []
+    monkeypatch.setattr(LazyResults, "spilled", lambda self, task_id: checked.append(task_id))
+    store.set_result("small", ImplementedResponse(content="again"))
+    assert find_result(results, store.project.latestResponse) == "small" and checked == ["small"]
+
+
+def test_decomposed_results_stay_in_memory(tmp_path):
+    store = build_store(tmp_path)
+    subtasks = [Task(id="s", description=BIG, type=TaskType.IMPLEMENT, parent_id="root")]
+    store.set_result("root", DecomposedResponse(subtasks=subtasks, content=BIG))
+    assert not (tmp_path / BLOB_DIR).exists()
+
+
+def _node_map(big=BIG):
+    def hld(task, config=None):
+        subtasks = [Task(id=f"part{i}", description=f"p{i}", type=TaskType.IMPLEMENT) for i in range(3)]
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    def implement(task, config=None):
+        return ImplementedResponse(content=big if task.id != "part0" else "short").model_dump()
+
+    return {
+        TaskType.REQUIREMENTS: lambda acc: hld,
+        TaskType.IMPLEMENT: lambda acc: implement,
+    }
+
+
+@pytest.mark.parametrize("sqlite", [False, True])
+def test_orchestrator_spills_results_of_a_run(tmp_path, write_rules, use_nodes, sqlite):
+    rules = write_rules(REQUIREMENTS={"IMPLEMENT": 3})
+    use_nodes(_node_map())
+    location = f"sqlite:///{tmp_path}/runs/project.db" if sqlite else str(tmp_path / "runs")
+
+    orch = orchestrator.AgentOrchestrator(config_path=rules, checkpoint_policy=CheckpointPolicy(spill_bytes=100))
+    project = orch.implement_project("build", checkpoint_dir=location)
+    # both large results have the same content, so they share one blob
+    assert len(list((tmp_path / "runs").rglob(f"{BLOB_DIR}/*/*"))) == 1
+
+    if sqlite:
+        loaded = SQLiteProjectStore(tmp_path / "runs" / "project.db").load()
+    else:
+        (run_dir,) = (tmp_path / "runs").iterdir()
+        loaded = load_project_state(latest_snapshot_path(run_dir))
+        assert BIG not in latest_snapshot_path(run_dir).read_text()
+    assert loaded == project
+    assert [loaded.taskResults[f"part{i}"].content for i in range(3)] == ["short", BIG, BIG]
+    assert all(t.status is TaskStatus.COMPLETED for t in loaded.completedTasks)
+
+
+def test_runs_spill_large_results_by_default(tmp_path, write_rules, use_nodes):
+    rules = write_rules(REQUIREMENTS={"IMPLEMENT": 3})
+    huge = BIG * 10
+    use_nodes(_node_map(huge))
+
+    orchestrator.AgentOrchestrator(config_path=rules).implement_project("build", checkpoint_dir=str(tmp_path / "runs"))
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    snapshot = latest_snapshot_path(run_dir)
+    assert huge not in snapshot.read_text()
+    # a resumed run only holds the small results; the large ones stay on disk
+    results = load_project_state(snapshot).taskResults
+    assert isinstance(results, LazyResults)
+    assert [results.spilled(f"part{i}") is not None for i in range(3)] == [False, True, True]
+    assert results["part1"].content == huge
@@ -0,0 +1,133 @@
+import asyncio
+
+from src import orchestrator
+from src.dataModel.model_response import DecomposedResponse, FailedResponse, ImplementedResponse
+from src.modelAccessors.caching_accessor import AsyncCachingAccessor, CachingAccessor, ResponseCache
+from src.modelAccessors.data.tool import Tool
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+from src.modelAccessors.single_flight import SingleFlightAccessor
+
+
+class CountingAccessor(MockAccessor):
+    def __init__(self, fail: bool = False) -> None:
+        super().__init__()
+        self.calls = 0
+        self.fail = fail
+
+    def prompt_model(self, model, system_prompt, user_prompt):
+        self.calls += 1
+        if self.fail:
+            return FailedResponse(error_message="rate limited", retryable=True)
+        return super().prompt_model(model, system_prompt, user_prompt)
+
+
+def test_repeated_requests_hit_the_cache():
+    inner = CountingAccessor()
+    cache = ResponseCache()
+    acc = CachingAccessor(inner, cache)
+
+    first = acc.prompt_model("gpt", "sys", "decompose this")
+    second = acc.prompt_model("gpt", "sys", "decompose this")
+    acc.prompt_model("gpt", "other system", "decompose this")
+
+    assert inner.calls == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert isinstance(second, DecomposedResponse)
+    assert second == first
+    assert second is not first
+
+
+def test_call_model_is_keyed_on_the_inner_model():
+    inner = CountingAccessor()
+    inner.model = "small"  # type: ignore[attr-defined]
+    # wrappers in between pass the model through
+    acc = CachingAccessor(SingleFlightAccessor(inner), ResponseCache())
+    acc.call_model("decompose", None)
+    acc.call_model("decompose", None)
+    inner.model = "large"  # type: ignore[attr-defined]
+    acc.call_model("decompose", None)
+    assert inner.calls == 2
+
+
+def test_tools_are_part_of_the_key(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    acc = CachingAccessor(MockAccessor(), ResponseCache(path))
+    search = [Tool(name="search", description="web")]
+    acc.execute_task_with_tools("mock-gpt-4", "s", "u", search)
+    acc.execute_task_with_tools("mock-gpt-4", "s", "u", None)
+
+    # entries outlive the process that wrote them
+    reopened = ResponseCache(path)
+    hit = CachingAccessor(MockAccessor(), reopened).execute_task_with_tools("mock-gpt-4", "s", "u", search)
+    assert len(reopened) == 2
+    assert reopened.hits == 1
+    assert isinstance(hit, ImplementedResponse) and "search" in (hit.content or "")
+
+
+def test_least_recently_used_entries_are_evicted():
+    body = ImplementedResponse(content="x" * 100).model_dump_json()
+    cache = ResponseCache(max_bytes=len(body) * 2)
+    cache.put("a", body)
+    cache.put("b", body)
+    assert cache.get("a") is not None
+    cache.put("c", body)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1
+    assert cache.size == len(body) * 2
+
+
+def test_processes_sharing_a_cache_file_keep_it_bounded(tmp_path):
+    body = ImplementedResponse(content="x" * 100).model_dump_json()
+    path = tmp_path / "cache.db"
+    # separate connections stand in for separate processes
+    first, second = ResponseCache(path, max_bytes=len(body) * 3), ResponseCache(path, max_bytes=len(body) * 3)
+    first.put("a", body)
+    second.put("b", body)
+    assert first.get("a") is not None
+    second.put("c", body)
+    first.put("d", body)
+
+    assert first.size == second.size == len(body) * 3
+    assert second.get("b") is None
+    assert all(first.get(key) is not None for key in "acd")
+    first.close()
+    second.close()
+
+
+def test_failures_are_not_cached():
+    inner = CountingAccessor(fail=True)
+    acc = CachingAccessor(inner, ResponseCache())
+    acc.prompt_model("gpt", "s", "u")
+    acc.prompt_model("gpt", "s", "u")
+
+    assert inner.calls == 2
+
+
+def test_async_accessor_shares_keys_with_sync():
+    cache = ResponseCache()
+    CachingAccessor(MockAccessor(), cache).prompt_model("gpt", "s", "u")
+    response = asyncio.run(AsyncCachingAccessor(AsyncMockAccessor(), cache).prompt_model("gpt", "s", "u"))
+
+    assert cache.hits == 1
+    assert isinstance(response, ImplementedResponse)
+
+
+def test_rerun_is_served_from_cache(monkeypatch, tmp_path, write_rules):
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 2})
+    inner = CountingAccessor()
+    monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", lambda self, t: inner)
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+
+    def run():
+        orch = orchestrator.AgentOrchestrator(config_path=path, response_cache=cache)
+        return orch.implement_project("build something complex", checkpoint_dir=str(tmp_path / "cp"))
+
+    first = run()
+    calls = inner.calls
+    second = run()
+
+    assert calls > 0
+    assert inner.calls == calls
+    assert second == first
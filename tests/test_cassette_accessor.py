@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+from src import orchestrator
+from src.dataModel.model_response import ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.cassette_accessor import (
+    Cassette,
+    CassetteAccessor,
+    CassetteMismatchError,
+    RecordedError,
+)
+from src.modelAccessors.mock_accessor import MockAccessor
+
+
+class FlakyAccessor(MockAccessor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def prompt_model(self, model, system_prompt, user_prompt):
+        self.calls += 1
+        if user_prompt == "boom":
+            raise TimeoutError("provider timed out")
+        if user_prompt == "bad":
+            raise ValueError("malformed response")
+        return ImplementedResponse(content=f"{user_prompt} #{self.calls}")
+
+
+def test_replay_returns_recordings_in_order(tmp_path):
+    path = tmp_path / "run.cassette"
+    recorder = Cassette(path, "record")
+    acc = CassetteAccessor(FlakyAccessor(), recorder, "mock")
+    recorded = [acc.prompt_model("m", "s", "hi"), acc.prompt_model("m", "s", "hi"), acc.call_model("decompose", None)]
+    with pytest.raises(TimeoutError):
+        acc.prompt_model("m", "s", "boom")
+    recorder.close()
+
+    player = Cassette(path, "replay")
+    replay = CassetteAccessor(None, player, "mock")
+    assert replay.prompt_model("m", "s", "hi") == recorded[0]
+    assert replay.prompt_model("m", "s", "hi") == recorded[1]
+    assert replay.call_model("decompose", None) == recorded[2]
+    with pytest.raises(RecordedError, match="TimeoutError: provider timed out"):
+        replay.prompt_model("m", "s", "boom")
+    assert player.remaining() == 0
+
+    with pytest.raises(CassetteMismatchError, match="'hi'"):
+        replay.prompt_model("m", "s", "hi")
+    with pytest.raises(CassetteMismatchError):
+        replay.prompt_model("other-model", "s", "decompose")
+
+
+def test_replayed_errors_are_retried_like_the_recorded_ones(tmp_path):
+    path = tmp_path / "run.cassette"
+    recorder = Cassette(path, "record")
+    acc = CassetteAccessor(FlakyAccessor(), recorder, "mock")
+    for prompt in ("boom", "bad"):
+        with pytest.raises((TimeoutError, ValueError)):
+            acc.prompt_model("m", "s", prompt)
+    recorder.close()
+
+    replay = CassetteAccessor(None, Cassette(path, "replay"), "mock")
+    task = Task(id="t", description="d", type=TaskType.IMPLEMENT)
+    retryable = []
+    for prompt in ("boom", "bad"):
+        with pytest.raises(RecordedError) as info:
+            replay.prompt_model("m", "s", prompt)
+        retryable.append(orchestrator.AgentOrchestrator._failure(task, info.value).retryable)
+    # a timeout is retried as a task failure on replay too; a bad response is not
+    assert retryable == [True, False]
+
+
+def test_call_model_recordings_are_keyed_on_the_model(tmp_path):
+    path = tmp_path / "run.cassette"
+    inner = FlakyAccessor()
+    inner.model = "small"  # type: ignore[attr-defined]
+    recorder = Cassette(path, "record")
+    recorded = CassetteAccessor(inner, recorder, "local").call_model("p", None)
+    recorder.close()
+
+    # a replay without an accessor uses the model the run was recorded with
+    assert CassetteAccessor(None, Cassette(path, "replay"), "local").call_model("p", None) == recorded
+    inner.model = "large"  # type: ignore[attr-defined]
+    with pytest.raises(CassetteMismatchError):
+        CassetteAccessor(inner, Cassette(path, "replay"), "local").call_model("p", None)
+
+
+def test_replay_latency_is_scaled(tmp_path):
+    path = tmp_path / "run.cassette"
+    recorder = Cassette(path, "record")
+    recorder.record("mock", "prompt_model", ("m", "s", "u"), ImplementedResponse(), latency=0.2)
+    recorder.record("mock", "prompt_model", ("m", "s", "u"), ImplementedResponse(), latency=0.2)
+    recorder.close()
+
+    replay = CassetteAccessor(None, Cassette(path, "replay", latency=0.25), "mock")
+    start = time.perf_counter()
+    replay.prompt_model("m", "s", "u")
+    replay.prompt_model("m", "s", "u")
+    assert 0.1 <= time.perf_counter() - start < 0.4
+
+
+@pytest.fixture
+def make_orchestrator(monkeypatch, write_rules):
+    """Return a function building an orchestrator that plays ``cassette`` with accessors from ``get_accessor``."""
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 2})
+
+    def make(cassette, get_accessor):
+        monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", get_accessor)
+        return orchestrator.AgentOrchestrator(config_path=path, cassette=cassette, max_parallel=2)
+
+    return make
+
+
+def test_orchestrator_replays_offline(tmp_path, make_orchestrator):
+    path = tmp_path / "run.cassette"
+    recorder = Cassette(path, "record")
+    orch = make_orchestrator(recorder, lambda self, t: MockAccessor())
+    recorded = orch.implement_project("build something complex", checkpoint_dir=str(tmp_path / "a"))
+    recorder.close()
+
+    def offline(self, accessor_type):
+        raise AssertionError("replay must not construct accessors")
+
+    player = Cassette(path, "replay")
+    orch = make_orchestrator(player, offline)
+    replayed = orch.implement_project("build something complex", checkpoint_dir=str(tmp_path / "b"))
+
+    assert replayed == recorded
+    assert player.remaining() == 0
+
+    orch = make_orchestrator(Cassette(path, "replay"), offline)
+    with pytest.raises(CassetteMismatchError):
+        orch.implement_project("a different project", checkpoint_dir=str(tmp_path / "c"))
@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+from src.dataManagement import checkpointer as checkpointer_module
+from src.dataManagement import project_manager
+from src.dataManagement.checkpointer import Checkpointer, CheckpointPolicy
+from src.dataManagement.codec import normalize
+from src.dataManagement.project_manager import load_project_state, save_project_state
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+def build_store() -> TaskStore:
+    root = Task(id="root", description="r", type=TaskType.HLD)
+    project = Project(rootTask=root, failedTasks=[], completedTasks=[], inProgressTasks=[], queuedTasks=[root])
+    store = TaskStore(project)
+    store.add(Task(id=f"t{i}", description="t", type=TaskType.IMPLEMENT) for i in range(8))
+    return store
+
+
+class RecordingSave:
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        self.saved: list[list[str]] = []
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def __call__(self, project, directory):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait()
+        self.saved.append([t.id for t in project.completedTasks])
+        return directory / f"{len(self.saved)}.json"
+
+
+def complete(store: TaskStore, task_id: str) -> None:
+    task = store.get(task_id)
+    assert task is not None
+    store.set_status(task, TaskStatus.COMPLETED)
+
+
+def test_every_n_policy_skips_between_checkpoints(tmp_path):
+    store = build_store()
+    save = RecordingSave()
+    cp = Checkpointer(store, tmp_path, save, CheckpointPolicy(every_n=3))
+    for i in range(7):
+        complete(store, f"t{i}")
+        cp.checkpoint()
+    cp.checkpoint(final=True)
+
+    assert [len(ids) for ids in save.saved] == [3, 6, 7]
+
+
+def test_interval_policy(monkeypatch, tmp_path):
+    clock = iter([0.0, 1.0, 2.5, 3.0, 5.1])
+    monkeypatch.setattr(checkpointer_module.time, "monotonic", lambda: next(clock))
+    store = build_store()
+    save = RecordingSave()
+    cp = Checkpointer(store, tmp_path, save, CheckpointPolicy(every_n=None, every_seconds=2))
+    for i in range(4):
+        complete(store, f"t{i}")
+        cp.checkpoint()
+
+    # due at 2.5s and 5.1s
+    assert [len(ids) for ids in save.saved] == [2, 4]
+    cp.close()
+
+
+def test_background_writer_collapses_pending_snapshots(tmp_path):
+    store = build_store()
+    gate = threading.Event()
+    save = RecordingSave(gate)
+    cp = Checkpointer(store, tmp_path, save, CheckpointPolicy(background=True))
+    complete(store, "t0")
+    cp.checkpoint()
+    assert save.entered.wait(5)
+    for i in range(1, 5):
+        complete(store, f"t{i}")
+        cp.checkpoint()
+    gate.set()
+    cp.checkpoint(final=True)
+
+    # the writer was stuck on the first snapshot; the rest collapsed into the final one
+    assert save.saved == [["t0"], [f"t{i}" for i in range(5)]]
+    assert cp._writer is not None and cp._writer.coalesced == 4
+
+
+def test_background_snapshots_are_made_from_changes_not_copies(monkeypatch, tmp_path):
+    copies = []
+    model_copy = Project.model_copy
+    monkeypatch.setattr(Project, "model_copy", lambda self, **kw: copies.append(self) or model_copy(self, **kw))
+    store = build_store()
+    saved = []
+
+    def save(project, directory):
+        saved.append(normalize(project))
+        return directory / f"{len(saved)}.json"
+
+    cp = Checkpointer(store, tmp_path, save, CheckpointPolicy(background=True))
+    for i in range(3):
+        complete(store, f"t{i}")
+        store.set_result(f"t{i}", ImplementedResponse(content=f"t{i}"))
+        cp.checkpoint()
+    subtasks = [Task(id="s0", description="s", type=TaskType.IMPLEMENT, parent_id="t3")]
+    store.set_result("t3", DecomposedResponse(subtasks=subtasks))
+    store.add(subtasks)
+    complete(store, "t3")
+    cp.checkpoint()
+    complete(store, "s0")
+    cp.checkpoint(final=True)
+
+    assert saved[-1] == normalize(store.project)
+    # one copy when the run started, none per snapshot
+    assert len(copies) == 1
+
+
+def test_background_errors_surface(tmp_path):
+    def broken(project, directory):
+        raise OSError("disk full")
+
+    cp = Checkpointer(build_store(), tmp_path, broken, CheckpointPolicy(background=True))
+    cp.checkpoint()
+    with pytest.raises(OSError, match="disk full"):
+        cp.checkpoint(final=True)
+
+
+def test_fsync_snapshot(monkeypatch, tmp_path):
+    synced: list[int] = []
+    real_fsync = project_manager.os.fsync
+    monkeypatch.setattr(project_manager.os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    store = build_store()
+
+    path = save_project_state(store.sync(), tmp_path, fsync=True)
+
+    assert len(synced) == 3  # the file, the manifest and their directory
+    assert load_project_state(path) == store.project
+
+
+def test_retention_prunes_old_snapshots(tmp_path):
+    store = build_store()
+    policy = CheckpointPolicy(keep_last=2, keep_every=3)
+    cp = Checkpointer(store, tmp_path, save_project_state, policy)
+    for i in range(7):
+        complete(store, f"t{i}")
+        cp.checkpoint()
+    cp.checkpoint(final=True)
+
+    # 8 snapshots were written; the pruner runs on its own thread
+    seqs = sorted(int(p.name.split("-")[1]) for p in tmp_path.glob("*.json"))
+    assert seqs == [3, 6, 7, 8]
+    assert load_project_state(project_manager.latest_snapshot_path(tmp_path)) == store.sync()
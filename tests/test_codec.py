@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from src.dataManagement import codec
+from src.dataManagement.codec import CODECS, decode_project, detect_codec, encode_project
+from src.dataManagement.project_manager import latest_snapshot_path, load_project_state, save_project_state
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse, ModelResponse
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+def build_project() -> Project:
+    root = Task(id="root", description="build", type=TaskType.HLD, status=TaskStatus.COMPLETED)
+    a = Task(id="a", description="a", type=TaskType.IMPLEMENT, parent_id="root", status=TaskStatus.COMPLETED)
+    b = Task(id="b", description="b", type=TaskType.IMPLEMENT, parent_id="root")
+    dropped = Task(id="x", description="over the spawn limit", type=TaskType.IMPLEMENT)
+    done = ImplementedResponse(content="done")
+    results: dict[str, ModelResponse] = {"root": DecomposedResponse(subtasks=[a, b, dropped]), "a": done}
+    return Project(
+        rootTask=root,
+        failedTasks=[],
+        completedTasks=[root, a],
+        inProgressTasks=[],
+        queuedTasks=[b],
+        taskResults=results,
+        latestResponse=done,
+    )
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_round_trip_and_detection(name):
+    if not CODECS[name].available:
+        pytest.skip(f"{CODECS[name].requires} is not installed")
+    project = build_project()
+    payload = encode_project(project, name)
+    assert detect_codec(payload) is CODECS[name]
+    assert decode_project(payload) == project
+
+
+def test_normalized_layout_stores_each_task_once():
+    project = build_project()
+    data = codec.normalize(project)
+    assert list(data["tasks"]) == ["root", "a", "b"]
+    assert data["rootTask"] == {"ref": "root"}
+    assert data["taskResults"]["root"]["subtasks"][:2] == [{"ref": "a"}, {"ref": "b"}]
+    # not a task of the project, so kept as it was
+    assert data["taskResults"]["root"]["subtasks"][2]["id"] == "x"
+    assert data["latestResponse"] == {"ref": "a"}
+
+    loaded = codec.denormalize(json.loads(json.dumps(data)))
+    assert loaded.rootTask is loaded.completedTasks[0]
+    assert loaded.taskResults["root"].subtasks[1] is loaded.queuedTasks[0]
+    assert loaded.latestResponse is loaded.taskResults["a"]
+    assert len(encode_project(project)) < len(json.dumps(project.model_dump(), indent=2))
+
+
+def test_loads_legacy_snapshots_and_any_codec(tmp_path):
+    project = build_project()
+    legacy = tmp_path / "20200101000000.json"
+    legacy.write_text(json.dumps(project.model_dump(mode="json"), indent=2))
+    assert load_project_state(legacy).completedTasks == project.completedTasks
+
+    snapshot = save_project_state(project, tmp_path, codec="json.gz")
+    assert snapshot.name.endswith(".json.gz")
+    assert latest_snapshot_path(tmp_path) == snapshot
+    assert load_project_state(snapshot).taskResults == project.taskResults
+
+    with pytest.raises(ValueError):
+        save_project_state(project, tmp_path, codec="yaml")
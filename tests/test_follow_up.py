@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+import pytest
+
+from src import orchestrator
+from src.cli import answer
+from src.dataManagement.answers import AnswerInbox
+from src.dataModel.model_response import DecomposedResponse, FollowUpResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+@pytest.fixture
+def rules(write_rules):
+    return write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 2})
+
+
+def _ask(task, question):
+    return FollowUpResponse(follow_up_ask=Task(id=f"{task.id}-ask", description=question, type=task.type))
+
+
+def _node_map(finished):
+    def requirements(task, config=None):
+        return ImplementedResponse().model_dump()
+
+    def hld(task, config=None):
+        # the parked task's id is not a safe file name, as model-made ids often are
+        subtasks = [
+            Task(id="api/auth", description="pick a db", type=TaskType.IMPLEMENT),
+            Task(id="other", description="write docs", type=TaskType.IMPLEMENT),
+        ]
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    def implement(task, config=None):
+        if task.id == "api/auth" and "\n" not in task.description:
+            return _ask(task, "Which database?").model_dump()
+        finished.append(task.id)
+        return ImplementedResponse(content=task.description).model_dump()
+
+    return {
+        TaskType.REQUIREMENTS: lambda acc: requirements,
+        TaskType.HLD: lambda acc: hld,
+        TaskType.IMPLEMENT: lambda acc: implement,
+    }
+
+
+def _answer_when_asked(directory, finished, seen):
+    inbox = AnswerInbox(directory)
+    while not inbox.questions():
+        threading.Event().wait(0.01)
+    seen.extend(finished)
+    inbox.answer("api/auth", "postgres")
+
+
+def _watching(orch, finished, seen):
+    """Wrap ``orch._open_store`` to answer from a thread once the run's inbox has a question."""
+    open_store = orch._open_store
+
+    def wrapper(run):
+        open_store(run)
+        threading.Thread(target=_answer_when_asked, args=(run.inbox.directory, finished, seen), daemon=True).start()
+
+    return wrapper
+
+
+def test_inbox_files(tmp_path):
+    inbox = AnswerInbox(tmp_path)
+    inbox.ask("t1", "why?")
+    assert inbox.asked("t1") and inbox.questions() == {"t1": "why?"}
+    inbox.answer("t1", "because\n")
+    assert inbox.questions() == {}
+    assert inbox.collect(["t1", "t2"]) == {"t1": "because"}
+    # asking again drops the answer to the earlier question
+    inbox.ask("t1", "really?")
+    assert inbox.collect(["t1"]) == {}
+
+
+def test_inbox_files_of_unsafe_task_ids(tmp_path):
+    inbox = AnswerInbox(tmp_path / "answers")
+    ids = ["api/auth", "../t1", ".hidden", "", "x" * 300]
+    for task_id in ids:
+        inbox.ask(task_id, f"about {task_id}?")
+    # every file stays inside the inbox
+    assert len(list((tmp_path / "answers").glob("*.question"))) == len(ids)
+    assert list(tmp_path.iterdir()) == [tmp_path / "answers"]
+    assert inbox.questions() == {task_id: f"about {task_id}?" for task_id in ids}
+    inbox.answer("api/auth", "oauth")
+    assert inbox.collect(ids) == {"api/auth": "oauth"}
+
+
+def test_parked_task_waits_while_the_tree_runs_on(monkeypatch, tmp_path, use_nodes, no_snapshots, rules):
+    finished, seen = [], []
+    use_nodes(_node_map(finished))
+
+    orch = orchestrator.AgentOrchestrator(config_path=rules, answer_poll_interval=0.01)
+    monkeypatch.setattr(orch, "_open_store", _watching(orch, finished, seen))
+    project = orch.implement_project("build", checkpoint_dir=str(tmp_path))
+
+    # the sibling finished while the question was open
+    assert seen == ["other"]
+    ask = next(t for t in project.completedTasks if t.id == "api/auth")
+    assert ask.description == "pick a db\npostgres"
+    assert len(project.completedTasks) == 4
+
+
+def test_async_parked_task_waits_while_the_tree_runs_on(monkeypatch, tmp_path, use_nodes, no_snapshots, rules):
+    finished, seen = [], []
+    use_nodes(_node_map(finished))
+
+    orch = orchestrator.AsyncAgentOrchestrator(config_path=rules, max_parallel=2, answer_poll_interval=0.01)
+    monkeypatch.setattr(orch, "_open_store", _watching(orch, finished, seen))
+    project = asyncio.run(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+
+    assert seen == ["other"]
+    assert {t.id for t in project.completedTasks} == {"root-task", "root-task-hld", "api/auth", "other"}
+
+
+def test_headless_run_resumes_with_the_answer(tmp_path, capsys, use_nodes, rules):
+    def clarifier(task, config=None):
+        return _ask(task, "Web or CLI?").model_dump()
+
+    def hld(task, config=None):
+        return ImplementedResponse(content=task.description).model_dump()
+
+    node_map = {TaskType.REQUIREMENTS: lambda acc: clarifier, TaskType.HLD: lambda acc: hld}
+    use_nodes(node_map)
+
+    policy = orchestrator.CheckpointPolicy(journal_snapshot_every=5)
+    orch = orchestrator.AgentOrchestrator(config_path=rules, wait_for_answers=False, checkpoint_policy=policy)
+    project = orch.implement_project("build a todo app", checkpoint_dir=str(tmp_path / "runs"))
+    assert [t.status for t in project.inProgressTasks] == [TaskStatus.PENDING_USER_INPUT]
+    run_dir = orch.inbox.directory.parent
+
+    answer(["--checkpoint-dir", str(run_dir)])
+    assert capsys.readouterr().out == "root-task: Web or CLI?\n"
+    with pytest.raises(SystemExit):
+        answer(["nope", "x", "--checkpoint-dir", str(run_dir)])
+    answer(["root-task", "CLI", "--checkpoint-dir", str(run_dir)])
+
+    # the parked clarifier is not asked again; its answer goes on to the HLD
+    project = orchestrator.AgentOrchestrator(config_path=rules).resume_project(str(run_dir))
+    assert [t.id for t in project.completedTasks] == ["root-task", "root-task-hld"]
+    assert project.taskResults["root-task-hld"].content == "build a todo app\nCLI"
@@ -0,0 +1,158 @@
+import pytest
+
+from src import orchestrator
+from src.dataManagement.journal import ProjectJournal, journal_path
+from src.dataManagement.project_manager import (
+    latest_snapshot_path,
+    load_project_state,
+    save_project_state,
+)
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.model_response import DecomposedResponse, FailedResponse, ImplementedResponse
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+from src.modelAccessors.mock_accessor import MockAccessor
+
+
+def build_project() -> Project:
+    root = Task(id="root", description="r", type=TaskType.HLD)
+    return Project(
+        rootTask=root,
+        failedTasks=[],
+        completedTasks=[],
+        inProgressTasks=[],
+        queuedTasks=[root],
+    )
+
+
+def test_replay_restores_journaled_changes(tmp_path):
+    store = TaskStore(build_project(), track_changes=True)
+    journal = ProjectJournal()
+    journal.rotate(save_project_state(store.sync(), tmp_path))
+    store.drain_changes()
+
+    root = store.get("root")
+    assert root is not None
+    store.set_status(root, TaskStatus.IN_PROGRESS)
+    subtasks = [Task(id=f"s{i}", description="s", type=TaskType.IMPLEMENT, parent_id="root") for i in range(2)]
+    store.set_result("root", DecomposedResponse(subtasks=subtasks))
+    store.set_status(root, TaskStatus.COMPLETED)
+    store.add(subtasks)
+    journal.append(store.drain_changes())
+
+    s0 = store.get("s0")
+    assert s0 is not None
+    store.set_status(s0, TaskStatus.FAILED)
+    store.set_result("s0", FailedResponse(error_message="boom"))
+    s1 = store.get("s1")
+    assert s1 is not None
+    store.set_description(s1, "s\nanswered")
+    journal.append(store.drain_changes())
+    journal.close()
+
+    resumed = load_project_state(latest_snapshot_path(tmp_path))
+    assert resumed == store.sync()
+    assert [t.id for t in resumed.queuedTasks] == ["s1"]
+    assert resumed.latestResponse == FailedResponse(error_message="boom")
+
+
+def test_replay_ignores_torn_tail(tmp_path):
+    store = TaskStore(build_project(), track_changes=True)
+    journal = ProjectJournal()
+    snapshot = save_project_state(store.sync(), tmp_path)
+    journal.rotate(snapshot)
+    store.drain_changes()
+
+    root = store.get("root")
+    assert root is not None
+    store.set_status(root, TaskStatus.COMPLETED)
+    journal.append(store.drain_changes())
+    journal.close()
+    with open(journal_path(snapshot), "a", encoding="utf-8") as fh:
+        fh.write('{"op":"status","id":"ro')
+
+    resumed = load_project_state(snapshot)
+    assert [t.id for t in resumed.completedTasks] == ["root"]
+    assert not resumed.queuedTasks
+
+
+class Crash(BaseException):
+    """Escapes the orchestrator like a killed process would."""
+
+
+@pytest.fixture
+def make_run(monkeypatch, write_rules, use_nodes):
+    """Return a function building an orchestrator for a run of six IMPLEMENT tasks.
+
+    It returns the orchestrator and the ids of the tasks it executed; the
+    task ``crash_on`` raises :class:`Crash`.
+    """
+    path = write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 10})
+
+    def make(crash_on=None, **kwargs):
+        calls: list[str] = []
+
+        def hld_node(task, config=None):
+            subtasks = [Task(id=f"impl-{i}", description="i", type=TaskType.IMPLEMENT) for i in range(6)]
+            return DecomposedResponse(subtasks=subtasks).model_dump()
+
+        def impl_node(task, config=None):
+            calls.append(task.id)
+            if task.id == crash_on:
+                raise Crash
+            return ImplementedResponse(content=task.id).model_dump()
+
+        use_nodes(
+            {
+                TaskType.REQUIREMENTS: lambda acc: lambda task, config=None: ImplementedResponse().model_dump(),
+                TaskType.HLD: lambda acc: hld_node,
+                TaskType.IMPLEMENT: lambda acc: impl_node,
+            }
+        )
+        monkeypatch.setattr(orchestrator.AgentOrchestrator, "_get_accessor", lambda self, t: MockAccessor())
+        return orchestrator.AgentOrchestrator(config_path=path, **kwargs), calls
+
+    return make
+
+
+def test_journal_run_matches_snapshot_run(tmp_path, make_run):
+    orch, _ = make_run(checkpoint_policy=orchestrator.CheckpointPolicy(journal_snapshot_every=3))
+    journaled = orch.implement_project("demo", checkpoint_dir=str(tmp_path / "a"))
+    orch, _ = make_run()
+    snapshotted = orch.implement_project("demo", checkpoint_dir=str(tmp_path / "b"))
+
+    assert journaled == snapshotted
+    run_dir = next((tmp_path / "a").glob("2*"))
+    # 8 checkpoints: twice a snapshot followed by three appends, then the final snapshot
+    assert len(list(run_dir.glob("*.json"))) == 3
+    assert load_project_state(latest_snapshot_path(run_dir)) == journaled
+
+
+def test_resume_replays_journal_after_crash(tmp_path, make_run):
+    policy = orchestrator.CheckpointPolicy(journal_snapshot_every=100)
+    orch, calls = make_run(crash_on="impl-4", checkpoint_policy=policy)
+    with pytest.raises(Crash):
+        orch.implement_project("demo", checkpoint_dir=str(tmp_path))
+    run_dir = next(tmp_path.glob("2*"))
+    assert len(list(run_dir.glob("*.json"))) == 1
+
+    orch, calls = make_run(checkpoint_policy=policy)
+    project = orch.resume_project(str(run_dir))
+
+    assert calls == ["impl-4", "impl-5"]
+    assert [t.id for t in project.completedTasks][2:] == [f"impl-{i}" for i in range(6)]
+    assert not project.queuedTasks
+
+
+def test_background_journal_resumes(tmp_path, make_run):
+    policy = orchestrator.CheckpointPolicy(background=True, fsync=True, journal_snapshot_every=2)
+    orch, _ = make_run(crash_on="impl-3", checkpoint_policy=policy)
+    with pytest.raises(Crash):
+        orch.implement_project("demo", checkpoint_dir=str(tmp_path))
+    run_dir = next(tmp_path.glob("2*"))
+
+    orch, calls = make_run(checkpoint_policy=policy)
+    project = orch.resume_project(str(run_dir))
+
+    assert calls == ["impl-3", "impl-4", "impl-5"]
+    assert [t.id for t in project.completedTasks][2:] == [f"impl-{i}" for i in range(6)]
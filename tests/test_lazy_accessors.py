@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+from src.cli.bench.startup import PROVIDER_MODULES
+from src.modelAccessors import registry
+from src.modelAccessors.local_accessor import AsyncLocalAccessor, LocalAccessor
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+from src.modelAccessors.registry import accessor_class
+
+
+def test_cli_start_imports_no_provider_sdk():
+    probe = f"import sys; import src.cli; print(' '.join(m for m in {PROVIDER_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True).stdout
+    assert out.strip() == ""
+
+
+def test_accessor_class_resolves_builtins():
+    assert accessor_class("mock") is MockAccessor
+    assert accessor_class("mock", asynchronous=True) is AsyncMockAccessor
+    assert accessor_class("local") is LocalAccessor
+    assert accessor_class("local", asynchronous=True) is AsyncLocalAccessor
+    with pytest.raises(ValueError, match="asyncio accessor"):
+        accessor_class("gemini", asynchronous=True)
+    with pytest.raises(ValueError):
+        accessor_class("nope")
+
+
+def test_entry_points_override_builtins(monkeypatch):
+    class FakeEntryPoint:
+        name = "mock"
+        value = "src.modelAccessors.local_accessor:LocalAccessor"
+
+    monkeypatch.setattr(registry, "entry_points", lambda group: [FakeEntryPoint()])
+    registry._declared.cache_clear()
+    registry.accessor_class.cache_clear()
+    try:
+        assert accessor_class("mock") is LocalAccessor
+        assert accessor_class("openai") is not LocalAccessor
+    finally:
+        registry._declared.cache_clear()
+        registry.accessor_class.cache_clear()
@@ -0,0 +1,131 @@
+import copy
+import json
+import sqlite3
+
+from src.dataManagement.codec import normalize
+from src.dataManagement.project_manager import load_project_state, save_project_state
+from src.dataManagement.project_store import SQLiteProjectStore
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse, ModelResponse
+from src.dataModel.project import Project
+from src.dataModel.results import LazyResults
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+def build_project(n: int = 3) -> Project:
+    root = Task(id="root", description="r", type=TaskType.HLD, status=TaskStatus.COMPLETED)
+    done = [
+        Task(id=f"t{i}", description="x", type=TaskType.IMPLEMENT, parent_id="root", status=TaskStatus.COMPLETED)
+        for i in range(n)
+    ]
+    queued = Task(id="next", description="x", type=TaskType.IMPLEMENT, parent_id="root")
+    results: dict[str, ModelResponse] = {"root": DecomposedResponse(subtasks=[*done, queued])}
+    results.update((t.id, ImplementedResponse(content=f"code of {t.id}")) for t in done)
+    return Project(
+        rootTask=root,
+        failedTasks=[],
+        completedTasks=[root, *done],
+        inProgressTasks=[],
+        queuedTasks=[queued],
+        taskResults=results,
+        latestResponse=results[done[-1].id],
+    )
+
+
+def test_results_are_validated_on_first_access(tmp_path):
+    project = build_project()
+    snapshot = save_project_state(project, tmp_path)
+
+    loaded = load_project_state(snapshot)
+    results = loaded.taskResults
+    assert isinstance(results, LazyResults)
+    assert results.pending == 3  # the latest response was needed right away
+    assert loaded.latestResponse is results["t2"]
+
+    assert results["t0"].content == "code of t0"
+    assert results.pending == 2
+    assert results["root"].subtasks[-1] is loaded.queuedTasks[0]
+    assert list(results) == list(project.taskResults)
+
+    # results never read are written back as they were stored
+    assert normalize(loaded) == normalize(project)
+    assert results.pending == 1
+    assert loaded == project and load_project_state(snapshot, lazy=False) == project
+
+
+def test_copies_and_dumps_look_like_a_plain_dict(tmp_path):
+    project = build_project()
+    legacy = tmp_path / "20200101000000.json"
+    legacy.write_text(json.dumps(project.model_dump(mode="json")))
+    loaded = load_project_state(legacy)
+    assert isinstance(loaded.taskResults, LazyResults) and loaded.taskResults.pending == 4
+
+    copied = loaded.model_copy(deep=True)
+    assert copied.taskResults.pending == 4
+    assert list(copied.taskResults) == list(project.taskResults)
+    assert copied.model_dump() == project.model_dump()
+    assert copied == loaded and copied.taskResults.pending == loaded.taskResults.pending == 4
+    assert dict(loaded.taskResults) == project.taskResults
+
+    loaded.taskResults["t1"] = ImplementedResponse(content="rewritten")
+    assert loaded.taskResults.stored("t1") is None
+    assert copied.taskResults["t1"].content == "code of t1"
+
+
+def test_store_loads_results_on_demand(tmp_path):
+    project = build_project()
+    store = SQLiteProjectStore(tmp_path / "project.db")
+    store.save(project)
+
+    loaded = store.load()
+    assert isinstance(loaded.taskResults, LazyResults) and loaded.taskResults.pending == 3
+    # saving a project that was never read copies the stored results unchanged
+    store.save(copy.deepcopy(loaded))
+    assert store.load(lazy=False) == project
+    store.close()
+
+
+def test_store_reads_result_bodies_when_they_are_read(tmp_path):
+    project = build_project()
+    path = tmp_path / "project.db"
+    store = SQLiteProjectStore(path)
+    store.save(project)
+
+    loaded = store.load()
+    results = loaded.taskResults
+    reads = []
+    read = results.read
+    results.read = lambda task_id: reads.append(task_id) or read(task_id)
+    assert results.pending == 3
+    # dumps and comparisons go through the stored bodies and keep nothing
+    assert loaded.model_dump(mode="json") == project.model_dump(mode="json")
+    assert loaded == project
+    assert results.pending == 3
+
+    reads.clear()
+    assert results["t0"].content == "code of t0"
+    assert reads == ["t0"] and results.pending == 2
+    # the first checkpoint of a resumed run leaves the unread rows alone
+    store.save(loaded)
+    store.close()
+    assert results["t1"].content == "code of t1"
+    assert SQLiteProjectStore(path).load(lazy=False) == project
+
+
+def test_stores_from_before_the_kind_column_are_migrated(tmp_path):
+    path = tmp_path / "project.db"
+    store = SQLiteProjectStore(path)
+    store.save(build_project())
+    store.close()
+    with sqlite3.connect(path) as db:
+        db.executescript(
+            """
+            CREATE TABLE old (task_id TEXT PRIMARY KEY, body TEXT NOT NULL);
+            INSERT INTO old SELECT task_id, body FROM results;
+            INSERT INTO old VALUES ('spilled', '{"blob":"abc"}');
+            DROP TABLE results;
+            ALTER TABLE old RENAME TO results;
+            """
+        )
+    results = SQLiteProjectStore(path).load().taskResults
+    assert results.stored("spilled") == {"blob": "abc"}
+    assert results["t0"].content == "code of t0"
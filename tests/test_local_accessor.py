@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import orchestrator
+from src.dataModel.model import AccessorType
+from src.dataModel.model_response import FailedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.local_accessor import AsyncLocalAccessor, LocalAccessor
+from src.modelAccessors.registry import ACCESSOR_REGISTRY
+
+
+class StandInServer(ThreadingHTTPServer):
+    """A tiny OpenAI-compatible server echoing each prompt back as the response."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests: list[dict] = []
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+def _answer(prompt: str) -> str:
+    if prompt.startswith("bad"):
+        return "not json"
+    if prompt.startswith("{"):
+        return prompt
+    return json.dumps({"response_type": "implemented", "content": prompt})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append({"path": self.path, **body})
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+
+        if self.path.endswith("/completions") and "prompt" in body:
+            prompts = body["prompt"]
+            choices = [{"index": i, "text": _answer(p), "finish_reason": "stop"} for i, p in enumerate(prompts)]
+            self._json({"id": "c", "object": "text_completion", "created": 0, "model": body["model"],
+                        "choices": list(reversed(choices))})
+        elif body.get("stream"):
+            content = _answer(body["messages"][-1]["content"])
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(content), 7):
+                delta = {"index": 0, "delta": {"content": content[i : i + 7]}, "finish_reason": None}
+                chunk = {"id": "s", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [delta]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+        else:
+            message = {"role": "assistant", "content": _answer(body["messages"][-1]["content"])}
+            self._json({"id": "c", "object": "chat.completion", "created": 0, "model": body["model"],
+                        "choices": [{"index": 0, "message": message, "finish_reason": "stop"}]})
+
+    def _json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    srv = StandInServer(delay=0.02)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_concurrency_cap_and_keep_alive(server):
+    acc = LocalAccessor(base_url=server.url, max_concurrency=2)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: acc.prompt_model("m", "sys", f"p{i}"), range(16)))
+    assert results == [ImplementedResponse(content=f"p{i}") for i in range(16)]
+    assert server.peak <= 2
+    # every request went over one of the two pooled connections
+    assert server.connections <= 2
+    assert {r["model"] for r in server.requests} == {"m"}
+
+
+def test_batch_is_one_request(server):
+    acc = LocalAccessor(base_url=server.url, batch=True)
+    results = acc.prompt_model_batch("m", [("", "a"), ("sys", "b"), ("", "bad c")])
+    assert results[:2] == [ImplementedResponse(content="a"), ImplementedResponse(content="sys\n\nb")]
+    assert isinstance(results[2], FailedResponse)
+    assert [r["prompt"] for r in server.requests] == [["a", "sys\n\nb", "bad c"]]
+    assert acc.call_model_batch(["d", "e"], None) == [ImplementedResponse(content="d"), ImplementedResponse(content="e")]
+    assert server.requests[-1]["prompt"] == ["d", "e"]
+    del server.requests[1:]
+
+    unbatched = LocalAccessor(base_url=server.url, max_concurrency=2, batch=False)
+    assert unbatched.prompt_model_batch("m", [("", "x"), ("", "y")]) == [
+        ImplementedResponse(content="x"),
+        ImplementedResponse(content="y"),
+    ]
+    assert all("messages" in r for r in server.requests[1:])
+
+
+def test_async_accessor_caps_and_streams(server):
+    subtask = Task(id="s", description="d", type=TaskType.IMPLEMENT)
+    document = json.dumps({"response_type": "decomposed", "subtasks": [subtask.model_dump(mode="json")]})
+    seen = []
+
+    async def main():
+        acc = AsyncLocalAccessor(base_url=server.url, max_concurrency=3, model="m")
+        results = await asyncio.gather(*(acc.prompt_model("m", "", f"p{i}") for i in range(9)))
+        # the stand-in answers a JSON prompt with the prompt itself
+        streamed = await acc.stream_call_model(document, None, seen.append)
+        return results, streamed
+
+    results, streamed = asyncio.run(main())
+    assert results == [ImplementedResponse(content=f"p{i}") for i in range(9)]
+    assert server.peak <= 3
+    assert [t.id for t in seen] == ["s"]
+    assert streamed.subtasks == seen
+
+
+def test_orchestrators_build_local_accessors(monkeypatch):
+    monkeypatch.setenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:9/v1")
+    monkeypatch.setenv("LOCAL_LLM_CONCURRENCY", "3")
+    ACCESSOR_REGISTRY.clear()
+    try:
+        acc = orchestrator.AgentOrchestrator()._get_accessor(AccessorType.LOCAL)
+        assert isinstance(acc, LocalAccessor)
+        assert (acc.base_url, acc.max_concurrency, acc.batch) == ("http://127.0.0.1:9/v1", 3, False)
+        assert acc._limits.max_connections == 3
+    finally:
+        ACCESSOR_REGISTRY.clear()
+    assert isinstance(orchestrator.AsyncAgentOrchestrator()._get_accessor(AccessorType.LOCAL), AsyncLocalAccessor)
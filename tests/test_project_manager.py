@@ -2,10 +2,13 @@ import time
 
 from src.dataModel import Task, TaskType
 from src.dataModel.project import Project
+from src.dataManagement.journal import journal_path
 from src.dataManagement.project_manager import (
+    MANIFEST,
     save_project_state,
     load_project_state,
     latest_snapshot_path,
+    prune_snapshots,
 )
 
 
@@ -75,3 +78,34 @@ def test_latest_snapshot_path(tmp_path):
     project.completedTasks.append(project.rootTask)
     snap2 = save_project_state(project, tmp_path)
     assert latest_snapshot_path(tmp_path) == snap2
+
+
+def test_latest_snapshot_comes_from_the_manifest(tmp_path):
+    first = save_project_state(build_project(), tmp_path)
+    assert (tmp_path / MANIFEST).exists()
+    # a stray file with a newer stamp would win a directory scan
+    (tmp_path / "29991231235959999-stray.json").write_text("{}")
+    assert latest_snapshot_path(tmp_path) == first
+    second = save_project_state(build_project(), tmp_path)
+    assert latest_snapshot_path(tmp_path) == second
+
+    (tmp_path / MANIFEST).unlink()
+    assert latest_snapshot_path(tmp_path).name == "29991231235959999-stray.json"
+
+
+def test_prune_keeps_the_last_and_every_kth_snapshot(tmp_path):
+    paths = [save_project_state(build_empty_project(), tmp_path) for _ in range(10)]
+    for path in paths:
+        journal_path(path).write_text("")
+    legacy = tmp_path / "20200101000000.json"
+    legacy.write_text("{}")
+
+    deleted = prune_snapshots(tmp_path, keep_last=3, keep_every=4)
+
+    kept = [4, 8, 9, 10]
+    assert sorted(tmp_path.glob("*.json")) == sorted([legacy] + [paths[n - 1] for n in kept])
+    assert sorted(deleted) == sorted(p for n, p in enumerate(paths, 1) if n not in kept)
+    assert not any(journal_path(p).exists() for p in deleted)
+    assert latest_snapshot_path(tmp_path) == paths[-1]
+    # numbering goes on where it left off
+    assert save_project_state(build_empty_project(), tmp_path).name.split("-")[1] == "000011"
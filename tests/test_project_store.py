@@ -0,0 +1,132 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src import orchestrator
+from src.dataManagement.project_store import SQLiteProjectStore, open_project_store
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.model_response import DecomposedResponse, FailedResponse, ImplementedResponse
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+@pytest.fixture
+def rules(write_rules):
+    return write_rules(REQUIREMENTS={"HLD": 2}, HLD={"IMPLEMENT": 2})
+
+
+def build_project() -> Project:
+    root = Task(id="root", description="r", type=TaskType.HLD)
+    return Project(rootTask=root, failedTasks=[], completedTasks=[], inProgressTasks=[], queuedTasks=[root])
+
+
+def test_transitions_are_applied_in_place_and_queryable(tmp_path):
+    store = TaskStore(build_project(), track_changes=True)
+    db = SQLiteProjectStore(tmp_path / "project.db")
+    db.save(store.sync())
+    store.drain_changes()
+
+    root = store.get("root")
+    assert root is not None
+    a, b = (Task(id=name, description=name, type=TaskType.LLD, parent_id="root") for name in "ab")
+    store.set_status(root, TaskStatus.IN_PROGRESS)
+    store.set_result("root", DecomposedResponse(subtasks=[a, b]))
+    store.set_status(root, TaskStatus.COMPLETED)
+    store.add([a, b])
+    leaves = [
+        Task(id=f"{p.id}{i}", description="x", type=TaskType.IMPLEMENT, parent_id=p.id) for p in (a, b) for i in range(2)
+    ]
+    store.add(leaves)
+    db.append(store.drain_changes())
+
+    for task in leaves[:3]:
+        store.set_status(task, TaskStatus.FAILED)
+        store.set_result(task.id, FailedResponse(error_message="boom"))
+    store.set_description(leaves[3], "x\nanswered")
+    db.append(store.drain_changes())
+
+    assert db.load() == store.sync()
+    assert [t.id for t in db.find(status=TaskStatus.FAILED, type=TaskType.IMPLEMENT, under="a")] == ["a0", "a1"]
+    assert [t.id for t in db.find(status=TaskStatus.FAILED, under="root")] == ["a0", "a1", "b0"]
+    assert [t.id for t in db.find(type=TaskType.LLD)] == ["a", "b"]
+    assert len(db) == 7
+    db.close()
+
+    # the decomposed result points at the stored subtasks, not copies of them
+    loaded = SQLiteProjectStore(tmp_path / "project.db").load()
+    assert loaded.taskResults["root"].subtasks[0] is loaded.queuedTasks[0]
+
+
+def _open_files(path):
+    fds = Path("/proc/self/fd")
+    return [fd for fd in fds.iterdir() if fd.resolve() == path.resolve()]
+
+
+@pytest.mark.skipif(not Path("/proc/self/fd").is_dir(), reason="lists open files through /proc")
+def test_reading_results_keeps_no_connection_open(tmp_path):
+    store = TaskStore(build_project())
+    store.set_result("root", ImplementedResponse(content="done"))
+    db = SQLiteProjectStore(tmp_path / "project.db")
+    db.save(store.sync())
+    loaded = db.load()
+    db.close()
+
+    assert loaded.taskResults["root"].content == "done"
+    assert _open_files(tmp_path / "project.db") == []
+
+
+def test_store_is_picked_by_url(tmp_path):
+    assert open_project_store(tmp_path / "runs") is None
+    store = open_project_store(f"sqlite:///{tmp_path}/p.db")
+    assert isinstance(store, SQLiteProjectStore) and store.path == tmp_path / "p.db"
+    store.close()
+    with pytest.raises(ValueError):
+        open_project_store("redis://localhost/0")
+    with pytest.raises(FileNotFoundError):
+        SQLiteProjectStore(tmp_path / "empty.db").load()
+
+
+def _node_map(fail_once):
+    def requirements(task, config=None):
+        return DecomposedResponse(subtasks=[Task(id="design", description="d", type=TaskType.HLD)]).model_dump()
+
+    def hld(task, config=None):
+        subtasks = [Task(id=f"part{i}", description=f"p{i}", type=TaskType.IMPLEMENT) for i in range(2)]
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    def implement(task, config=None):
+        if task.id in fail_once:
+            fail_once.remove(task.id)
+            raise KeyboardInterrupt
+        return ImplementedResponse(content=task.id).model_dump()
+
+    return {
+        TaskType.REQUIREMENTS: lambda acc: requirements,
+        TaskType.HLD: lambda acc: hld,
+        TaskType.IMPLEMENT: lambda acc: implement,
+    }
+
+
+def test_orchestrator_runs_and_resumes_from_a_store(tmp_path, use_nodes, rules):
+    use_nodes(_node_map(set()))
+    url = f"sqlite:///{tmp_path}/project.db"
+
+    project = orchestrator.AgentOrchestrator(config_path=rules).implement_project(
+        "build", checkpoint_dir=f"sqlite:///{tmp_path}/complete.db"
+    )
+    assert SQLiteProjectStore(tmp_path / "complete.db").load() == project
+    assert [t.id for t in project.completedTasks] == ["root-task", "design", "part0", "part1"]
+
+    use_nodes(_node_map({"part1"}))
+    with pytest.raises(KeyboardInterrupt):
+        orchestrator.AgentOrchestrator(config_path=rules).implement_project("build", checkpoint_dir=url)
+    interrupted = SQLiteProjectStore(tmp_path / "project.db").load()
+    assert {t.id for t in interrupted.completedTasks} == {"root-task", "design", "part0"}
+    assert [t.id for t in interrupted.queuedTasks] == ["part1"]
+
+    orch = orchestrator.AsyncAgentOrchestrator(config_path=rules)
+    project = asyncio.run(orch.resume_project(url))
+    assert [t.id for t in project.completedTasks][-1] == "part1"
+    assert SQLiteProjectStore(tmp_path / "project.db").load() == project
+    assert not (tmp_path / "LATEST").exists()
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.modelAccessors.anthropic_accessor import AnthropicAccessor, AsyncAnthropicAccessor
+from src.modelAccessors.local_accessor import AsyncLocalAccessor, LocalAccessor
+from src.modelAccessors.mock_accessor import MockAccessor
+from src.modelAccessors.openai_accessor import AsyncOpenAIAccessor, OpenAIAccessor
+from src.modelAccessors.rate_limiter import (
+    RATE_LIMITERS,
+    RateLimiter,
+    RateLimits,
+    TokenBucket,
+    retry_after,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    RATE_LIMITERS.clear()
+    yield
+    RATE_LIMITERS.clear()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None) -> None:
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_token_bucket_refills_per_minute():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 30
+    assert bucket.wait_time(30) == 0
+    # requests larger than the bucket only wait for a full bucket
+    assert bucket.wait_time(1000) == pytest.approx(30.0)
+
+
+def test_retry_after_headers():
+    assert retry_after(Throttled({"retry-after": "2"})) == 2.0
+    assert retry_after(Throttled({"retry-after-ms": "250"})) == 0.25
+    assert retry_after(Throttled({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) is None
+    assert retry_after(ValueError()) is None
+
+
+def test_aimd_concurrency():
+    clock = FakeClock()
+    limiter = RateLimiter(RateLimits(max_concurrency=8, min_concurrency=2), clock)
+    for _ in range(4):
+        limiter.acquire()
+    limiter.throttle(5)
+    limiter.throttle(5)  # same pause: cut only once
+    assert limiter.limit == 4
+    limiter.throttle(None)
+    assert limiter.limit == 4
+    clock.now = 6
+    limiter.throttle(0)
+    limiter.throttle(0)
+    assert limiter.limit == 2  # never below min_concurrency
+    for _ in range(4):
+        limiter.release()
+    assert 3 < limiter.limit < 4
+
+
+def test_throttled_calls_pause_and_retry():
+    limiter = RateLimiter(RateLimits(default_retry_after=0.05))
+    attempts = []
+
+    def flaky():
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            raise Throttled({"retry-after-ms": "50"} if len(attempts) == 1 else None)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.04
+    assert limiter.throttled == 2
+    assert limiter.in_flight == 0
+
+    with pytest.raises(Throttled):
+        RateLimiter(RateLimits(throttle_retries=0)).call(lambda: (_ for _ in ()).throw(Throttled()))
+    with pytest.raises(ValueError):
+        limiter.call(lambda: int("x"))
+    assert limiter.in_flight == 0
+
+
+def test_streams_hold_their_slot_until_read():
+    limiter = RateLimiter(RateLimits(default_retry_after=0.01))
+    opened = []
+
+    def open_stream():
+        opened.append(1)
+        if len(opened) == 1:
+            raise Throttled()
+        return iter("abc")
+
+    seen = []
+    for item in limiter.stream(open_stream):
+        seen.append((item, limiter.in_flight))
+    assert seen == [("a", 1), ("b", 1), ("c", 1)]
+    assert limiter.in_flight == 0 and limiter.throttled == 1
+
+    async def main():
+        async def open_async():
+            async def items():
+                yield "x"
+                yield "y"
+
+            return items()
+
+        return [(item, limiter.in_flight) async for item in limiter.astream(open_async)]
+
+    assert asyncio.run(main()) == [("x", 1), ("y", 1)]
+    # a stream abandoned half way gives its slot back too
+    partial = limiter.stream(lambda: iter("abc"))
+    next(partial)
+    partial.close()
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_limit_is_shared_by_threads():
+    limiter = RateLimiter(RateLimits(max_concurrency=2))
+    peak = 0
+    active = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal peak, active
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+
+def test_async_calls_are_limited():
+    limiter = RateLimiter(RateLimits(requests_per_minute=600))  # one every 0.1s once the bucket is empty
+    limiter._buckets[0][0].take(600)
+
+    async def main():
+        start = time.perf_counter()
+
+        async def ping():
+            return time.perf_counter() - start
+
+        return await asyncio.gather(*(limiter.acall(ping) for _ in range(3)))
+
+    times = sorted(asyncio.run(main()))
+    assert times[-1] >= 0.25
+
+
+def test_registry_applies_provider_and_model_limits():
+    RATE_LIMITERS.configure("mock", RateLimits(requests_per_minute=10))
+    RATE_LIMITERS.configure("mock", RateLimits(requests_per_minute=5), model="small")
+    assert RATE_LIMITERS.get("mock", "big").limits.requests_per_minute == 10
+    assert RATE_LIMITERS.get("mock", "small").limits.requests_per_minute == 5
+    assert RATE_LIMITERS.get("other", "big").limits == RateLimits()
+    assert RATE_LIMITERS.get("mock", "big") is RATE_LIMITERS.get("mock", "big")
+
+    calls = []
+    accessor = MockAccessor()
+    assert accessor._rate_limited("big", lambda: calls.append(1) or "done", "prompt") == "done"
+    assert RATE_LIMITERS.get("mock", "big").in_flight == 0
+
+
+def test_provider_clients_leave_throttling_to_the_limiter(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    accessors = (OpenAIAccessor, AsyncOpenAIAccessor, AnthropicAccessor, AsyncAnthropicAccessor)
+    for accessor in (*accessors, LocalAccessor, AsyncLocalAccessor):
+        # the SDKs would otherwise retry a 429 before the limiter saw it
+        assert accessor().client.max_retries == 0
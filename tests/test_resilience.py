@@ -0,0 +1,255 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import pairwise
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+from pydantic import ValidationError
+
+from src.dataModel.model_response import FailedResponse, ImplementedResponse
+from src.modelAccessors import gemini_accessor
+from src.modelAccessors.anthropic_accessor import AnthropicAccessor
+from src.modelAccessors.base_accessor import Tool
+from src.modelAccessors.openai_accessor import APITimeoutError, AsyncOpenAIAccessor, OpenAIAccessor
+from src.modelAccessors.rate_limiter import RATE_LIMITERS, RateLimits
+from src.modelAccessors.resilience import CallPolicy, CallStats, ResilientCall
+
+FAST = {"backoff_base": 0.001, "backoff_max": 0.001}
+
+
+def test_retries_honor_retryable_flag():
+    stats = CallStats()
+    outcomes = [
+        TimeoutError("slow"),
+        FailedResponse(error_message="overloaded", retryable=True),
+        ImplementedResponse(content="ok"),
+    ]
+    result = ResilientCall(CallPolicy(max_attempts=3, **FAST), stats).run(lambda timeout: _next(outcomes))
+    assert result == ImplementedResponse(content="ok")
+    assert stats.as_dict() == {
+        "calls": 1, "attempts": 3, "retries": 2, "timeouts": 1, "hedges": 0, "hedge_wins": 0, "failures": 0,
+    }
+
+    final = FailedResponse(error_message="bad request")
+    assert ResilientCall(CallPolicy(max_attempts=3), stats).run(lambda timeout: final) is final
+    with pytest.raises(ValueError):
+        ResilientCall(CallPolicy(max_attempts=3), stats).run(lambda timeout: int("x"))
+    with pytest.raises(TimeoutError):
+        ResilientCall(CallPolicy(max_attempts=2, **FAST), stats).run(lambda timeout: _next([TimeoutError()] * 2))
+    assert stats.failures == 3
+    assert stats.attempts == 7
+
+
+def test_deadline_bounds_attempt_timeouts_and_retries():
+    seen = []
+
+    def attempt(timeout):
+        seen.append(timeout)
+        time.sleep(0.03)
+        raise TimeoutError
+
+    stats = CallStats()
+    policy = CallPolicy(timeout=10, deadline=0.1, max_attempts=100, backoff_base=0.01, backoff_max=0.01)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        ResilientCall(policy, stats).run(attempt)
+    assert time.monotonic() - start < 0.2
+    assert seen[0] == pytest.approx(0.1, abs=0.01)
+    assert all(later < earlier for earlier, later in pairwise(seen))
+    assert 2 <= stats.attempts < 6
+
+
+def test_sync_hedge_takes_the_faster_answer():
+    stats = CallStats()
+    for _ in range(5):
+        stats.observe(0.01)
+    calls = []
+    release = threading.Event()
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(1)  # the first request stalls
+            return ImplementedResponse(content="slow")
+        return ImplementedResponse(content="fast")
+
+    policy = CallPolicy(hedge=True, hedge_min_samples=5)
+    start = time.monotonic()
+    assert ResilientCall(policy, stats).run(attempt) == ImplementedResponse(content="fast")
+    assert time.monotonic() - start < 0.5
+    release.set()
+    assert (stats.hedges, stats.hedge_wins) == (1, 1)
+
+
+def test_sync_hedges_do_not_cap_concurrent_calls():
+    stats = CallStats()
+    for _ in range(5):
+        stats.observe(1.0)
+    callers = 40
+    # every attempt waits until all of them are in flight at once
+    everyone = threading.Barrier(callers, timeout=5)
+
+    def attempt(timeout):
+        everyone.wait()
+        return ImplementedResponse(content="ok")
+
+    results = []
+    policy = CallPolicy(hedge=True, hedge_min_samples=5)
+    threads = [
+        threading.Thread(target=lambda: results.append(ResilientCall(policy, stats).run(attempt)))
+        for _ in range(callers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == callers
+    assert stats.hedges == 0
+
+
+def test_async_hedge_cancels_the_loser():
+    stats = CallStats()
+    for _ in range(5):
+        stats.observe(0.01)
+    cancelled = []
+
+    async def attempt(timeout):
+        if not cancelled:
+            cancelled.append(False)
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled[0] = True
+                raise
+        return ImplementedResponse(content="hedged")
+
+    async def main():
+        return await ResilientCall(CallPolicy(hedge=True, hedge_min_samples=5), stats).arun(attempt)
+
+    assert asyncio.run(main()) == ImplementedResponse(content="hedged")
+    assert cancelled == [True]
+    assert (stats.hedges, stats.hedge_wins) == (1, 1)
+    # no hedging before enough latencies were seen
+    assert ResilientCall(CallPolicy(hedge=True), CallStats())._hedge_delay() is None
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_openai_accessor_retries_sdk_timeouts(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    acc = OpenAIAccessor(call_policy=CallPolicy(timeout=5, max_attempts=2, **FAST))
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        if len(requests) == 1:
+            raise APITimeoutError(request=None)  # type: ignore[arg-type]
+        return _completion('{"response_type": "implemented", "content": "done"}')
+
+    acc.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))  # type: ignore[assignment]
+    assert acc.prompt_model("gpt-4", "system", "user") == ImplementedResponse(content="done")
+    assert [r["timeout"] for r in requests] == [5, 5]
+    assert acc.stats.as_dict()["timeouts"] == 1
+    assert acc.stats.as_dict()["retries"] == 1
+
+
+def test_async_openai_accessor_retries_retryable_responses(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    acc = AsyncOpenAIAccessor(call_policy=CallPolicy(max_attempts=3, **FAST))
+    bodies = [
+        '{"response_type": "failed", "error_message": "busy", "retryable": true}',
+        '{"response_type": "implemented", "content": "done"}',
+    ]
+
+    async def create(**kwargs):
+        assert "timeout" not in kwargs  # the client's own default applies
+        return _completion(bodies.pop(0))
+
+    acc.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))  # type: ignore[assignment]
+    assert asyncio.run(acc.prompt_model("gpt-4", "s", "u")) == ImplementedResponse(content="done")
+    assert acc.stats.retries == 1
+
+
+def test_gemini_tool_calls_are_retried(monkeypatch):
+    requests = []
+    replies = [
+        ServiceUnavailable("busy"),
+        SimpleNamespace(text='{"response_type": "implemented", "content": "done"}'),
+        SimpleNamespace(text="Sure, here is the plan."),
+    ]
+
+    class Model:
+        def __init__(self, name):
+            pass
+
+        def generate_content(self, prompt, **kwargs):
+            requests.append(kwargs)
+            return _next(replies)
+
+    monkeypatch.setattr(gemini_accessor.genai, "GenerativeModel", Model)
+    acc = gemini_accessor.GeminiAccessor(call_policy=CallPolicy(timeout=5, max_attempts=2, **FAST))
+    tools = [Tool(name="search", description="web search", parameters={"q": {"type": "string"}})]
+    done = acc.execute_task_with_tools("gemini-pro", "system", "user", tools)
+    assert done == ImplementedResponse(content="done")
+    assert [r["request_options"] for r in requests] == [{"timeout": 5}] * 2
+    assert requests[0]["tools"][0]["function_declarations"][0]["name"] == "search"
+    assert acc.stats.retries == 1
+    # a reply that is not JSON is not a response; the old {"text": ...} wrapper did not validate either
+    with pytest.raises(ValidationError):
+        acc.execute_task_with_tools("gemini-pro", "system", "user", tools)
+
+
+def _next(outcomes):
+    outcome = outcomes.pop(0)
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
+
+class _Failing(BaseHTTPRequestHandler):
+    """Answers every request with the server's ``status``."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1  # type: ignore[attr-defined]
+        body = b'{"error": {"message": "no", "type": "error"}}'
+        self.send_response(self.server.status)  # type: ignore[attr-defined]
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.parametrize("accessor", [OpenAIAccessor, AnthropicAccessor])
+@pytest.mark.parametrize("status", [429, 503])
+def test_attempts_are_the_http_requests_made(monkeypatch, accessor, status):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Failing)
+    server.status, server.requests = status, 0  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{url}/v1")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", url)
+    RATE_LIMITERS.clear()
+    # 429s are retried by the rate limiter, 5xx by the call policy; never by the SDK
+    for provider in ("openai", "anthropic"):
+        RATE_LIMITERS.configure(provider, RateLimits(throttle_retries=2, default_retry_after=0))
+    try:
+        acc = accessor(call_policy=CallPolicy(max_attempts=3, **FAST))
+        with pytest.raises(Exception, match=str(status)):
+            acc.prompt_model("model", "system", "user")
+        assert server.requests == 3
+        assert acc.stats.attempts == (1 if status == 429 else 3)
+    finally:
+        RATE_LIMITERS.clear()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from src import orchestrator
+from src.dataModel.model_response import DecomposedResponse, FailedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskStatus, TaskType
+from src.orchestrator.retries import RetryPolicy, RetryQueue
+
+
+@pytest.fixture
+def rules(write_rules):
+    return write_rules(REQUIREMENTS={"IMPLEMENT": 4, "TEST": 1})
+
+
+def test_queue_orders_retries_by_due_time_and_spends_budgets(monkeypatch):
+    now = [0.0]
+    delays = iter([5.0, 1.0, 3.0])
+    monkeypatch.setattr(RetryPolicy, "delay", lambda self, retry: next(delays))
+    queue = RetryQueue(RetryPolicy(max_retries=1, budgets={TaskType.TEST: 0}), clock=lambda: now[0])
+
+    tasks = [Task(id=name, description=name, type=TaskType.IMPLEMENT) for name in "abc"]
+    assert [queue.schedule(task) for task in tasks] == [5.0, 1.0, 3.0]
+    assert queue.schedule(tasks[0]) is None  # its one retry is used up
+    assert queue.schedule(Task(id="t", description="t", type=TaskType.TEST)) is None
+    assert queue.wait_time() == 1.0
+
+    now[0] = 3.0
+    assert [task.id for task in queue.due()] == ["b", "c"]
+    assert queue.wait_time() == 2.0 and len(queue) == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(backoff_base=1, backoff_max=4)
+    assert all(0 <= policy.delay(n) <= min(4, 2**n) for n in range(6) for _ in range(20))
+
+
+def _node_map(calls, fail, events):
+    subtasks = [
+        Task(id="flaky", description="flaky", type=TaskType.IMPLEMENT),
+        Task(id="steady", description="steady", type=TaskType.IMPLEMENT),
+        Task(id="check", description="check", type=TaskType.TEST, depends_on=["flaky"]),
+    ]
+
+    def root(task, config=None):
+        return DecomposedResponse(subtasks=subtasks).model_dump()
+
+    def work(task, config=None):
+        calls[task.id] += 1
+        events.append(task.id)
+        if task.id in fail and calls[task.id] <= fail[task.id][0]:
+            error = fail[task.id][1]
+            if isinstance(error, Exception):
+                raise error
+            return error.model_dump()
+        time.sleep(0.05 if task.id == "steady" else 0)
+        events.append(f"{task.id} done")
+        return ImplementedResponse(content=task.id).model_dump()
+
+    return {
+        TaskType.REQUIREMENTS: lambda acc: root,
+        TaskType.IMPLEMENT: lambda acc: work,
+        TaskType.TEST: lambda acc: work,
+    }
+
+
+@pytest.fixture
+def quick_backoff(monkeypatch, no_snapshots):
+    monkeypatch.setattr(RetryPolicy, "delay", lambda self, retry: 0.01)
+
+
+def test_retryable_failures_are_retried_while_other_work_runs(tmp_path, quick_backoff, use_nodes, rules):
+    calls, events = Counter[str](), []
+    fail = {"flaky": (2, FailedResponse(error_message="overloaded", retryable=True))}
+    use_nodes(_node_map(calls, fail, events))
+
+    orch = orchestrator.AgentOrchestrator(
+        config_path=rules, max_parallel=2, retry_policy=RetryPolicy(max_retries=2)
+    )
+    project = orch.implement_project("build", checkpoint_dir=str(tmp_path))
+
+    assert calls == {"flaky": 3, "steady": 1, "check": 1}
+    assert not project.failedTasks
+    # the first retry did not wait for "steady", which was still in flight
+    assert events.index("flaky", 2) < events.index("steady done")
+
+
+@pytest.mark.parametrize(
+    ("error", "attempts"),
+    [(ConnectionError("reset"), 2), (ValueError("bad prompt"), 1)],
+)
+def test_only_transient_errors_are_retried_within_budget(tmp_path, quick_backoff, error, attempts, use_nodes, rules):
+    calls = Counter[str]()
+    fail = {"flaky": (9, error)}
+    use_nodes(_node_map(calls, fail, []))
+
+    policy = RetryPolicy(max_retries=5, budgets={TaskType.IMPLEMENT: 1})
+    orch = orchestrator.AgentOrchestrator(config_path=rules, retry_policy=policy)
+    project = orch.implement_project("build", checkpoint_dir=str(tmp_path))
+
+    assert calls["flaky"] == attempts
+    assert [(t.id, t.status) for t in project.failedTasks] == [
+        ("flaky", TaskStatus.FAILED),
+        ("check", TaskStatus.BLOCKED),
+    ]
+
+
+def test_async_orchestrator_retries(tmp_path, quick_backoff, use_nodes, rules):
+    calls, events = Counter[str](), []
+    fail = {"flaky": (1, TimeoutError("slow"))}
+    use_nodes(_node_map(calls, fail, events))
+
+    orch = orchestrator.AsyncAgentOrchestrator(
+        config_path=rules, max_parallel=2, retry_policy=RetryPolicy(max_retries=1)
+    )
+    project = asyncio.run(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+
+    assert calls == {"flaky": 2, "steady": 1, "check": 1}
+    assert len(project.completedTasks) == 4
+    assert events.index("flaky", 2) < events.index("steady done")
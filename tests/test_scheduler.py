@@ -0,0 +1,99 @@
+import pytest
+
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+from src.orchestrator.scheduler import SchedulingPolicy, TaskScheduler
+
+
+def build_store(queued: list[Task]) -> TaskStore:
+    root = Task(id="root", description="root", type=TaskType.HLD, status=TaskStatus.COMPLETED)
+    return TaskStore(
+        Project(
+            rootTask=root,
+            failedTasks=[],
+            completedTasks=[root],
+            inProgressTasks=[],
+            queuedTasks=queued,
+        )
+    )
+
+
+def task(task_id: str, *, complexity: int = 1, depends_on: list[str] | None = None, parent: str = "root") -> Task:
+    return Task(
+        id=task_id,
+        description=task_id,
+        type=TaskType.IMPLEMENT,
+        complexity=complexity,
+        depends_on=depends_on or [],
+        parent_id=parent,
+    )
+
+
+def drain(scheduler: TaskScheduler) -> list[str]:
+    order = []
+    while (nxt := scheduler.next_ready()) is not None:
+        scheduler.store.set_status(nxt, TaskStatus.COMPLETED)
+        scheduler.record(nxt)
+        order.append(nxt.id)
+    return order
+
+
+def test_fifo_keeps_enqueue_order():
+    scheduler = TaskScheduler(build_store([task("a"), task("b", complexity=5), task("c")]))
+    assert drain(scheduler) == ["a", "b", "c"]
+
+
+def test_complexity_first():
+    project = build_store([task("a"), task("b", complexity=5), task("c", complexity=3)])
+    scheduler = TaskScheduler(project, SchedulingPolicy.COMPLEXITY)
+    assert drain(scheduler) == ["b", "c", "a"]
+
+
+def test_depth_first_prefers_deeper_tasks():
+    scheduler = TaskScheduler(build_store([task("a"), task("b")]), SchedulingPolicy.DEPTH_FIRST)
+    first = scheduler.next_ready()
+    assert first is not None and first.id == "a"
+    scheduler.store.set_status(first, TaskStatus.COMPLETED)
+    scheduler.record(first)
+    scheduler.push(scheduler.store.add([task("a1", parent="a"), task("a2", parent="a")]))
+    assert drain(scheduler) == ["a1", "a2", "b"]
+
+
+def test_critical_path_starts_long_chains_first():
+    queued = [
+        task("short", complexity=3),
+        task("head", complexity=1),
+        task("mid", complexity=2, depends_on=["head"]),
+        task("tail", complexity=2, depends_on=["mid"]),
+    ]
+    scheduler = TaskScheduler(build_store(queued), SchedulingPolicy.CRITICAL_PATH)
+    assert drain(scheduler) == ["head", "mid", "short", "tail"]
+
+
+@pytest.mark.parametrize("policy", list(SchedulingPolicy))
+def test_waiting_tasks_released_when_dependency_completes(policy):
+    scheduler = TaskScheduler(build_store([task("b", depends_on=["a"]), task("a")]), policy)
+    assert drain(scheduler) == ["a", "b"]
+    assert len(scheduler) == 0
+
+
+def test_failure_cascades_to_dependents():
+    queued = [task("a"), task("b", depends_on=["a"]), task("c", depends_on=["b"]), task("d")]
+    scheduler = TaskScheduler(build_store(queued))
+    first = scheduler.next_ready()
+    assert first is not None
+    scheduler.store.set_status(first, TaskStatus.FAILED)
+    scheduler.record(first)
+
+    assert [t.id for t in scheduler.unrunnable()] == ["b", "c"]
+    project = scheduler.store.sync()
+    assert [t.id for t in project.queuedTasks] == ["d"]
+    assert [t.id for t in project.failedTasks] == ["a", "b", "c"]
+
+
+def test_idle_blocks_remaining_tasks():
+    scheduler = TaskScheduler(build_store([task("a", depends_on=["missing"])]))
+    assert scheduler.next_ready() is None
+    assert [t.id for t in scheduler.unrunnable(idle=True)] == ["a"]
+    assert len(scheduler) == 0
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskType
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+from src.modelAccessors.single_flight import (
+    AsyncSingleFlight,
+    AsyncSingleFlightAccessor,
+    SingleFlight,
+    SingleFlightAccessor,
+)
+
+
+class SlowAccessor(MockAccessor):
+    def __init__(self, release: threading.Event) -> None:
+        super().__init__()
+        self.release = release
+        self.calls = 0
+
+    def prompt_model(self, model, system_prompt, user_prompt):
+        self.calls += 1
+        self.release.wait(5)
+        if user_prompt == "boom":
+            raise TimeoutError("provider timed out")
+        return DecomposedResponse(subtasks=[Task(id="t", description=user_prompt, type=TaskType.TEST)])
+
+
+def _concurrently(n, fn):
+    results = [None] * n
+
+    def run(i):
+        try:
+            results[i] = fn()
+        except Exception as exc:  # noqa: BLE001
+            results[i] = exc
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_requests_to_different_models_are_not_merged():
+    release = threading.Event()
+    small, large = SlowAccessor(release), SlowAccessor(release)
+    small.model, large.model = "small", "large"  # type: ignore[attr-defined]
+    flight = SingleFlight()
+    threads, _ = _concurrently(1, lambda: SingleFlightAccessor(small, flight, "local").call_model("p", None))
+    other, _ = _concurrently(1, lambda: SingleFlightAccessor(large, flight, "local").call_model("p", None))
+    while small.calls + large.calls < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads + other:
+        thread.join()
+    assert (small.calls, large.calls, flight.shared) == (1, 1, 0)
+
+
+def test_identical_concurrent_requests_share_one_call():
+    release = threading.Event()
+    inner = SlowAccessor(release)
+    flight = SingleFlight()
+    acc = SingleFlightAccessor(inner, flight, "mock")
+
+    threads, results = _concurrently(4, lambda: acc.prompt_model("m", "s", "dup"))
+    other, other_results = _concurrently(1, lambda: acc.prompt_model("m", "s", "different"))
+    while flight.shared < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads + other:
+        thread.join()
+
+    assert inner.calls == 2
+    assert flight.shared == 3
+    assert all(r == results[0] for r in results)
+    # every caller gets its own copy to mutate
+    assert len({id(r) for r in results}) == 4
+    assert len({id(r.subtasks[0]) for r in results}) == 4
+    assert other_results[0].subtasks[0].description == "different"
+
+    # nothing is kept once the call finished
+    acc.prompt_model("m", "s", "dup")
+    assert inner.calls == 3
+
+
+def test_followers_receive_the_leaders_error():
+    release = threading.Event()
+    inner = SlowAccessor(release)
+    flight = SingleFlight()
+    acc = SingleFlightAccessor(inner, flight, "mock")
+
+    threads, results = _concurrently(3, lambda: acc.prompt_model("m", "s", "boom"))
+    while flight.shared < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert inner.calls == 1
+    assert all(isinstance(r, TimeoutError) for r in results)
+
+
+def test_async_single_flight():
+    class Slow(AsyncMockAccessor):
+        calls = 0
+
+        async def prompt_model(self, model, system_prompt, user_prompt):
+            Slow.calls += 1
+            await asyncio.sleep(0.02)
+            if user_prompt == "boom":
+                raise TimeoutError("provider timed out")
+            return ImplementedResponse(content=user_prompt)
+
+    async def main():
+        flight = AsyncSingleFlight()
+        acc = AsyncSingleFlightAccessor(Slow(), flight, "mock")
+        same = await asyncio.gather(*(acc.prompt_model("m", "s", "dup") for _ in range(5)))
+        failed = await asyncio.gather(*(acc.prompt_model("m", "s", "boom") for _ in range(2)), return_exceptions=True)
+        return flight, same, failed
+
+    flight, same, failed = asyncio.run(main())
+    assert Slow.calls == 2
+    assert flight.shared == 5
+    assert same == [ImplementedResponse(content="dup")] * 5
+    assert all(isinstance(exc, TimeoutError) for exc in failed)
+
+
+def test_leader_cancellation_reaches_followers():
+    async def main():
+        flight = AsyncSingleFlight()
+        started = asyncio.Event()
+
+        async def call():
+            started.set()
+            await asyncio.sleep(10)
+
+        leader = asyncio.create_task(flight.do("k", call))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("k", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        # the key is free again
+        assert await flight.do("k", lambda: asyncio.sleep(0, "fresh")) == "fresh"
+
+    asyncio.run(main())
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from src import orchestrator
+from src.agentNodes.hld_designer import HLDDesigner
+from src.dataModel.model import AccessorType
+from src.dataModel.model_response import DecomposedResponse, ImplementedResponse
+from src.dataModel.task import Task, TaskStatus, TaskType
+from src.modelAccessors.caching_accessor import AsyncCachingAccessor, ResponseCache
+from src.modelAccessors.cassette_accessor import AsyncCassetteAccessor, Cassette
+from src.modelAccessors.mock_accessor import AsyncMockAccessor, MockAccessor
+from src.modelAccessors.single_flight import AsyncSingleFlightAccessor
+from src.modelAccessors.streaming import SubtaskStreamParser, acollect_stream, collect_stream
+from src.orchestrator import StreamingPolicy
+
+STREAM = StreamingPolicy(stream_subtasks=True)
+
+SUBTASKS = [
+    Task(id="a", description="first", type=TaskType.IMPLEMENT),
+    Task(id="t1", description="kept test", type=TaskType.TEST),
+    Task(id="t2", description="over the TEST limit", type=TaskType.TEST),
+    Task(id="b", description="needs a and t2", type=TaskType.IMPLEMENT, depends_on=["a", "t2"]),
+]
+
+
+def _pieces(subtasks):
+    """The JSON of a decomposition, one piece per subtask."""
+    yield '{"response_type": "decomposed", "content": "has \\"quotes\\" and {braces}", "subtasks": ['
+    for i, task in enumerate(subtasks):
+        yield ("," if i else "") + task.model_dump_json()
+    yield '], "artifacts": ["x"]}'
+
+
+def test_parser_yields_each_subtask_once_complete():
+    parser = SubtaskStreamParser()
+    seen = []
+    doc = "".join(_pieces(SUBTASKS))
+    for i, char in enumerate(doc):
+        for element in parser.feed(char):
+            seen.append((element["id"], i))
+    assert [tid for tid, _ in seen] == ["a", "t1", "t2", "b"]
+    # every subtask is available as soon as its closing brace arrived
+    for tid, position in seen:
+        assert doc[position] == "}"
+        assert doc.rindex(json.dumps(tid), 0, position) < position
+    assert parser.text == doc
+    assert SubtaskStreamParser().feed('{"content": "subtasks", "subtasks": [{"subtasks": [{"id": 1}]}]}') == [
+        {"subtasks": [{"id": 1}]}
+    ]
+
+
+def test_collect_stream_returns_the_emitted_tasks():
+    emitted = []
+    doc = "".join(_pieces(SUBTASKS))
+    response = collect_stream(iter([doc[:50], doc[50:]]), emitted.append)
+    assert isinstance(response, DecomposedResponse)
+    assert [t.id for t in emitted] == ["a", "t1", "t2", "b"]
+    assert all(a is b for a, b in zip(response.subtasks, emitted, strict=True))
+    assert response.content == 'has "quotes" and {braces}'
+
+
+class StreamingAccessor(MockAccessor):
+    """Streams SUBTASKS, holding the rest back until the first child has started."""
+
+    def __init__(self, child_started: threading.Event) -> None:
+        super().__init__()
+        self.child_started = child_started
+        self.overlapped = False
+
+    def stream_call_model(self, prompt, schema, on_subtask):
+        return collect_stream(self._chunks(), on_subtask)
+
+    def call_model(self, prompt, schema):
+        return DecomposedResponse(subtasks=[t.model_copy(deep=True) for t in SUBTASKS])
+
+    def _chunks(self):
+        pieces = list(_pieces([t.model_copy(deep=True) for t in SUBTASKS]))
+        yield from pieces[:2]
+        self.overlapped = self.child_started.wait(5)
+        yield from pieces[2:]
+
+
+@pytest.fixture
+def rules(write_rules):
+    return write_rules(REQUIREMENTS={"HLD": 1}, HLD={"IMPLEMENT": 5, "TEST": 1})
+
+
+@pytest.fixture
+def make_orchestrator(monkeypatch, rules, use_nodes, no_snapshots):
+    """Return a function building an orchestrator whose HLD node streams from ``accessor``.
+
+    With a ``provider`` the tasks run as that provider's, so the orchestrator
+    wraps ``accessor`` as it would a real client (MOCK accessors are never
+    wrapped).
+    """
+
+    def make(accessor, provider=None, **kwargs):
+        started = threading.Event()
+
+        def leaf(task, config=None):
+            if task.id == "a":
+                started.set()
+            return ImplementedResponse(content=task.id).model_dump()
+
+        node_map = {
+            TaskType.REQUIREMENTS: lambda acc: lambda task, config=None: ImplementedResponse().model_dump(),
+            TaskType.HLD: lambda acc: HLDDesigner(acc if provider else accessor(started)),
+            TaskType.IMPLEMENT: lambda acc: leaf,
+            TaskType.TEST: lambda acc: leaf,
+        }
+        use_nodes(node_map)
+        orch = orchestrator.AgentOrchestrator(config_path=rules, default_accessor_type=provider, **kwargs)
+        if provider:
+            shared = accessor(started)
+            monkeypatch.setattr(orch, "_get_accessor", lambda accessor_type: shared)
+        return orch
+
+    return make
+
+
+def _check(project):
+    hld = next(t for t in project.completedTasks if t.type is TaskType.HLD)
+    response = project.taskResults[hld.id]
+    assert isinstance(response, DecomposedResponse)
+    done = {t.id: t for t in project.completedTasks}
+    assert {"a", "t1", "b"} <= done.keys()
+    assert "t2" not in done
+    # the spawned tasks are the ones recorded in the parent's response
+    assert response.subtasks[0] is done["a"]
+    # b's dependency on the rejected TEST was dropped once the parent finished
+    assert done["b"].depends_on == ["a"]
+    assert not project.failedTasks and not project.queuedTasks
+
+
+def test_children_start_while_parent_streams(tmp_path, make_orchestrator):
+    accessors = []
+
+    def make(started):
+        accessors.append(StreamingAccessor(started))
+        return accessors[-1]
+
+    orch = make_orchestrator(make, max_parallel=3, streaming_policy=STREAM)
+    project = orch.implement_project("build", checkpoint_dir=str(tmp_path))
+    _check(project)
+    assert accessors[0].overlapped
+    assert all(t.status is TaskStatus.COMPLETED for t in project.completedTasks)
+
+
+def test_accessors_without_streaming_still_work(tmp_path, make_orchestrator):
+    class Plain(StreamingAccessor):
+        stream_call_model = MockAccessor.stream_call_model
+
+    for stream in (False, True):
+        orch = make_orchestrator(Plain, max_parallel=3, streaming_policy=StreamingPolicy(stream_subtasks=stream))
+        _check(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+
+
+@pytest.mark.parametrize("wrapper", ["coalesce", "cache", "record"])
+def test_wrapped_provider_accessors_still_stream(tmp_path, wrapper, make_orchestrator):
+    accessors = []
+
+    def make(started):
+        accessors.append(StreamingAccessor(started))
+        return accessors[-1]
+
+    cache = ResponseCache() if wrapper == "cache" else None
+    cassette = Cassette(tmp_path / "run.jsonl", "record") if wrapper == "record" else None
+    options = {"max_parallel": 3, "streaming_policy": STREAM, "provider": AccessorType.OPENAI}
+    orch = make_orchestrator(make, response_cache=cache, cassette=cassette, **options)
+    _check(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+    assert accessors[-1].overlapped
+
+    if cache is not None:
+        # a hit hands the stored subtasks over without calling the provider
+        orch = make_orchestrator(make, response_cache=cache, **options)
+        _check(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+        assert cache.hits == 1 and not accessors[-1].overlapped
+    if cassette is not None:
+        cassette.close()
+        replay = Cassette(tmp_path / "run.jsonl", "replay")
+        orch = make_orchestrator(make, cassette=replay, **options)
+        _check(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+        assert replay.remaining() == 0
+
+
+def test_async_wrappers_forward_streams(tmp_path):
+    async def _apieces():
+        for piece in _pieces(SUBTASKS):
+            yield piece
+
+    class AsyncStreaming(AsyncMockAccessor):
+        streamed = 0
+
+        async def stream_call_model(self, prompt, schema, on_subtask):
+            self.streamed += 1
+            return await acollect_stream(_apieces(), on_subtask)
+
+    async def run():
+        inner = AsyncStreaming()
+        cassette = Cassette(tmp_path / "run.jsonl", "record")
+        wrapped = AsyncCachingAccessor(
+            AsyncCassetteAccessor(AsyncSingleFlightAccessor(inner, provider="openai"), cassette), ResponseCache()
+        )
+        for _ in range(2):
+            emitted = []
+            response = await wrapped.stream_call_model("p", None, emitted.append)
+            assert [t.id for t in emitted] == ["a", "t1", "t2", "b"] and response.subtasks == emitted
+        cassette.close()
+        return inner.streamed
+
+    # the second call is a cache hit
+    assert asyncio.run(run()) == 1
+
+
+def test_async_children_start_while_parent_streams(tmp_path, rules, use_nodes, no_snapshots):
+    started = asyncio.Event()
+    overlapped = []
+
+    class AsyncStreaming(AsyncMockAccessor):
+        async def stream_call_model(self, prompt, schema, on_subtask):
+            return await acollect_stream(self._chunks(), on_subtask)
+
+        async def _chunks(self):
+            pieces = list(_pieces([t.model_copy(deep=True) for t in SUBTASKS]))
+            for piece in pieces[:2]:
+                yield piece
+            await asyncio.wait_for(started.wait(), 5)
+            overlapped.append(True)
+            for piece in pieces[2:]:
+                yield piece
+
+    async def leaf(task, config=None):
+        if task.id == "a":
+            started.set()
+        return ImplementedResponse(content=task.id).model_dump()
+
+    node_map = {
+        TaskType.REQUIREMENTS: lambda acc: leaf,
+        TaskType.HLD: lambda acc: HLDDesigner(AsyncStreaming()),
+        TaskType.IMPLEMENT: lambda acc: leaf,
+        TaskType.TEST: lambda acc: leaf,
+    }
+    use_nodes(node_map)
+
+    orch = orchestrator.AsyncAgentOrchestrator(config_path=rules, max_parallel=3, streaming_policy=STREAM)
+    project = asyncio.run(orch.implement_project("build", checkpoint_dir=str(tmp_path)))
+    _check(project)
+    assert overlapped == [True]
@@ -0,0 +1,60 @@
+from src.dataManagement.task_store import TaskStore
+from src.dataModel.project import Project
+from src.dataModel.task import Task, TaskStatus, TaskType
+
+
+def build_project() -> Project:
+    root = Task(id="root", description="r", type=TaskType.HLD, status=TaskStatus.COMPLETED)
+    return Project(
+        rootTask=root,
+        failedTasks=[],
+        completedTasks=[root],
+        inProgressTasks=[Task(id="p1", description="p", type=TaskType.LLD, status=TaskStatus.IN_PROGRESS)],
+        queuedTasks=[Task(id="q1", description="q", type=TaskType.TEST, status=TaskStatus.IN_PROGRESS)],
+    )
+
+
+def test_status_transitions_keep_list_order():
+    store = TaskStore(build_project())
+    q1 = store.get("q1")
+    p1 = store.get("p1")
+    assert q1 is not None and p1 is not None
+    # requeued task is normalised to pending
+    assert q1.status is TaskStatus.PENDING
+
+    store.set_status(q1, TaskStatus.IN_PROGRESS)
+    store.set_status(q1, TaskStatus.FAILED)
+    store.set_status(p1, TaskStatus.BLOCKED)
+    project = store.sync()
+
+    assert [t.id for t in project.failedTasks] == ["q1", "p1"]
+    assert not project.inProgressTasks
+    assert not project.queuedTasks
+    assert store.count(TaskStatus.BLOCKED) == 1
+    assert [t.id for t in store.with_status(TaskStatus.FAILED, TaskStatus.BLOCKED)] == ["q1", "p1"]
+
+
+def test_children_and_subtree():
+    store = TaskStore(build_project())
+    store.add([
+        Task(id="a", description="a", type=TaskType.LLD, parent_id="root"),
+        Task(id="b", description="b", type=TaskType.LLD, parent_id="root"),
+    ])
+    store.add([Task(id="a1", description="a1", type=TaskType.IMPLEMENT, parent_id="a")])
+
+    assert [t.id for t in store.children("root")] == ["a", "b"]
+    assert [t.id for t in store.subtree("root")] == ["a", "b", "a1"]
+    assert [t.id for t in store.sync().queuedTasks] == ["q1", "a", "b", "a1"]
+
+
+def test_colliding_ids_are_renamed_with_dependencies():
+    store = TaskStore(build_project())
+    store.add([Task(id="t1", description="x", type=TaskType.IMPLEMENT, parent_id="root")])
+    added = store.add([
+        Task(id="t1", description="y", type=TaskType.IMPLEMENT, parent_id="p1"),
+        Task(id="t2", description="z", type=TaskType.IMPLEMENT, parent_id="p1", depends_on=["t1"]),
+    ])
+
+    assert [t.id for t in added] == ["p1.t1", "t2"]
+    assert added[1].depends_on == ["p1.t1"]
+    assert len(store) == 6